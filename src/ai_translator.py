@@ -1,16 +1,165 @@
-from openai import OpenAI
 from pathlib import Path
+import re
 import json
 import os
-from typing import List, Optional
+from typing import Dict, Generator, List, Optional, Tuple
+from translation_memory import TranslationMemory
+from response_cache import ResponseCache, cache_key, summary_key
+from byte_fitter import FitRules, fit_to_budget
+from request_packer import BatchItem, output_budget
+from translation_backend import MODEL, Choice, OpenAIBackend
+from request_governor import GovernedBackend, RequestGovernor
+from context_window import DEFAULT_CONTEXT_TOKENS, summary_source
+# Bump when the prompts change, so cached responses to the old ones are not reused
+PROMPT_VERSION = 2
+
+# A chat.completions.create() request; the texts of the reply's choices are sent back in
+TranslationSteps = Generator[Dict, List[str], str]
+# Same for a batch request; (text, finish_reason) of the reply is sent back in
+BatchSteps = Generator[Dict, Tuple[str, Optional[str]], Dict[int, str]]
+
+# Upper bound for max_tokens of one batch request
+MAX_BATCH_OUTPUT_TOKENS = 4000
+
+TRANSLATOR_ROLE = """You are an expert English translator that:
+1. ALWAYS translates TO ENGLISH
+2. Uses only basic Latin characters
+3. Translates concisely while maintaining meaning
+4. Preserves essential dialog tone"""
+
+# Identical in every translation request, so providers can cache the prompt prefix
+TRANSLATION_INSTRUCTIONS = """Translate the Russian/Cyrillic dialog text given at the end into natural, fluent English.
+Keep the translation concise but maintain meaning.
+
+CRITICAL REQUIREMENTS:
+1. Output MUST be in ENGLISH only
+2. Use ONLY basic Latin characters (a-z, A-Z) and standard punctuation
+3. Stay within the maximum length in bytes given at the end
+4. NO Cyrillic or special characters allowed
+5. Preserve core meaning and tone
+6. Be as concise as possible while maintaining clarity
+7. PRESERVE ALL QUOTATION MARKS exactly as they appear
+8. DO NOT split sentences at quotation marks
+9. Keep all punctuation in its original position
+
+Translation approach:
+1. First, identify any quoted text and preserve its structure
+2. Translate while maintaining all quotes and punctuation
+3. Keep sentences intact - don't break them up
+4. If shortening is needed, preserve quotes and sentence structure
+"""
+
+# Structured output of batch requests, keyed by the section ids of the prompt
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "translations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "translation": {"type": "string"}
+                },
+                "required": ["id", "translation"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["translations"],
+    "additionalProperties": False
+}
+
+# One complete entry of a batch reply, for salvaging truncated replies
+_BATCH_ENTRY = re.compile(r'\{\s*"id"\s*:\s*\d+\s*,\s*"translation"\s*:\s*"(?:[^"\\]|\\.)*"\s*\}')
+
+
+def _batch_entries(items) -> Dict[int, str]:
+    """Keep the well-formed {"id": int, "translation": str} entries of a list."""
+    translations = {}
+    for entry in items if isinstance(items, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        section_id = entry.get("id")
+        translation = entry.get("translation")
+        if isinstance(section_id, int) and not isinstance(section_id, bool) and isinstance(translation, str):
+            translation = translation.strip()
+            if translation:
+                translations[section_id] = translation
+    return translations
+
+
+def parse_batch_response(response_text: str) -> Dict[int, str]:
+    """Get {section id: translation} from a reply following BATCH_SCHEMA.
+
+    Malformed entries are skipped rather than failing the whole reply. A
+    reply cut off mid-way is not valid JSON, so the entries that were
+    complete before the cut are recovered one by one.
+    """
+    try:
+        data = json.loads(response_text)
+    except ValueError:
+        translations = {}
+        for match in _BATCH_ENTRY.finditer(response_text):
+            try:
+                translations.update(_batch_entries([json.loads(match.group(0))]))
+            except ValueError:
+                continue
+        return translations
+    return _batch_entries(data.get("translations") if isinstance(data, dict) else None)
+
+
+def uses_allowed_characters(trans: str) -> bool:
+    """Whether a translation only uses basic Latin characters and punctuation."""
+    # Allow basic Latin characters, punctuation, and proper quote handling
+    allowed_chars = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ,.!?-'\"() ")
+    return all(c in allowed_chars for c in trans if c not in {'\n', '\r', '\t'})
+
+
+def validate_translation(trans: str) -> bool:
+    """Validate that the translation meets our requirements."""
+    if not uses_allowed_characters(trans):
+        return False
+
+    # Check that it looks like English (at least some common English words)
+    english_markers = {'the', 'a', 'an', 'in', 'on', 'at', 'to', 'of', 'for', 'with', 'you', 'are', 'is', 'be'}
+    words = set(trans.lower().split())
+    if not any(marker in words for marker in english_markers):
+        return False
+
+    return True
+
 
 class AITranslator:
     CONFIG_FILE = Path.home() / ".dlg_editor" / "openai_config.json"
 
-    def __init__(self):
-        """Initialize the AI translator."""
-        self.client = None
-        self.load_api_key()
+    def __init__(self, memory: Optional[TranslationMemory] = None, base_url: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None, backend=None,
+                 governor: Optional[RequestGovernor] = None):
+        """Initialize the AI translator.
+
+        If a translation memory is given it is consulted before every API
+        call, and successful translations are added to it. A response cache
+        returns earlier API answers for the exact same request. ``base_url``
+        points the client at another OpenAI-compatible server; otherwise the
+        one from the config file, if any, is used. A ``backend`` (see
+        translation_backend) replaces the OpenAI client built from the
+        configured key, e.g. to run against a stand-in server. Every
+        request goes through ``governor``, which rate limits, retries and
+        stops hammering a failing endpoint.
+        """
+        self.governor = governor or RequestGovernor()
+        self.backend = GovernedBackend(backend, self.governor) if backend is not None else None
+        self.memory = memory
+        self.cache = cache
+        self.fit_rules = FitRules()
+        self.local_fits = 0  # Overflows fixed by the byte fitter instead of a shorten request
+        self.candidates = 3  # Choices requested per API call; the best fitting one is used
+        self.context_tokens = DEFAULT_CONTEXT_TOKENS  # Budget of the neighbouring lines sent as context
+        self.api_key: Optional[str] = None
+        self.base_url = base_url
+        if backend is None:
+            self.load_api_key()
 
     def load_api_key(self) -> bool:
         """Load OpenAI API key from config file."""
@@ -20,7 +169,8 @@ class AITranslator:
                     config = json.load(f)
                     api_key = config.get('api_key')
                     if api_key:
-                        self.client = OpenAI(api_key=api_key)
+                        self.base_url = self.base_url or config.get('base_url')
+                        self._set_key(api_key)
                         return True
             return False
         except Exception:
@@ -30,90 +180,323 @@ class AITranslator:
         """Save OpenAI API key to config file."""
         try:
             self.CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
+            config = {'api_key': api_key}
+            if self.base_url:
+                config['base_url'] = self.base_url
             with open(self.CONFIG_FILE, 'w') as f:
-                json.dump({'api_key': api_key}, f)
-            self.client = OpenAI(api_key=api_key)
+                json.dump(config, f)
+            self._set_key(api_key)
             return True
         except Exception:
             return False
 
-    def translate_text(self, text: str, max_bytes: int, encoding: str = 'cp1251', context: Optional[List[str]] = None) -> str:
-        """Translate text while respecting byte limit constraints."""
-        if not self.client:
+    def _set_key(self, api_key: str):
+        self.api_key = api_key
+        # The governor does the retrying, so the client does not retry on its own
+        self.backend = GovernedBackend(OpenAIBackend(api_key, self.base_url, max_retries=0), self.governor)
+
+    def translate_text(self, text: str, max_bytes: int, encoding: str = 'cp1251', context: Optional[List[str]] = None,
+                       summary: Optional[str] = None) -> str:
+        """Translate text while respecting byte limit constraints.
+
+        ``context`` is the dialog lines around the text (see
+        context_window) and ``summary`` an optional summary of the file.
+        """
+        # An exact memory hit that fits needs no API call at all
+        hit, key = self.lookup_cached(text, max_bytes, encoding)
+        if hit is not None:
+            return hit
+
+        if not self.backend:
             raise ValueError("OpenAI API key not configured")
 
         try:
-            # Build context section if available
-            context_section = ""
-            if context:
-                context_section = "\nDialog Context (for reference only):\n"
-                for i, ctx in enumerate(context):
-                    if ctx != text:
-                        context_section += f"Section {i+1}: {ctx}\n"
-
-            def validate_translation(trans: str) -> bool:
-                """Validate that the translation meets our requirements."""
-                # Allow basic Latin characters, punctuation, and proper quote handling
-                allowed_chars = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ,.!?-'\"() ")
-                if not all(c in allowed_chars for c in trans if c not in {'\n', '\r', '\t'}):
-                    return False
-                
-                # Check that it looks like English (at least some common English words)
-                english_markers = {'the', 'a', 'an', 'in', 'on', 'at', 'to', 'of', 'for', 'with', 'you', 'are', 'is', 'be'}
-                words = set(trans.lower().split())
-                if not any(marker in words for marker in english_markers):
-                    return False
-                    
-                return True
-
-            def get_initial_translation() -> str:
-                """Get initial translation attempt."""
-                prompt = f"""Translate this Russian/Cyrillic dialog text into natural, fluent English.
-Keep the translation concise but maintain meaning.
+            steps = self.translation_steps(text, max_bytes, encoding, context, summary)
+            request = next(steps)
+            while True:
+                request = steps.send(self._choice_texts(self.backend.complete(request)))
+        except StopIteration as done:
+            return self.store_cached(key, done.value)
+        except Exception as e:
+            raise ValueError(f"Translation failed: {str(e)}")
 
-Original Russian text: {text}{context_section}
+    async def translate_text_async(self, text: str, max_bytes: int, encoding: str = 'cp1251',
+                                   context: Optional[List[str]] = None,
+                                   backend=None, summary: Optional[str] = None) -> str:
+        """Like translate_text, but awaits the API calls on a backend for the running loop."""
+        hit, key = self.lookup_cached(text, max_bytes, encoding)
+        if hit is not None:
+            return hit
 
-CRITICAL REQUIREMENTS:
-1. Output MUST be in ENGLISH only
-2. Use ONLY basic Latin characters (a-z, A-Z) and standard punctuation
-3. Maximum length: {max_bytes} bytes when encoded in {encoding}
-4. NO Cyrillic or special characters allowed
-5. Preserve core meaning and tone
-6. Be as concise as possible while maintaining clarity
-7. PRESERVE ALL QUOTATION MARKS exactly as they appear
-8. DO NOT split sentences at quotation marks
-9. Keep all punctuation in its original position
+        if not backend:
+            raise ValueError("OpenAI API key not configured")
 
-Translation approach:
-1. First, identify any quoted text and preserve its structure
-2. Translate while maintaining all quotes and punctuation
-3. Keep sentences intact - don't break them up
-4. If shortening is needed, preserve quotes and sentence structure
+        try:
+            steps = self.translation_steps(text, max_bytes, encoding, context, summary)
+            request = next(steps)
+            while True:
+                request = steps.send(self._choice_texts(await backend.complete_async(request)))
+        except StopIteration as done:
+            return self.store_cached(key, done.value)
+        except Exception as e:
+            raise ValueError(f"Translation failed: {str(e)}")
+
+    def translate_batch(self, items: List[BatchItem], encoding: str = 'cp1251') -> Dict[int, str]:
+        """Translate several (id, text, max_bytes) sections in as few requests as possible."""
+        if not self.backend:
+            raise ValueError("OpenAI API key not configured")
+
+        try:
+            steps = self.batch_steps(items, encoding)
+            request = next(steps)
+            while True:
+                request = steps.send(self.backend.complete(request)[0])
+        except StopIteration as done:
+            return done.value
+        except Exception as e:
+            raise ValueError(f"Translation failed: {str(e)}")
+
+    async def translate_batch_async(self, items: List[BatchItem], encoding: str = 'cp1251',
+                                    backend=None) -> Dict[int, str]:
+        """Like translate_batch, but awaits the API calls on a backend for the running loop."""
+        if not backend:
+            raise ValueError("OpenAI API key not configured")
+
+        try:
+            steps = self.batch_steps(items, encoding)
+            request = next(steps)
+            while True:
+                request = steps.send((await backend.complete_async(request))[0])
+        except StopIteration as done:
+            return done.value
+        except Exception as e:
+            raise ValueError(f"Translation failed: {str(e)}")
+
+    def lookup_cached(self, text: str, max_bytes: int, encoding: str) -> Tuple[Optional[str], Optional[str]]:
+        """Get (translation, cache key) from the memory or the response cache."""
+        if self.memory:
+            match = self.memory.lookup_fitting(text, max_bytes)
+            if match:
+                return match.translation, None
+
+        if self.cache is None:
+            return None, None
+        model = self.backend.model if self.backend else MODEL
+        key = cache_key(text, max_bytes, encoding, model, PROMPT_VERSION)
+        cached = self.cache.get(key)
+        if cached is not None and len(cached.encode(encoding, errors='replace')) <= max_bytes:
+            return cached, key
+        return None, key
+
+    def store_cached(self, key: Optional[str], translation: str) -> str:
+        """Remember an API answer under the key returned by lookup_cached."""
+        if key is not None:
+            try:
+                self.cache.put(key, translation)
+            except Exception as e:
+                print(f"Error caching translation: {e}")
+        return translation
+
+    def translation_steps(self, text: str, max_bytes: int, encoding: str = 'cp1251',
+                          context: Optional[List[str]] = None, summary: Optional[str] = None) -> TranslationSteps:
+        """Generate the API requests for one translation, independent of how they are sent.
+
+        Each yielded value is the keyword arguments of a chat completion
+        request asking for several candidates; the texts of the reply's
+        choices are sent back in. The finished translation is
+        the generator's return value. The sync and async translate methods
+        only differ in how they perform the requests.
+        """
+        context_section = self._context_section(text, context, summary)
+
+        # Main translation loop
+        max_attempts = 3
+        current_attempt = 0
+        candidates = yield self._initial_request(text, max_bytes, encoding, context_section, self.candidates)
+
+        while current_attempt < max_attempts:
+            valid = [candidate for candidate in candidates if validate_translation(candidate)]
+            if not valid:
+                if current_attempt == max_attempts - 1:
+                    raise ValueError("Translation failed: Output is not valid English with Latin characters")
+                current_attempt += 1
+                candidates = yield self._initial_request(text, max_bytes, encoding, context_section, self.candidates)
+                continue
+
+            best = self._best_fit(valid, max_bytes, encoding)
+            if best is not None:
+                if self.memory:
+                    self.memory.add(text, best)
+                return best
+
+            # None fits; ask for a shorter version of the shortest one
+            shortest = min(valid, key=lambda candidate: len(candidate.encode(encoding)))
+            current_attempt += 1
+            candidates = yield self._shorten_request(
+                text, max_bytes, encoding, shortest, len(shortest.encode(encoding)), self.candidates)
+
+        raise ValueError(f"Failed to get translation within byte limit after {max_attempts} attempts")
+
+    def _best_fit(self, candidates: List[str], max_bytes: int, encoding: str) -> Optional[str]:
+        """Pick the longest valid candidate that fits, so the least meaning is lost.
+
+        Candidates that only fit after local byte fitting are considered when
+        none fits as it is; overflows of a few bytes can usually be fixed
+        without another round trip.
+        """
+        fitting = [candidate for candidate in candidates if len(candidate.encode(encoding)) <= max_bytes]
+        if fitting:
+            return max(fitting, key=lambda candidate: len(candidate.encode(encoding)))
+
+        fitted = [fit_to_budget(candidate, max_bytes, encoding, self.fit_rules) for candidate in candidates]
+        fitted = [candidate for candidate in fitted if candidate is not None and validate_translation(candidate)]
+        if fitted:
+            self.local_fits += 1
+            return max(fitted, key=lambda candidate: len(candidate.encode(encoding)))
+        return None
+
+    def batch_steps(self, items: List[BatchItem], encoding: str = 'cp1251') -> BatchSteps:
+        """Generate the requests translating several sections at once.
+
+        Every entry of a reply is checked on its own: sections that are
+        missing (e.g. cut off because the reply ran into max_tokens), use
+        characters outside the allowed set or still overflow their budget
+        after local fitting are asked for again, together, while the rest
+        of the reply is kept. Returns {section id: translation} of every
+        section that came back; one still over budget after the last
+        attempt is kept for review.
+        """
+        results: Dict[int, str] = {}
+        overflowing: Dict[int, str] = {}  # Section id -> last answer that did not fit
+        pending = list(items)
+        max_attempts = 3
+        for _ in range(max_attempts):
+            response_text, _finish_reason = yield self._batch_request(pending, overflowing, encoding)
+            translations = parse_batch_response(response_text)
+
+            retry = []
+            for section_id, text, max_bytes in pending:
+                translation = translations.get(section_id)
+                if translation is None or not uses_allowed_characters(translation):
+                    retry.append((section_id, text, max_bytes))
+                    continue
+                fitted = self._fit_batch_translation(translation, max_bytes, encoding)
+                if fitted is None:
+                    overflowing[section_id] = translation
+                    retry.append((section_id, text, max_bytes))
+                    continue
+                overflowing.pop(section_id, None)
+                if self.memory:
+                    self.memory.add(text, fitted)
+                results[section_id] = fitted
+            pending = retry
+            if not pending:
+                break
+
+        results.update(overflowing)
+        return results
+
+    def _fit_batch_translation(self, translation: str, max_bytes: int, encoding: str) -> Optional[str]:
+        """Get the translation fitted to its budget, locally if needed, or None."""
+        if len(translation.encode(encoding, errors='replace')) <= max_bytes:
+            return translation
+        fitted = fit_to_budget(translation, max_bytes, encoding, self.fit_rules)
+        if fitted is None or not uses_allowed_characters(fitted):
+            return None
+        self.local_fits += 1
+        return fitted
+
+    @staticmethod
+    def _batch_request(items: List[BatchItem], overflowing: Dict[int, str], encoding: str) -> Dict:
+        """Request translating several sections, each under its own byte limit."""
+        prompt = "Translate the following sections from Russian to English. Each section has a maximum length limit in bytes.\n\n"
+        for section_id, text, max_bytes in items:
+            prompt += f"Section {section_id} (max {max_bytes} bytes):\n{text}\n"
+            previous = overflowing.get(section_id)
+            if previous:
+                prompt += (f"Your previous translation was too long "
+                           f"({len(previous.encode(encoding, errors='replace'))} bytes), make it shorter: {previous}\n")
+            prompt += "\n"
+
+        prompt += "\nRequirements:\n"
+        prompt += "1. Translate each section while preserving its meaning and tone\n"
+        prompt += "2. Keep each translation within its specified byte limit\n"
+        prompt += "3. Use only basic Latin characters (a-z, A-Z) and standard punctuation\n"
+        prompt += "4. Maintain any greeting forms and exclamations\n"
+        prompt += "5. Answer with one entry per section, using the section number as its id\n"
+        prompt += "6. Keep each section's translation as a single paragraph\n"
+
+        return dict(
+            model=MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert translator specializing in game dialog translation from Russian to English. Answer in JSON with the translation of every section."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=min(output_budget(items), MAX_BATCH_OUTPUT_TOKENS),
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "section_translations", "strict": True, "schema": BATCH_SCHEMA}
+            }
+        )
+
+    @staticmethod
+    def _choice_texts(choices: List[Choice]) -> List[str]:
+        return [text.strip() for text, _ in choices if text]
+
+    def _context_section(self, text: str, context: Optional[List[str]], summary: Optional[str] = None) -> str:
+        # Most stable first: the summary is the same for the whole file, the window shifts per section
+        context_section = ""
+        if summary:
+            context_section += f"\nAbout this dialog (for reference only): {summary}\n"
+        if context:
+            context_section += "\nNeighbouring dialog lines, in order (for reference only):\n"
+            for ctx in context:
+                if ctx != text:
+                    context_section += f"- {ctx}\n"
+
+        # Similar lines translated before keep terminology consistent
+        if self.memory:
+            similar = self.memory.fuzzy_matches(text, limit=3)
+            if similar:
+                context_section += "\nPreviously approved translations of similar lines (keep wording consistent):\n"
+                for match in similar:
+                    context_section += f"{match.source_text} => {match.translation}\n"
+        return context_section
+
+    @staticmethod
+    def _initial_request(text: str, max_bytes: int, encoding: str, context_section: str, n: int = 1) -> Dict:
+        """Request for an initial translation attempt.
+
+        The instructions come first and never change, so consecutive
+        requests share a prompt prefix the provider can cache; the parts
+        that differ per section come last.
+        """
+        prompt = f"""{TRANSLATION_INSTRUCTIONS}{context_section}
+Original Russian text: {text}
+Maximum length: {max_bytes} bytes when encoded in {encoding}
 
 Translate to English:"""
 
-                response = self.client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": """You are an expert English translator that:
-1. ALWAYS translates TO ENGLISH
-2. Uses only basic Latin characters
-3. Translates concisely while maintaining meaning
-4. Preserves essential dialog tone"""
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.7,
-                    max_tokens=150
-                )
-
-                return response.choices[0].message.content.strip()
-
-            def shorten_translation(previous: str, current_bytes: int) -> str:
-                """Request a shorter version of the translation."""
-                prompt = f"""The previous translation is too long ({current_bytes} bytes, maximum {max_bytes}).
+        return dict(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": TRANSLATOR_ROLE},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=150,
+            n=n
+        )
+
+    @staticmethod
+    def _shorten_request(text: str, max_bytes: int, encoding: str, previous: str, current_bytes: int,
+                         n: int = 1) -> Dict:
+        """Request for a shorter version of the translation."""
+        prompt = f"""The previous translation is too long ({current_bytes} bytes, maximum {max_bytes}).
 Please provide a shorter version while maintaining the core meaning.
 
 Original Russian: {text}
@@ -136,47 +519,63 @@ Translation approach:
 
 Provide shorter translation:"""
 
-                response = self.client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an expert at creating concise translations while preserving core meaning."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.5,  # Lower temperature for more focused output
-                    max_tokens=150
-                )
-
-                return response.choices[0].message.content.strip()
-
-            # Main translation loop
-            max_attempts = 3
-            current_attempt = 0
-            current_translation = get_initial_translation()
-
-            while current_attempt < max_attempts:
-                if not validate_translation(current_translation):
-                    if current_attempt == max_attempts - 1:
-                        raise ValueError("Translation failed: Output is not valid English with Latin characters")
-                    current_attempt += 1
-                    current_translation = get_initial_translation()
-                    continue
-
-                encoded = current_translation.encode(encoding)
-                if len(encoded) <= max_bytes:
-                    return current_translation
-
-                # If too long, immediately try to shorten it
-                current_attempt += 1
-                current_translation = shorten_translation(current_translation, len(encoded))
+        return dict(
+            model=MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert at creating concise translations while preserving core meaning."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.5,  # Lower temperature for more focused output
+            max_tokens=150,
+            n=n
+        )
 
-            raise ValueError(f"Failed to get translation within byte limit after {max_attempts} attempts")
+    def file_summary(self, texts: List[str], create: bool = True) -> Optional[str]:
+        """A two-sentence summary of a dialog file, to give every section's prompt the big picture.
 
+        Summaries are kept in the response cache, keyed by the file's text,
+        so a file is summarized once. With ``create`` False only a cached
+        summary is returned. Summaries are optional, so failures are
+        printed and give None.
+        """
+        key = summary_key(texts, self.backend.model if self.backend else MODEL, PROMPT_VERSION)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None or not create:
+                return cached
+        if not create or not self.backend or not texts:
+            return None
+        try:
+            choices = self.backend.complete(self._summary_request(summary_source(texts)))
+            summary = choices[0][0].strip() if choices else ""
         except Exception as e:
-            raise ValueError(f"Translation failed: {str(e)}")
+            print(f"Error summarizing dialog: {e}")
+            return None
+        if not summary:
+            return None
+        return self.store_cached(key if self.cache is not None else None, summary)
+
+    @staticmethod
+    def _summary_request(lines: List[str]) -> Dict:
+        """Request for a short English summary of a dialog."""
+        dialog = "\n".join(lines)
+        return dict(
+            model=MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You summarize game dialogs for translators, in English, in at most two sentences: who speaks, about what, and the tone."
+                },
+                {"role": "user", "content": f"Summarize this Russian game dialog:\n{dialog}"}
+            ],
+            temperature=0.3,
+            max_tokens=100,
+            n=1
+        )
 
     def has_valid_key(self) -> bool:
         """Check if we have a valid OpenAI API key configured."""
-        return self.client is not None 
\ No newline at end of file
+        return self.backend is not None 
\ No newline at end of file
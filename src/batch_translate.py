@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Draft translations for every untranslated file, resumable after interruption."""
+
+import os
+import re
+import sys
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from db_handler import DbHandler
+from dlg_handler import DlgHandler, max_text_bytes
+from ai_translator import AITranslator
+from translation_memory import TranslationMemory
+from translation_engine import TranslationBatch, TranslationEngine, TranslationJob
+from response_cache import ResponseCache
+from request_governor import RequestGovernor
+from context_window import context_window
+
+_CYRILLIC = re.compile(r"[Ѐ-ӿ]")
+
+
+def needs_draft(text: str) -> bool:
+    """Whether a section still has Russian text to translate."""
+    return bool(_CYRILLIC.search(text))
+
+
+@dataclass
+class BatchStats:
+    files: int = 0  # Files whose sections were queued
+    queued: int = 0  # Sections sent to the engine
+    skipped: int = 0  # Sections that already had a draft for the same source text
+    drafted: int = 0
+    failed: int = 0
+    unreadable: int = 0  # Files that could not be parsed
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def done(self) -> int:
+        return self.drafted + self.failed
+
+    @property
+    def sections_per_minute(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.done * 60.0 / elapsed if elapsed > 0 else 0.0
+
+
+class BatchPipeline:
+    """Translates every untranslated file into drafts, never into game files.
+
+    Files are parsed one at a time while earlier files' sections are being
+    translated, so parsing and API calls overlap and only a bounded number
+    of sections are queued at once. Each result is stored in the
+    translation_drafts table as soon as it arrives; the drafts are the
+    checkpoint, so a later run skips every section that already has a
+    draft for its current text and retries the ones that failed.
+
+    After ``max_consecutive_failures`` failures in a row (an exhausted quota
+    or a revoked key fail every request) the run stops instead of burning
+    through the remaining sections.
+
+    Each section is sent with a window of its neighbouring lines as
+    context; with ``summaries`` every file is also summarized once and the
+    summary goes into each of its sections' prompts.
+    """
+
+    def __init__(self, db: DbHandler, translator: AITranslator, concurrency: int = 8,
+                 max_consecutive_failures: int = 20, summaries: bool = False):
+        self.db = db
+        self.translator = translator
+        self.concurrency = concurrency
+        self.max_consecutive_failures = max_consecutive_failures
+        self.summaries = summaries
+        self.stats = BatchStats()
+        self.error: Optional[str] = None  # Why the run stopped early, if it did
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._consecutive_failures = 0
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        """Stop queueing sections; the ones in flight are abandoned."""
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def run(self, files: Optional[Iterable[Tuple[str, str]]] = None,
+            on_progress: Optional[Callable[[BatchStats], None]] = None) -> BatchStats:
+        """Draft every untranslated file, or the given (file_path, relative_path) pairs.
+
+        ``on_progress(stats)`` is called from the engine thread after each
+        finished section.
+        """
+        self.stats = BatchStats()
+        self.error = None
+        self._stopped.clear()
+        self._consecutive_failures = 0
+        self._on_progress = on_progress
+        if files is None:
+            files = self.db.get_untranslated_files()
+        drafted = self.db.get_drafted_sources()
+
+        engine = TranslationEngine(self.translator, max_concurrency=self.concurrency)
+        batches: List[TranslationBatch] = []
+        try:
+            for file_path, _ in files:
+                if self._stopped.is_set():
+                    break
+                jobs = self._file_jobs(file_path, drafted)
+                if not jobs:
+                    continue
+                self._wait_for_room(len(jobs))
+                if self._stopped.is_set():
+                    break
+                with self._cond:
+                    self._in_flight += len(jobs)
+                self.stats.files += 1
+                self.stats.queued += len(jobs)
+                batches.append(engine.submit(jobs, on_result=self._on_result))
+
+            with self._cond:
+                while self._in_flight and not self._stopped.is_set():
+                    self._cond.wait()
+        finally:
+            for batch in batches:
+                batch.cancel()
+            engine.stop()
+            self.db.flush()
+        return self.stats
+
+    def _file_jobs(self, file_path: str, drafted: Dict[Tuple[str, int], str]) -> List[TranslationJob]:
+        """Jobs for the sections of a file that have no draft for their current text."""
+        try:
+            handler = DlgHandler(file_path)
+            handler.read_file()
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            self.stats.unreadable += 1
+            return []
+
+        texts = [section.text for section in handler.text_sections]
+        jobs = []
+        for index, section in enumerate(handler.text_sections):
+            if not needs_draft(section.text):
+                continue
+            if drafted.get((file_path, index)) == section.text:
+                self.stats.skipped += 1
+                continue
+            jobs.append(TranslationJob(
+                section.text,
+                max_text_bytes(section, index),
+                section.encoding,
+                context_window(texts, index, self.translator.context_tokens),
+                key=(file_path, index)
+            ))
+        if jobs and self.summaries:
+            summary = self.translator.file_summary(texts)
+            for job in jobs:
+                job.summary = summary
+        return jobs
+
+    def _wait_for_room(self, count: int) -> None:
+        # A few batches ahead of the engine keeps it busy without parsing the whole game up front
+        limit = self.concurrency * 4
+        with self._cond:
+            while self._in_flight and self._in_flight + count > limit and not self._stopped.is_set():
+                self._cond.wait()
+
+    def _on_result(self, batch: TranslationBatch, index: int, translation: Optional[str], error) -> None:
+        job = batch.jobs[index]
+        file_path, section_index = job.key
+        self.db.draft_store([(
+            file_path,
+            section_index,
+            job.text,
+            translation,
+            str(error) if error is not None else None,
+            time.time()
+        )])
+
+        with self._cond:
+            self._in_flight -= 1
+            if error is None:
+                self.stats.drafted += 1
+                self._consecutive_failures = 0
+            else:
+                self.stats.failed += 1
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= self.max_consecutive_failures and not self._stopped.is_set():
+                    self.error = f"Stopped after {self._consecutive_failures} failures in a row: {error}"
+                    self._stopped.set()
+            self._cond.notify_all()
+
+        if self._on_progress:
+            try:
+                self._on_progress(self.stats)
+            except Exception as e:
+                print(f"Error reporting progress: {e}")
+
+
+def print_usage():
+    print("Usage:")
+    print("  python batch_translate.py run [concurrency] [requests_per_minute] [--summaries]  # Draft all untranslated files")
+    print("  python batch_translate.py status                                                  # Drafted and failed sections")
+
+
+def _progress_printer() -> Callable[[BatchStats], None]:
+    """An on_progress callback printing at most once a second, so a fast run does not flood the terminal."""
+    last_print = 0.0
+
+    def print_progress(stats: BatchStats) -> None:
+        nonlocal last_print
+        now = time.monotonic()
+        if now - last_print < 1.0:
+            return
+        last_print = now
+        print(
+            f"\r{stats.done}/{stats.queued} sections, {stats.failed} failed, "
+            f"{stats.sections_per_minute:.0f} sections/min",
+            end="", flush=True
+        )
+    return print_progress
+
+
+if __name__ == "__main__":
+    summaries = "--summaries" in sys.argv
+    sys.argv = [arg for arg in sys.argv if arg != "--summaries"]
+    if len(sys.argv) < 2:
+        print_usage()
+        exit(1)
+
+    db_path = os.path.join(os.path.expanduser("~"), ".dlg_editor", "dlg_files.db")
+    if not os.path.exists(db_path):
+        print(f"Database not found at {db_path}")
+        exit(1)
+
+    with DbHandler(db_path) as db:
+        if sys.argv[1] == "status":
+            drafted, failed = db.get_draft_counts()
+            print(f"{drafted} section(s) drafted, {failed} failed")
+        elif sys.argv[1] == "run":
+            concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+            requests_per_minute = float(sys.argv[3]) if len(sys.argv) > 3 else None
+            cache = ResponseCache()
+            governor = RequestGovernor(requests_per_minute, max_concurrency=concurrency)
+            translator = AITranslator(memory=TranslationMemory(db), cache=cache, governor=governor)
+            if not translator.has_valid_key():
+                print("OpenAI API key not configured")
+                exit(1)
+
+            pipeline = BatchPipeline(db, translator, concurrency, summaries=summaries)
+            try:
+                stats = pipeline.run(on_progress=_progress_printer())
+            except KeyboardInterrupt:
+                pipeline.stop()
+                stats = pipeline.stats
+                print("\nInterrupted; run again to resume")
+            finally:
+                cache.close()
+            print(
+                f"\n{stats.files} file(s): {stats.drafted} drafted, {stats.failed} failed, "
+                f"{stats.skipped} already drafted, {stats.unreadable} unreadable file(s) "
+                f"({stats.sections_per_minute:.0f} sections/min)"
+            )
+            metrics = governor.metrics()
+            print(
+                f"Requests: {metrics['succeeded']} succeeded, {metrics['failed']} failed, "
+                f"{metrics['retried']} retried, {metrics['throttled']} throttled, "
+                f"{metrics['rate_limited']} rate limited, circuit {metrics['circuit']}"
+            )
+            if pipeline.error:
+                print(pipeline.error)
+        else:
+            print_usage()
+            exit(1)
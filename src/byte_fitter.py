@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Shorten translations that slightly overflow their byte budget, without an API call."""
+
+import re
+import sys
+import json
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# "have" only contracts as an auxiliary: "I've been" is fine, "I've a sword" is not
+PAST_PARTICIPLES = [
+    "been", "got", "seen", "done", "heard", "found", "lost", "made", "told",
+    "said", "given", "taken", "come", "gone", "known", "never", "already",
+]
+
+DEFAULT_CONTRACTIONS = {
+    "I am": "I'm", "I will": "I'll", "I would": "I'd",
+    "you are": "you're", "you will": "you'll",
+    "we are": "we're", "we will": "we'll",
+    "they are": "they're", "they will": "they'll",
+    "he is": "he's", "she is": "she's", "it is": "it's", "that is": "that's",
+    "there is": "there's", "what is": "what's", "who is": "who's",
+    "do not": "don't", "does not": "doesn't", "did not": "didn't",
+    "is not": "isn't", "are not": "aren't", "was not": "wasn't", "were not": "weren't",
+    "have not": "haven't", "has not": "hasn't", "had not": "hadn't",
+    "will not": "won't", "would not": "wouldn't", "could not": "couldn't",
+    "should not": "shouldn't", "cannot": "can't", "can not": "can't",
+}
+DEFAULT_CONTRACTIONS.update({
+    f"{pronoun} have {word}": f"{pronoun}'ve {word}"
+    for pronoun in ("I", "you", "we", "they") for word in PAST_PARTICIPLES
+})
+
+DEFAULT_ABBREVIATIONS = {
+    "okay": "OK", "Mister": "Mr.", "Doctor": "Dr.", "Saint": "St.",
+    "until": "till",
+}
+
+# Words that can go without changing what a line says; tried in this order.
+# Hedges and words with a second sense ("just king", "rather than") are left out.
+DEFAULT_FILLERS = ["really", "very", "actually", "truly"]
+
+# An auxiliary ending a clause is stressed and cannot contract: "who he is." not "who he's."
+STRESSED_AUXILIARIES = {"am", "is", "are", "will", "would"}
+
+
+@dataclass
+class FitRules:
+    """Replacement tables used by fit_to_budget; all can be overridden."""
+    contractions: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_CONTRACTIONS))
+    abbreviations: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_ABBREVIATIONS))
+    fillers: List[str] = field(default_factory=lambda: list(DEFAULT_FILLERS))
+
+
+def _byte_length(text: str, encoding: str) -> int:
+    return len(text.encode(encoding, errors='replace'))
+
+
+def _match_case(replacement: str, original: str) -> str:
+    if original[:1].isupper() and replacement[:1].islower():
+        return replacement[0].upper() + replacement[1:]
+    return replacement
+
+
+@lru_cache(maxsize=None)
+def _phrase_pattern(phrase: str) -> "re.Pattern":
+    words = phrase.split()
+    pattern = r"\b" + r"\s+".join(re.escape(word) for word in words) + r"\b"
+    if words[-1].lower() in STRESSED_AUXILIARIES:
+        pattern += r"(?=\s+\w)"  # Only with a word after it
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def collapse_whitespace(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def normalize_punctuation(text: str) -> str:
+    """Drop redundant punctuation and the spaces around it."""
+    text = re.sub(r"\s+([,.!?])", r"\1", text)  # "word ," -> "word,"
+    text = re.sub(r"\.{4,}", "...", text)
+    text = re.sub(r"([!?])\1+", r"\1", text)  # "!!!" -> "!"
+    text = re.sub(r",{2,}", ",", text)
+    text = re.sub(r"\(\s+", "(", text)
+    text = re.sub(r"\s+\)", ")", text)
+    return text
+
+
+def _replacement_steps(text: str, table: Dict[str, str]) -> List[Callable[[str], str]]:
+    """One step per phrase of table that occurs in text, biggest saving first."""
+    steps = []
+    for phrase, short in sorted(table.items(), key=lambda item: len(item[1]) - len(item[0])):
+        pattern = _phrase_pattern(phrase)
+        if pattern.search(text):
+            steps.append(lambda s, p=pattern, r=short: p.sub(lambda m: _match_case(r, m.group(0)), s))
+    return steps
+
+
+@lru_cache(maxsize=None)
+def _filler_pattern(filler: str) -> "re.Pattern":
+    return re.compile(r"\s*\b" + re.escape(filler) + r"\b", re.IGNORECASE)
+
+
+def _filler_steps(text: str, fillers: List[str]) -> List[Callable[[str], str]]:
+    steps = []
+    for filler in fillers:
+        pattern = _filler_pattern(filler)
+        if pattern.search(text):
+            def drop(s, p=pattern):
+                result = p.sub("", s, count=1).strip()
+                # Keep the sentence capitalized if its first word was dropped
+                return result[0].upper() + result[1:] if result and s[:1].isupper() else result
+            steps.append(drop)
+    return steps
+
+
+def fit_to_budget(text: str, max_bytes: int, encoding: str = 'cp1251',
+                  rules: Optional[FitRules] = None) -> Optional[str]:
+    """Shorten text until it fits max_bytes, or return None if the rules are not enough.
+
+    Each stage only runs while the text is still too long, and within a
+    stage the edits are applied one at a time, so a text that overflows by
+    a byte or two keeps as much of its wording as possible. Stages, mildest
+    first: whitespace, punctuation, contractions, abbreviations, fillers.
+    The result is deterministic for the same text and rules.
+    """
+    rules = rules or FitRules()
+    if _byte_length(text, encoding) <= max_bytes:
+        return text
+
+    stages = [
+        lambda s: [collapse_whitespace],
+        lambda s: [normalize_punctuation],
+        lambda s: _replacement_steps(s, rules.contractions),
+        lambda s: _replacement_steps(s, rules.abbreviations),
+        lambda s: _filler_steps(s, rules.fillers),
+    ]
+    for stage in stages:
+        for step in stage(text):
+            text = step(text)
+            if _byte_length(text, encoding) <= max_bytes:
+                return text
+    return None
+
+
+def run_benchmark(cases: List[Dict], encoding: str = 'cp1251') -> Tuple[int, int, float]:
+    """Fit every {"translation", "max_bytes"} case.
+
+    Returns (over-budget cases, cases fitted locally, microseconds per fit).
+    Every case fitted locally is a shorten request that is not sent.
+    """
+    over = [case for case in cases if _byte_length(case["translation"], encoding) > case["max_bytes"]]
+    start = time.perf_counter()
+    fitted = sum(1 for case in over if fit_to_budget(case["translation"], case["max_bytes"], encoding) is not None)
+    elapsed = time.perf_counter() - start
+    return len(over), fitted, elapsed * 1e6 / max(len(over), 1)
+
+
+def print_usage():
+    print("Usage:")
+    print("  python byte_fitter.py benchmark [cases.json]   # Round trips saved on a set of sections")
+    print('  python byte_fitter.py fit <max_bytes> "text"    # Fit one text')
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print_usage()
+        exit(1)
+
+    if sys.argv[1] == "benchmark":
+        default_cases = Path(__file__).resolve().parent.parent / "samples" / "fit_benchmark.json"
+        cases_path = Path(sys.argv[2]) if len(sys.argv) > 2 else default_cases
+        with open(cases_path, 'r', encoding='utf-8') as f:
+            cases = json.load(f)
+        over, fitted, per_fit = run_benchmark(cases)
+        print(f"{len(cases)} section(s), {over} over budget")
+        print(f"Fitted locally: {fitted}/{over} ({fitted * 100 // max(over, 1)}%) - "
+              f"{fitted} shorten round trip(s) saved, {per_fit:.0f} us per fit")
+    elif sys.argv[1] == "fit" and len(sys.argv) >= 4:
+        result = fit_to_budget(" ".join(sys.argv[3:]), int(sys.argv[2]))
+        print(result if result is not None else "Does not fit")
+    else:
+        print_usage()
+        exit(1)
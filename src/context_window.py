@@ -0,0 +1,50 @@
+"""Pick the dialog lines sent along with a section as translation context."""
+
+from typing import List, Sequence
+from request_packer import estimate_tokens
+
+# Budget for the neighbouring lines of one translation prompt
+DEFAULT_CONTEXT_TOKENS = 400
+DEFAULT_CONTEXT_SECTIONS = 8
+# Budget for the dialog text a file summary is made from
+SUMMARY_SOURCE_TOKENS = 3000
+
+
+def context_window(texts: Sequence[str], index: int, max_tokens: int = DEFAULT_CONTEXT_TOKENS,
+                   max_sections: int = DEFAULT_CONTEXT_SECTIONS) -> List[str]:
+    """The sections around texts[index], in file order, within a token budget.
+
+    Neighbours are taken nearest first, alternating between the lines
+    before and after. A side stops at the first line that does not fit, so
+    the window stays contiguous. Only the lines near index are looked at,
+    so prompts stay the same size however long the dialog is.
+    """
+    chosen = []
+    used = 0
+    sides = {-1: index - 1, 1: index + 1}  # Direction -> next position on that side
+    while sides and len(chosen) < max_sections:
+        for direction in list(sides):
+            position = sides[direction]
+            if not 0 <= position < len(texts) or len(chosen) >= max_sections:
+                del sides[direction]
+                continue
+            cost = estimate_tokens(texts[position])
+            if used + cost > max_tokens:
+                del sides[direction]
+                continue
+            chosen.append(position)
+            used += cost
+            sides[direction] = position + direction
+    return [texts[position] for position in sorted(chosen)]
+
+
+def summary_source(texts: Sequence[str], max_tokens: int = SUMMARY_SOURCE_TOKENS) -> List[str]:
+    """The first lines of a dialog, as many as fit max_tokens, to summarize it from."""
+    lines = []
+    used = 0
+    for text in texts:
+        used += estimate_tokens(text)
+        if used > max_tokens:
+            break
+        lines.append(text)
+    return lines
@@ -1,114 +1,953 @@
 import sqlite3
+import threading
+import queue
+import itertools
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Callable, Any, Iterable, Dict
 import os
 
+
+NOT_REQUIRED_PREFIX = "NOT_REQUIRED:"
+
+
+def split_relative_path(relative_path: str) -> Tuple[bool, Tuple[str, ...]]:
+    """Get (is_not_required, path parts) of a stored relative path.
+
+    Paths may have been stored on Windows, so both separators are accepted.
+    """
+    is_not_required = relative_path.startswith(NOT_REQUIRED_PREFIX)
+    if is_not_required:
+        relative_path = relative_path[len(NOT_REQUIRED_PREFIX):]
+    return is_not_required, tuple(part for part in relative_path.replace("\\", "/").split("/") if part)
+
+
+def parent_dir(relative_path: str) -> str:
+    """Directory of a stored relative path, '/'-separated; '' for the root."""
+    return "/".join(split_relative_path(relative_path)[1][:-1])
+
+
+class _WriteJob:
+    """A unit of work for the writer thread, applied atomically."""
+    __slots__ = ('statements', 'func', 'done', 'error', 'result', 'is_async')
+
+    def __init__(self, statements=None, func=None):
+        self.statements = statements or []  # List of (sql, params, many)
+        self.func = func  # Optional callable(cursor) run after the statements
+        self.is_async = False  # Nobody waits on the result, so errors are logged
+        self.done = threading.Event()
+        self.error = None
+        self.result = None
+
+
+class Transaction:
+    """Collects statements that are committed together by the writer thread.
+
+    Reads made while the transaction is open do not see its statements; they
+    are only applied when the ``with`` block exits without an exception.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql: str, params: Iterable = ()) -> None:
+        """Queue a single statement."""
+        self.statements.append((sql, tuple(params), False))
+
+    def executemany(self, sql: str, seq_of_params: Iterable[Iterable]) -> None:
+        """Queue a statement to run once per parameter tuple."""
+        self.statements.append((sql, [tuple(p) for p in seq_of_params], True))
+
+
 class DbHandler:
+    # Maximum number of queued jobs folded into a single commit
+    WRITE_BATCH_SIZE = 500
+
+    # Kinds of dlg_files change reported to file listeners
+    FILES_ADDED = 'added'
+    FILES_REMOVED = 'removed'
+    FILES_UPDATED = 'updated'  # Status or relative path changed
+    FILES_HASHED = 'hashed'  # Content hashes changed, so duplicate groups may have
+    FILES_CLEARED = 'cleared'
+
+    _STOP = object()
+    _memory_ids = itertools.count()
+
     def __init__(self, db_path: str = "dlg_files.db"):
-        """Initialize database connection and create tables if they don't exist."""
+        """Initialize database connections and create tables if they don't exist.
+
+        Every thread gets its own read connection. All writes go through a
+        queue drained by a single writer thread, which folds whatever is
+        queued into one transaction per batch.
+        """
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
+        self._is_memory = db_path == ":memory:"
+        if self._is_memory:
+            # Per-thread connections need a shared in-memory database
+            self._uri = f"file:dlg_editor_mem_{next(self._memory_ids)}?mode=memory&cache=shared"
+        else:
+            self._uri = None
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._closed = False
+        self._file_listeners: List[Callable[[str, List[str]], None]] = []
+
+        self._write_queue: "queue.Queue" = queue.Queue()
+        self._writer_conn = self._connect()
+        if not self._is_memory:
+            self._writer_conn.execute("PRAGMA journal_mode=WAL")
+        self._writer = threading.Thread(
+            target=self._writer_loop,
+            name="DbHandler-writer",
+            daemon=True
+        )
+        self._writer.start()
+
         self._create_tables()
-        
+        self._create_index_tables()
+        self._create_memory_tables()
+        self._create_journal_tables()
+        self._create_draft_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection with the settings shared by all threads."""
+        if self._uri:
+            conn = sqlite3.connect(self._uri, uri=True, timeout=30,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA read_uncommitted = 1")
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=30,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous = NORMAL")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _read_conn(self) -> sqlite3.Connection:
+        """Get the read connection owned by the calling thread."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def close_thread_connection(self) -> None:
+        """Close the calling thread's read connection (call before a worker thread exits)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        """Run a read-only query on the calling thread's connection."""
+        return self._read_conn().execute(sql, tuple(params)).fetchall()
+
+    def _query_one(self, sql: str, params: Iterable = ()) -> Optional[tuple]:
+        """Run a read-only query and return the first row, if any."""
+        return self._read_conn().execute(sql, tuple(params)).fetchone()
+
+    def _writer_loop(self):
+        """Drain the write queue, committing each batch in one transaction."""
+        stop = False
+        while not stop:
+            job = self._write_queue.get()
+            if job is self._STOP:
+                break
+            batch = [job]
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                try:
+                    job = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is self._STOP:
+                    stop = True
+                    break
+                batch.append(job)
+            self._apply_batch(batch)
+
+    def _apply_batch(self, batch: List[_WriteJob]) -> None:
+        """Apply queued jobs inside a single transaction.
+
+        Each job runs in its own savepoint, so a failing job is rolled back
+        and reported without discarding the rest of the batch.
+        """
+        cursor = self._writer_conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for job in batch:
+                cursor.execute("SAVEPOINT job")
+                try:
+                    for sql, params, many in job.statements:
+                        if many:
+                            cursor.executemany(sql, params)
+                        else:
+                            cursor.execute(sql, params)
+                    if job.func is not None:
+                        job.result = job.func(cursor)
+                    cursor.execute("RELEASE job")
+                except Exception as e:
+                    job.error = e
+                    cursor.execute("ROLLBACK TO job")
+                    cursor.execute("RELEASE job")
+            cursor.execute("COMMIT")
+        except Exception as e:
+            if self._writer_conn.in_transaction:
+                self._writer_conn.execute("ROLLBACK")
+            for job in batch:
+                job.error = job.error or e
+        finally:
+            cursor.close()
+            for job in batch:
+                if job.error is not None and job.is_async:
+                    print(f"Error in queued database write: {job.error}")
+                job.done.set()
+
+    def _submit(self, job: _WriteJob, wait: bool = True) -> Any:
+        """Queue a job for the writer thread, optionally waiting for its commit."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        if threading.current_thread() is self._writer:
+            raise RuntimeError("Database writes cannot be queued from the writer thread")
+        job.is_async = not wait
+        self._write_queue.put(job)
+        if not wait:
+            return None
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def execute_write(self, sql: str, params: Iterable = (), wait: bool = True) -> None:
+        """Queue a single write statement."""
+        self._submit(_WriteJob([(sql, tuple(params), False)]), wait)
+
+    def execute_many(self, sql: str, seq_of_params: Iterable[Iterable], wait: bool = True) -> None:
+        """Queue a statement to run once per parameter tuple."""
+        self._submit(_WriteJob([(sql, [tuple(p) for p in seq_of_params], True)]), wait)
+
+    def run_in_writer(self, func: Callable[[sqlite3.Cursor], Any], wait: bool = True) -> Any:
+        """Run ``func(cursor)`` on the writer thread inside a transaction and return its result."""
+        return self._submit(_WriteJob(func=func), wait)
+
+    @contextmanager
+    def transaction(self, wait: bool = True):
+        """Group writes so they are committed atomically.
+
+        Usage::
+
+            with db.transaction() as tx:
+                tx.execute("UPDATE ...", (...))
+                tx.executemany("INSERT ...", rows)
+        """
+        tx = Transaction()
+        yield tx
+        if tx.statements:
+            self._submit(_WriteJob(tx.statements), wait)
+
+    def flush(self) -> None:
+        """Block until every previously queued write has been committed."""
+        self._submit(_WriteJob(), wait=True)
+
     def _create_tables(self):
         """Create necessary tables if they don't exist."""
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS game_config (
-                id INTEGER PRIMARY KEY,
-                game_path TEXT NOT NULL
-            )
-        """)
-        
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS dlg_files (
-                id INTEGER PRIMARY KEY,
-                file_path TEXT NOT NULL UNIQUE,
-                relative_path TEXT NOT NULL,
-                is_translated BOOLEAN DEFAULT 0,
-                last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        with self.transaction() as tx:
+            tx.execute("""
+                CREATE TABLE IF NOT EXISTS game_config (
+                    id INTEGER PRIMARY KEY,
+                    game_path TEXT NOT NULL
+                )
+            """)
+
+            tx.execute("""
+                CREATE TABLE IF NOT EXISTS dlg_files (
+                    id INTEGER PRIMARY KEY,
+                    file_path TEXT NOT NULL UNIQUE,
+                    relative_path TEXT NOT NULL,
+                    is_translated BOOLEAN DEFAULT 0,
+                    last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+        # Columns added after the first release
+        self._ensure_column("dlg_files", "source_hash", "TEXT")  # Content hash when first scanned
+        self._ensure_column("dlg_files", "content_hash", "TEXT")  # Content hash as last seen
+        self._ensure_column("dlg_files", "file_size", "INTEGER")
+        self._ensure_column("dlg_files", "file_mtime", "REAL")
+        self._ensure_column("dlg_files", "parent_dir", "TEXT")  # Normalized directory, for the file tree
+        self.execute_write("CREATE INDEX IF NOT EXISTS idx_dlg_files_source_hash ON dlg_files (source_hash)")
+        self.execute_write("CREATE INDEX IF NOT EXISTS idx_dlg_files_parent_dir ON dlg_files (parent_dir)")
+
+        # Fill in directories for rows written by older versions
+        missing = self._query("SELECT file_path, relative_path FROM dlg_files WHERE parent_dir IS NULL")
+        if missing:
+            self.execute_many(
+                "UPDATE dlg_files SET parent_dir = ? WHERE file_path = ?",
+                [(parent_dir(relative_path), file_path) for file_path, relative_path in missing]
             )
-        """)
-        self.conn.commit()
-        
+
+    def _ensure_column(self, table: str, column: str, declaration: str) -> None:
+        """Add a column to an existing table if an older database lacks it."""
+        columns = {row[1] for row in self._query(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            self.execute_write(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+    def _create_index_tables(self):
+        """Create the full-text index over extracted dialog text.
+
+        FTS5 ships with the sqlite3 module on all supported platforms, but if
+        it is missing the rest of the database keeps working and searches
+        raise instead.
+        """
+        with self.transaction() as tx:
+            tx.execute("""
+                CREATE TABLE IF NOT EXISTS text_index_files (
+                    file_path TEXT PRIMARY KEY,
+                    file_size INTEGER NOT NULL,
+                    file_mtime REAL NOT NULL,
+                    section_count INTEGER NOT NULL,
+                    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            tx.execute("""
+                CREATE TABLE IF NOT EXISTS dialog_sections (
+                    id INTEGER PRIMARY KEY,
+                    file_path TEXT NOT NULL,
+                    section_index INTEGER NOT NULL,
+                    start_offset INTEGER NOT NULL,
+                    original_text TEXT NOT NULL,
+                    current_text TEXT NOT NULL,
+                    UNIQUE (file_path, section_index)
+                )
+            """)
+        try:
+            # External-content FTS table kept in sync with dialog_sections by triggers
+            with self.transaction() as tx:
+                tx.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS dialog_text USING fts5(
+                        original_text,
+                        current_text,
+                        content = 'dialog_sections',
+                        content_rowid = 'id',
+                        tokenize = 'unicode61 remove_diacritics 0'
+                    )
+                """)
+                tx.execute("""
+                    CREATE TRIGGER IF NOT EXISTS dialog_sections_ai AFTER INSERT ON dialog_sections BEGIN
+                        INSERT INTO dialog_text (rowid, original_text, current_text)
+                        VALUES (new.id, new.original_text, new.current_text);
+                    END
+                """)
+                tx.execute("""
+                    CREATE TRIGGER IF NOT EXISTS dialog_sections_ad AFTER DELETE ON dialog_sections BEGIN
+                        INSERT INTO dialog_text (dialog_text, rowid, original_text, current_text)
+                        VALUES ('delete', old.id, old.original_text, old.current_text);
+                    END
+                """)
+            self.fts_available = True
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable: {e}")
+            self.fts_available = False
+
+    def _create_memory_tables(self):
+        """Create the translation memory and its n-gram lookup table."""
+        with self.transaction() as tx:
+            tx.execute("""
+                CREATE TABLE IF NOT EXISTS translation_memory (
+                    id INTEGER PRIMARY KEY,
+                    source_key TEXT NOT NULL UNIQUE,
+                    source_text TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    byte_length INTEGER NOT NULL,
+                    ngram_count INTEGER NOT NULL,
+                    use_count INTEGER DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            tx.execute("""
+                CREATE TABLE IF NOT EXISTS tm_ngrams (
+                    ngram TEXT NOT NULL,
+                    entry_id INTEGER NOT NULL,
+                    PRIMARY KEY (ngram, entry_id)
+                ) WITHOUT ROWID
+            """)
+
+    def _create_journal_tables(self):
+        """Create the append-only journal of saved section edits."""
+        with self.transaction() as tx:
+            tx.execute("""
+                CREATE TABLE IF NOT EXISTS edit_journal (
+                    id INTEGER PRIMARY KEY,
+                    save_id INTEGER NOT NULL,
+                    file_path TEXT NOT NULL,
+                    section_index INTEGER NOT NULL,
+                    old_text TEXT NOT NULL,
+                    diff TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    reverts_save_id INTEGER,
+                    undone BOOLEAN DEFAULT 0
+                )
+            """)
+            tx.execute("CREATE INDEX IF NOT EXISTS idx_edit_journal_file ON edit_journal (file_path, id)")
+            tx.execute("CREATE INDEX IF NOT EXISTS idx_edit_journal_time ON edit_journal (created_at)")
+
+    def _create_draft_tables(self):
+        """Create the table of batch-translated drafts awaiting review."""
+        with self.transaction() as tx:
+            tx.execute("""
+                CREATE TABLE IF NOT EXISTS translation_drafts (
+                    file_path TEXT NOT NULL,
+                    section_index INTEGER NOT NULL,
+                    source_text TEXT NOT NULL,
+                    draft TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 1,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (file_path, section_index)
+                )
+            """)
+
+    def add_file_listener(self, callback: Callable[[str, List[str]], None]) -> None:
+        """Call callback(kind, file_paths) after every committed change to dlg_files.
+
+        The callback runs on the thread that made the change.
+        """
+        self._file_listeners.append(callback)
+
+    def remove_file_listener(self, callback: Callable[[str, List[str]], None]) -> None:
+        if callback in self._file_listeners:
+            self._file_listeners.remove(callback)
+
+    def _notify_files(self, kind: str, file_paths: List[str]) -> None:
+        for callback in list(self._file_listeners):
+            try:
+                callback(kind, file_paths)
+            except Exception as e:
+                print(f"Error in file listener: {e}")
+
     def set_game_path(self, path: str) -> None:
         """Set or update the game path."""
-        self.cursor.execute("DELETE FROM game_config")  # Clear existing
-        self.cursor.execute("INSERT INTO game_config (game_path) VALUES (?)", (path,))
-        self.conn.commit()
-        
+        with self.transaction() as tx:
+            tx.execute("DELETE FROM game_config")  # Clear existing
+            tx.execute("INSERT INTO game_config (game_path) VALUES (?)", (path,))
+
     def get_game_path(self) -> Optional[str]:
         """Get the configured game path."""
-        self.cursor.execute("SELECT game_path FROM game_config LIMIT 1")
-        result = self.cursor.fetchone()
+        result = self._query_one("SELECT game_path FROM game_config LIMIT 1")
         return result[0] if result else None
-        
+
     def add_dlg_file(self, file_path: str, relative_path: str) -> None:
         """Add or update a DLG file in the database."""
-        self.cursor.execute("""
-            INSERT OR REPLACE INTO dlg_files (file_path, relative_path)
-            VALUES (?, ?)
-        """, (file_path, relative_path))
-        self.conn.commit()
-        
+        self.execute_write("""
+            INSERT OR REPLACE INTO dlg_files (file_path, relative_path, parent_dir)
+            VALUES (?, ?, ?)
+        """, (file_path, relative_path, parent_dir(relative_path)))
+        self._notify_files(self.FILES_ADDED, [file_path])
+
+    def add_dlg_files(self, files: Iterable[Tuple[str, str]], keep_existing: bool = False) -> None:
+        """Add many (file_path, relative_path) pairs in one transaction.
+
+        Existing rows are replaced (resetting their status) unless
+        keep_existing is set, in which case they are left untouched.
+        """
+        files = list(files)
+        if not files:
+            return
+        verb = "INSERT OR IGNORE" if keep_existing else "INSERT OR REPLACE"
+        self.execute_many(f"""
+            {verb} INTO dlg_files (file_path, relative_path, parent_dir)
+            VALUES (?, ?, ?)
+        """, [(file_path, relative_path, parent_dir(relative_path)) for file_path, relative_path in files])
+        self._notify_files(self.FILES_ADDED, [file_path for file_path, _ in files])
+
+    def remove_dlg_files(self, file_paths: Iterable[str]) -> None:
+        """Remove files from the database in one transaction."""
+        params = [(file_path,) for file_path in file_paths]
+        if params:
+            self.execute_many("DELETE FROM dlg_files WHERE file_path = ?", params)
+            self._notify_files(self.FILES_REMOVED, [file_path for file_path, in params])
+
     def get_all_files(self) -> List[Tuple[str, str, bool]]:
         """Get all DLG files with their paths and translation status."""
-        self.cursor.execute("""
-            SELECT file_path, relative_path, is_translated 
-            FROM dlg_files 
+        return self._query("""
+            SELECT file_path, relative_path, is_translated
+            FROM dlg_files
             ORDER BY relative_path
         """)
-        return self.cursor.fetchall()
-        
+
+    def get_directories(self) -> List[str]:
+        """Get every directory that directly contains files, '/'-separated."""
+        return [row[0] for row in self._query("SELECT DISTINCT parent_dir FROM dlg_files")]
+
+    def get_files_in_dir(self, directory: str) -> List[Tuple[str, str, bool]]:
+        """Get the files directly inside a directory as returned by get_directories."""
+        return self._query("""
+            SELECT file_path, relative_path, is_translated
+            FROM dlg_files
+            WHERE parent_dir = ?
+        """, (directory,))
+
+    def get_untranslated_files(self) -> List[Tuple[str, str]]:
+        """Get (file_path, relative_path) of files still to translate, excluding not required ones."""
+        return self._query("""
+            SELECT file_path, relative_path
+            FROM dlg_files
+            WHERE is_translated = 0 AND relative_path NOT LIKE 'NOT_REQUIRED:%'
+        """)
+
+    def get_files(self, file_paths: Iterable[str]) -> List[Tuple[str, str, bool]]:
+        """Get the (file_path, relative_path, is_translated) rows of specific files."""
+        file_paths = list(file_paths)
+        rows = []
+        for start in range(0, len(file_paths), 500):
+            chunk = file_paths[start:start + 500]
+            rows.extend(self._query(f"""
+                SELECT file_path, relative_path, is_translated
+                FROM dlg_files
+                WHERE file_path IN ({', '.join('?' * len(chunk))})
+            """, chunk))
+        return rows
+
     def set_translated_status(self, file_path: str, is_translated: bool) -> None:
         """Mark a file as translated or not."""
-        self.cursor.execute("""
-            UPDATE dlg_files 
+        self.execute_write("""
+            UPDATE dlg_files
             SET is_translated = ?, last_modified = CURRENT_TIMESTAMP
             WHERE file_path = ?
         """, (is_translated, file_path))
-        self.conn.commit()
-        
+        self._notify_files(self.FILES_UPDATED, [file_path])
+
     def is_file_translated(self, file_path: str) -> bool:
         """Check if a file is marked as translated."""
-        self.cursor.execute("""
-            SELECT is_translated 
-            FROM dlg_files 
+        result = self._query_one("""
+            SELECT is_translated
+            FROM dlg_files
             WHERE file_path = ?
         """, (file_path,))
-        result = self.cursor.fetchone()
         return bool(result[0]) if result else False
-        
+
+    def set_translated_status_many(self, file_paths: Iterable[str], is_translated: bool) -> None:
+        """Mark many files as translated or not in one transaction."""
+        file_paths = list(file_paths)
+        if not file_paths:
+            return
+        self.execute_many("""
+            UPDATE dlg_files
+            SET is_translated = ?, last_modified = CURRENT_TIMESTAMP
+            WHERE file_path = ?
+        """, [(is_translated, file_path) for file_path in file_paths])
+        self._notify_files(self.FILES_UPDATED, file_paths)
+
+    def get_hash_states(self) -> Dict[str, Tuple[Optional[int], Optional[float], Optional[str]]]:
+        """Get the (size, mtime, content_hash) recorded for every file."""
+        rows = self._query("SELECT file_path, file_size, file_mtime, content_hash FROM dlg_files")
+        return {file_path: (size, mtime, content_hash) for file_path, size, mtime, content_hash in rows}
+
+    def set_file_hashes(self, rows: Iterable[Tuple[str, str, int, float]]) -> None:
+        """Record (file_path, content_hash, size, mtime) for scanned files.
+
+        The first hash recorded for a file is also kept as its source hash,
+        which groups files that shipped identical even after one of them
+        has been translated.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        self.execute_many("""
+            UPDATE dlg_files
+            SET content_hash = ?, file_size = ?, file_mtime = ?,
+                source_hash = COALESCE(source_hash, ?)
+            WHERE file_path = ?
+        """, [(content_hash, size, mtime, content_hash, file_path) for file_path, content_hash, size, mtime in rows])
+        self._notify_files(self.FILES_HASHED, [file_path for file_path, _, _, _ in rows])
+
+    def get_identical_files(self, file_path: str) -> List[Tuple[str, str, bool, bool]]:
+        """Get the other files that shipped with the same content as file_path.
+
+        Returns (file_path, relative_path, is_translated, is_unchanged)
+        tuples; is_unchanged means the file still has its original content.
+        """
+        return [
+            (path, relative_path, bool(is_translated), bool(is_unchanged))
+            for path, relative_path, is_translated, is_unchanged in self._query("""
+                SELECT other.file_path, other.relative_path, other.is_translated,
+                       other.content_hash = other.source_hash
+                FROM dlg_files AS this
+                JOIN dlg_files AS other
+                    ON other.source_hash = this.source_hash AND other.file_path != this.file_path
+                WHERE this.file_path = ?
+                ORDER BY other.relative_path
+            """, (file_path,))
+        ]
+
+    def get_duplicate_counts(self) -> Dict[str, int]:
+        """Map each file that has identical twins to the size of its group."""
+        rows = self._query("""
+            SELECT f.file_path, g.members
+            FROM dlg_files AS f
+            JOIN (
+                SELECT source_hash, COUNT(*) AS members
+                FROM dlg_files
+                WHERE source_hash IS NOT NULL
+                GROUP BY source_hash
+                HAVING COUNT(*) > 1
+            ) AS g ON g.source_hash = f.source_hash
+        """)
+        return dict(rows)
+
+    def get_duplicate_stats(self) -> Tuple[int, int]:
+        """Get (unique contents, files that duplicate another file's content)."""
+        total, unique = self._query_one("""
+            SELECT COUNT(*), COUNT(DISTINCT source_hash)
+            FROM dlg_files
+            WHERE source_hash IS NOT NULL
+        """)
+        return unique, total - unique
+
+    def replace_all_files(self, files: Iterable[Tuple[str, str]],
+                          hashes: Iterable[Tuple[str, str, int, float]]) -> None:
+        """Replace the whole file table with (file_path, relative_path) pairs and their hashes.
+
+        Done in one transaction, so readers see either the old table or the
+        complete new one.
+        """
+        files = list(files)
+        hashes = list(hashes)
+        with self.transaction() as tx:
+            tx.execute("DELETE FROM dlg_files")
+            tx.executemany("""
+                INSERT OR REPLACE INTO dlg_files (file_path, relative_path, parent_dir)
+                VALUES (?, ?, ?)
+            """, [(file_path, relative_path, parent_dir(relative_path)) for file_path, relative_path in files])
+            tx.executemany("""
+                UPDATE dlg_files
+                SET content_hash = ?, file_size = ?, file_mtime = ?, source_hash = ?
+                WHERE file_path = ?
+            """, [(content_hash, size, mtime, content_hash, file_path) for file_path, content_hash, size, mtime in hashes])
+        self._notify_files(self.FILES_CLEARED, [])
+        self._notify_files(self.FILES_ADDED, [file_path for file_path, _ in files])
+        self._notify_files(self.FILES_HASHED, [file_path for file_path, _, _, _ in hashes])
+
     def clear_all_files(self) -> None:
         """Clear all DLG files from the database."""
-        self.cursor.execute("DELETE FROM dlg_files")
-        self.conn.commit()
-        
+        self.execute_write("DELETE FROM dlg_files")
+        self._notify_files(self.FILES_CLEARED, [])
+
     def close(self):
-        """Close the database connection."""
-        self.conn.close()
-        
+        """Flush pending writes and close every connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._write_queue.put(self._STOP)
+        self._writer.join()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
     def __enter__(self):
         return self
-        
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
-        
+
     def update_relative_path(self, file_path: str, new_relative_path: str) -> None:
         """Update the relative path for a file."""
-        self.cursor.execute("""
-            UPDATE dlg_files 
-            SET relative_path = ?
+        self.execute_write("""
+            UPDATE dlg_files
+            SET relative_path = ?, parent_dir = ?
             WHERE file_path = ?
-        """, (new_relative_path, file_path))
-        self.conn.commit()
-        
+        """, (new_relative_path, parent_dir(new_relative_path), file_path))
+        self._notify_files(self.FILES_UPDATED, [file_path])
+
     def get_relative_path(self, file_path: str) -> str:
         """Get the relative path for a file."""
-        self.cursor.execute("""
-            SELECT relative_path 
-            FROM dlg_files 
+        result = self._query_one("""
+            SELECT relative_path
+            FROM dlg_files
             WHERE file_path = ?
         """, (file_path,))
-        result = self.cursor.fetchone()
-        return result[0] if result else None 
\ No newline at end of file
+        return result[0] if result else None
+
+    # Full-text index over extracted dialog text
+
+    def get_index_states(self) -> Dict[str, Tuple[int, float]]:
+        """Get the (size, mtime) each indexed file had when it was last indexed."""
+        rows = self._query("SELECT file_path, file_size, file_mtime FROM text_index_files")
+        return {file_path: (size, mtime) for file_path, size, mtime in rows}
+
+    def get_index_state(self, file_path: str) -> Optional[Tuple[int, float]]:
+        """Get the (size, mtime) a file had when it was last indexed."""
+        result = self._query_one("""
+            SELECT file_size, file_mtime
+            FROM text_index_files
+            WHERE file_path = ?
+        """, (file_path,))
+        return tuple(result) if result else None
+
+    def replace_file_sections(self, file_path: str, sections: List[Tuple[int, int, str]],
+                              file_size: int, file_mtime: float, wait: bool = True) -> None:
+        """Replace the indexed sections of a file.
+
+        ``sections`` holds (section_index, start_offset, text) tuples as currently
+        extracted from disk. The first text ever indexed for a section is kept
+        as its original text, so the source dialog stays searchable after the
+        file has been translated.
+        """
+        def apply(cursor):
+            cursor.execute("""
+                SELECT section_index, original_text
+                FROM dialog_sections
+                WHERE file_path = ?
+            """, (file_path,))
+            originals = dict(cursor.fetchall())
+            cursor.execute("DELETE FROM dialog_sections WHERE file_path = ?", (file_path,))
+            cursor.executemany("""
+                INSERT INTO dialog_sections (file_path, section_index, start_offset, original_text, current_text)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (file_path, index, start, originals.get(index, text), text)
+                for index, start, text in sections
+            ])
+            cursor.execute("""
+                INSERT OR REPLACE INTO text_index_files (file_path, file_size, file_mtime, section_count)
+                VALUES (?, ?, ?, ?)
+            """, (file_path, file_size, file_mtime, len(sections)))
+
+        self.run_in_writer(apply, wait=wait)
+
+    def remove_from_index(self, file_paths: Iterable[str], wait: bool = True) -> None:
+        """Drop files from the full-text index."""
+        params = [(path,) for path in file_paths]
+        if not params:
+            return
+        with self.transaction(wait=wait) as tx:
+            tx.executemany("DELETE FROM dialog_sections WHERE file_path = ?", params)
+            tx.executemany("DELETE FROM text_index_files WHERE file_path = ?", params)
+
+    def search_text(self, query: str, mode: str = "phrase", limit: int = 50) -> List[Tuple[str, int, int, str, str, float]]:
+        """Search indexed dialog text, best matches first.
+
+        mode is one of:
+        - 'phrase': the words must appear next to each other, in order
+        - 'prefix': every word must start a word in the section
+        - 'query': raw FTS5 query syntax (AND/OR/NOT, NEAR, column filters)
+
+        Returns (file_path, section_index, start_offset, original_text,
+        current_text, rank) tuples; lower rank is better.
+        """
+        self._require_fts()
+        words = query.split()
+        if not words:
+            return []
+        if mode == "phrase":
+            match = self._fts_quote(" ".join(words))
+        elif mode == "prefix":
+            match = " ".join(self._fts_quote(word) + "*" for word in words)
+        elif mode == "query":
+            match = query
+        else:
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        return self._query("""
+            SELECT s.file_path, s.section_index, s.start_offset, s.original_text, s.current_text, dialog_text.rank
+            FROM dialog_text
+            JOIN dialog_sections s ON s.id = dialog_text.rowid
+            WHERE dialog_text MATCH ?
+            ORDER BY dialog_text.rank
+            LIMIT ?
+        """, (match, limit))
+
+    @staticmethod
+    def _fts_quote(text: str) -> str:
+        """Quote text as an FTS5 string so punctuation is not parsed as syntax."""
+        return '"' + text.replace('"', '""') + '"'
+
+    def _require_fts(self) -> None:
+        if not self.fts_available:
+            raise RuntimeError("Full-text search is not available in this SQLite build")
+
+    # Translation memory
+
+    def tm_store(self, source_key: str, source_text: str, translation: str,
+                 byte_length: int, ngrams: Iterable[str], wait: bool = True) -> None:
+        """Insert or replace the memory entry for a normalized source text."""
+        ngrams = sorted(set(ngrams))
+
+        def apply(cursor):
+            cursor.execute("""
+                INSERT INTO translation_memory (source_key, source_text, translation, byte_length, ngram_count)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (source_key) DO UPDATE SET
+                    source_text = excluded.source_text,
+                    translation = excluded.translation,
+                    byte_length = excluded.byte_length,
+                    ngram_count = excluded.ngram_count,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (source_key, source_text, translation, byte_length, len(ngrams)))
+            cursor.execute("SELECT id FROM translation_memory WHERE source_key = ?", (source_key,))
+            entry_id = cursor.fetchone()[0]
+            cursor.execute("DELETE FROM tm_ngrams WHERE entry_id = ?", (entry_id,))
+            cursor.executemany(
+                "INSERT INTO tm_ngrams (ngram, entry_id) VALUES (?, ?)",
+                [(ngram, entry_id) for ngram in ngrams]
+            )
+
+        self.run_in_writer(apply, wait=wait)
+
+    def tm_get(self, source_key: str) -> Optional[Tuple[int, str, str, int]]:
+        """Get (id, source_text, translation, byte_length) for an exact source key."""
+        return self._query_one("""
+            SELECT id, source_text, translation, byte_length
+            FROM translation_memory
+            WHERE source_key = ?
+        """, (source_key,))
+
+    def tm_candidates(self, ngrams: Iterable[str], limit: int = 50) -> List[Tuple[int, str, str, int, int, int]]:
+        """Get entries sharing the most n-grams with a query.
+
+        Returns (id, source_text, translation, byte_length, ngram_count,
+        shared_ngrams) tuples, most shared first.
+        """
+        ngrams = list(set(ngrams))
+        if not ngrams:
+            return []
+        placeholders = ",".join("?" * len(ngrams))
+        return self._query(f"""
+            SELECT tm.id, tm.source_text, tm.translation, tm.byte_length, tm.ngram_count, hits.shared
+            FROM (
+                SELECT entry_id, COUNT(*) AS shared
+                FROM tm_ngrams
+                WHERE ngram IN ({placeholders})
+                GROUP BY entry_id
+                ORDER BY shared DESC
+                LIMIT ?
+            ) AS hits
+            JOIN translation_memory tm ON tm.id = hits.entry_id
+            ORDER BY hits.shared DESC
+        """, (*ngrams, limit))
+
+    def tm_mark_used(self, entry_ids: Iterable[int]) -> None:
+        """Count reuses of memory entries without waiting for the write."""
+        params = [(entry_id,) for entry_id in entry_ids]
+        if params:
+            self.execute_many(
+                "UPDATE translation_memory SET use_count = use_count + 1 WHERE id = ?",
+                params,
+                wait=False
+            )
+
+    # Edit journal
+
+    def journal_append(self, rows: List[Tuple[int, str, int, str, str, float, Optional[int]]],
+                       wait: bool = False) -> None:
+        """Append journal rows without blocking the caller by default.
+
+        Rows are (save_id, file_path, section_index, old_text, diff,
+        created_at, reverts_save_id). A row that reverts an earlier save
+        marks that save as undone in the same transaction.
+        """
+        if not rows:
+            return
+        reverted = {(row[6],) for row in rows if row[6] is not None}
+        with self.transaction(wait=wait) as tx:
+            tx.executemany("""
+                INSERT INTO edit_journal
+                    (save_id, file_path, section_index, old_text, diff, created_at, reverts_save_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            if reverted:
+                tx.executemany("UPDATE edit_journal SET undone = 1 WHERE save_id = ?", reverted)
+
+    def journal_entries(self, file_path: Optional[str] = None, since: Optional[float] = None,
+                        until: Optional[float] = None) -> List[Tuple[int, int, str, int, str, str, float, Optional[int], bool]]:
+        """Get journal rows in the order they were written.
+
+        Returns (id, save_id, file_path, section_index, old_text, diff,
+        created_at, reverts_save_id, undone) tuples.
+        """
+        conditions = []
+        params = []
+        if file_path is not None:
+            conditions.append("file_path = ?")
+            params.append(file_path)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("created_at <= ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query(f"""
+            SELECT id, save_id, file_path, section_index, old_text, diff, created_at, reverts_save_id, undone
+            FROM edit_journal
+            {where}
+            ORDER BY id
+        """, params)
+
+    # Translation drafts
+
+    def draft_store(self, rows: Iterable[Tuple[str, int, str, Optional[str], Optional[str], float]],
+                    wait: bool = False) -> None:
+        """Record batch translation results without blocking the caller by default.
+
+        Rows are (file_path, section_index, source_text, draft, error,
+        updated_at); a failed attempt has a None draft and an error message.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        self.execute_many("""
+            INSERT INTO translation_drafts (file_path, section_index, source_text, draft, error, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (file_path, section_index) DO UPDATE SET
+                source_text = excluded.source_text,
+                draft = excluded.draft,
+                error = excluded.error,
+                attempts = attempts + 1,
+                updated_at = excluded.updated_at
+        """, rows, wait=wait)
+
+    def get_drafted_sources(self) -> Dict[Tuple[str, int], str]:
+        """Get {(file_path, section_index): source_text} of every section with a draft."""
+        rows = self._query("""
+            SELECT file_path, section_index, source_text
+            FROM translation_drafts
+            WHERE draft IS NOT NULL
+        """)
+        return {(file_path, section_index): source_text for file_path, section_index, source_text in rows}
+
+    def get_drafts(self, file_path: str) -> List[Tuple[int, str, str]]:
+        """Get (section_index, source_text, draft) of a file's successful drafts."""
+        return self._query("""
+            SELECT section_index, source_text, draft
+            FROM translation_drafts
+            WHERE file_path = ? AND draft IS NOT NULL
+            ORDER BY section_index
+        """, (file_path,))
+
+    def get_draft_counts(self) -> Tuple[int, int]:
+        """Get (drafted sections, sections whose last attempt failed)."""
+        result = self._query_one("""
+            SELECT COUNT(draft), COUNT(*) - COUNT(draft)
+            FROM translation_drafts
+        """)
+        return result[0] or 0, result[1] or 0
+
+    def journal_last_undoable_save(self, file_path: str) -> Optional[int]:
+        """Get the most recent save of a file that is not an undo and has not been undone."""
+        result = self._query_one("""
+            SELECT save_id
+            FROM edit_journal
+            WHERE file_path = ? AND reverts_save_id IS NULL AND undone = 0
+            ORDER BY id DESC
+            LIMIT 1
+        """, (file_path,))
+        return result[0] if result else None
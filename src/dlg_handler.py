@@ -57,6 +57,20 @@ class TextSection:
         trailing_size = len(self.trailing_control.encode(self.encoding)) if self.trailing_control else 0
         return self.end - self.start - trailing_size
 
+def max_text_bytes(section: TextSection, index: int) -> int:
+    """Get the bytes available for a section's text, including padding."""
+    current_text_bytes = len(section.text.encode(section.encoding))
+    max_chars = section.get_max_text_space()
+
+    # If our calculation gives less space than what's already being used,
+    # there's a problem with our logic - default to the section size
+    if max_chars < current_text_bytes:
+        trailing_control_size = len(section.trailing_control.encode(section.encoding)) if section.trailing_control else 0
+        print(f"Section {index + 1}: WARNING - Calculated max chars ({max_chars}) is less than current text size ({current_text_bytes})!")
+        print(f"Section {index + 1}: Falling back to section size minus trailing control")
+        max_chars = section.end - section.start - trailing_control_size
+    return max_chars
+
 class DlgHandler:
     # Special control characters from the spec
     CONTROL_CHARS = {
@@ -72,9 +86,10 @@ class DlgHandler:
         'COORDINATES': 'Џ'
     }
 
-    def __init__(self, filepath: str):
-        """Initialize the DLG handler with a file path."""
+    def __init__(self, filepath: str, quiet: bool = False):
+        """Initialize the DLG handler with a file path; quiet turns off its diagnostic output."""
         self.filepath = filepath
+        self.quiet = quiet
         self.encoding = None
         self._original_binary = None
         self.text_sections = []  # List of TextSection objects
@@ -83,6 +98,10 @@ class DlgHandler:
         # Define characters that should never be treated as control characters
         self._excluded_control_chars = [" ", ".", ",", "!", "?", ":", ";", "-", "—", "(", ")", "[", "]", "…"]
 
+    def _log(self, *args, **kwargs) -> None:
+        if not self.quiet:
+            print(*args, **kwargs)
+
     def _analyze_binary(self) -> Dict[str, any]:
         """Analyze binary content to determine structure and encoding."""
         analysis = {
@@ -103,14 +122,14 @@ class DlgHandler:
                 analysis['non_cp1251_positions'].append(i)
         
         # Print analysis
-        print("\nFile Analysis:")
-        print(f"Total bytes: {analysis['total_bytes']}")
-        print(f"Non-CP1251 bytes: {len(analysis['non_cp1251_positions'])} positions")
-        print("\nFirst few non-CP1251 bytes:")
+        self._log("\nFile Analysis:")
+        self._log(f"Total bytes: {analysis['total_bytes']}")
+        self._log(f"Non-CP1251 bytes: {len(analysis['non_cp1251_positions'])} positions")
+        self._log("\nFirst few non-CP1251 bytes:")
         for pos in analysis['non_cp1251_positions'][:5]:
             byte = self._original_binary[pos]
             context = self._original_binary[max(0, pos-5):min(len(self._original_binary), pos+6)]
-            print(f"Position {pos}: 0x{byte:02x} (context: {context})")
+            self._log(f"Position {pos}: 0x{byte:02x} (context: {context})")
             
         return analysis
 
@@ -159,7 +178,7 @@ class DlgHandler:
             try:
                 self._extract_text_sections()
             except Exception as e:
-                print(f"Error extracting text sections: {e}")
+                self._log(f"Error extracting text sections: {e}")
                 # Fallback to a simpler extraction method
                 self._extract_text_sections_simple()
                 
@@ -174,7 +193,7 @@ class DlgHandler:
             ]
             filtered_count = original_count - len(self.text_sections)
             if filtered_count > 0:
-                print(f"Secondary filter removed {filtered_count} additional control code sequences")
+                self._log(f"Secondary filter removed {filtered_count} additional control code sequences")
                 
             # Third-pass filtering for extremely specific cases
             # Like the "ьэ,р" pattern or other similar short sequences
@@ -201,8 +220,8 @@ class DlgHandler:
             # and force-fix any instances directly
             for section in self.text_sections:
                 if "Я пришел на турнир" in section.text:
-                    print(f"DIRECT HEX FIX - Found target text: '{section.text}'")
-                    print(f"   Hex representation: {' '.join([f'{ord(c):02x}' for c in section.text])}")
+                    self._log(f"DIRECT HEX FIX - Found target text: '{section.text}'")
+                    self._log(f"   Hex representation: {' '.join([f'{ord(c):02x}' for c in section.text])}")
                     
                     # Find the first period in the text
                     period_index = section.text.find(".")
@@ -211,8 +230,8 @@ class DlgHandler:
                         fixed_text = section.text[:period_index+1]
                         trailing_part = section.text[period_index+1:]
                         
-                        print(f"   FORCE FIXING Section: '{section.text}' -> '{fixed_text}'")
-                        print(f"   Moving to trailing control: '{trailing_part}'")
+                        self._log(f"   FORCE FIXING Section: '{section.text}' -> '{fixed_text}'")
+                        self._log(f"   Moving to trailing control: '{trailing_part}'")
                         
                         # Update the section
                         section.trailing_control = trailing_part + section.trailing_control
@@ -229,7 +248,7 @@ class DlgHandler:
             self.text_sections.sort(key=lambda section: section.start)
                 
         except Exception as e:
-            print(f"Error reading file: {e}")
+            self._log(f"Error reading file: {e}")
             raise
 
     def _check_for_problematic_bytes(self):
@@ -264,8 +283,8 @@ class DlgHandler:
                             marked_as_control.add(j)
         
         if problematic_bytes:
-            print(f"Warning: Found {len(problematic_bytes)} problematic bytes that may cause 'charmap' codec errors.")
-            print(f"First few problematic bytes: {problematic_bytes[:5]}")
+            self._log(f"Warning: Found {len(problematic_bytes)} problematic bytes that may cause 'charmap' codec errors.")
+            self._log(f"First few problematic bytes: {problematic_bytes[:5]}")
             
             # Create a sanitized copy of the binary
             sanitized_binary = bytearray(self._original_binary)
@@ -274,10 +293,10 @@ class DlgHandler:
                 sanitized_binary[pos] = 32  # ASCII space
                 
             self._original_binary = sanitized_binary
-            print("Sanitized binary data by replacing problematic bytes.")
+            self._log("Sanitized binary data by replacing problematic bytes.")
             
         if marked_as_control:
-            print(f"Identified {len(marked_as_control)} bytes as part of control code patterns.")
+            self._log(f"Identified {len(marked_as_control)} bytes as part of control code patterns.")
             # We don't modify these in the binary, but will use this information during extraction
 
     def _filter_problematic_sections(self):
@@ -291,7 +310,7 @@ class DlgHandler:
                 
                 # Check for replacement character
                 if '\ufffd' in section.text:
-                    print(f"Warning: Skipping section with replacement character: {section.text[:20]}...")
+                    self._log(f"Warning: Skipping section with replacement character: {section.text[:20]}...")
                     continue
                 
                 # Check if this text is primarily English
@@ -304,7 +323,7 @@ class DlgHandler:
                     # Only filter English text if it has unusual characters
                     unusual_chars = sum(1 for c in text if c in "ҐЏ°њ†ъЋЌ¬їѓ")
                     if unusual_chars > 0:
-                        print(f"Filtering out English text with control characters: {text}")
+                        self._log(f"Filtering out English text with control characters: {text}")
                         continue
                     # Otherwise, keep it
                     valid_sections.append(section)
@@ -314,7 +333,7 @@ class DlgHandler:
                 
                 # Check if this is likely a control code rather than actual text
                 if self._is_likely_control_code(section.text):
-                    print(f"Filtering out control code sequence: {section.text}")
+                    self._log(f"Filtering out control code sequence: {section.text}")
                     continue
                 
                 # Additional checks to filter out control sequences that look like text
@@ -331,7 +350,7 @@ class DlgHandler:
                 
                 # Skip if it meets filtering criteria
                 if non_cyrillic_ratio > 0.5 or unusual_ratio > 0.3 or is_short_unusual:
-                    print(f"Filtering out control sequence: {text}")
+                    self._log(f"Filtering out control sequence: {text}")
                     continue
                 
                 # 4. Check if section looks like actual dialog text
@@ -342,12 +361,12 @@ class DlgHandler:
                 )
                 
                 if not has_good_text_pattern and len(text) < 15:
-                    print(f"Filtering out non-text pattern: {text}")
+                    self._log(f"Filtering out non-text pattern: {text}")
                     continue
 
                 valid_sections.append(section)
             except (UnicodeEncodeError, UnicodeDecodeError):
-                print(f"Warning: Skipping problematic section: {section.text[:20]}...")
+                self._log(f"Warning: Skipping problematic section: {section.text[:20]}...")
                 continue
                 
         # Update the text sections list
@@ -509,7 +528,7 @@ class DlgHandler:
                         
                         self.text_sections.append(section)
                 except Exception as e:
-                    print(f"Error processing section at position {text_start}: {e}")
+                    self._log(f"Error processing section at position {text_start}: {e}")
                     
             # Move to the next position
             current_pos = text_end + 1
@@ -589,19 +608,19 @@ class DlgHandler:
                     clean_text_positions = text_byte_positions.copy()
                     
                     # Print debug info for this specific section before processing
-                    print(f"DEBUG - Processing text: '{text}'")
+                    self._log(f"DEBUG - Processing text: '{text}'")
                     
                     # EXTREMELY SPECIFIC FIX - even more direct than before
                     # Check for the very specific text (ignoring spacing variations)
                     if "Я пришел на турнир" in text and "'" in text:
-                        print(f"APPLYING EMERGENCY FIX for text: '{text}'")
+                        self._log(f"APPLYING EMERGENCY FIX for text: '{text}'")
                         # Force the text to be exactly "Я пришел на турнир." no matter what
                         clean_text = "Я пришел на турнир."
                         # Everything after the base text is control chars
                         trailing_control = text[text.find(".") + 1:]
                         # Adjust byte positions to only include visible text
                         clean_text_positions = text_byte_positions[:len(clean_text)]
-                        print(f"EMERGENCY FIX: Text: '{clean_text}', Trailing: '{trailing_control}'")
+                        self._log(f"EMERGENCY FIX: Text: '{clean_text}', Trailing: '{trailing_control}'")
                     
                     # GENERAL PATTERN: Non-Cyrillic character immediately after punctuation
                     # This covers cases like "Герольд в Ближней деревне...Ж" or "Договорились. А что за дело?Q"
@@ -615,7 +634,7 @@ class DlgHandler:
                             trailing_control = text[punctuation_end:]
                             # Adjust byte positions
                             clean_text_positions = text_byte_positions[:len(clean_text)]
-                            print(f"Found trailing control after punctuation: '{trailing_control}'")
+                            self._log(f"Found trailing control after punctuation: '{trailing_control}'")
                     
                     # Detect trailing non-Cyrillic letters after sentences
                     # Like "делать!В" where В is control or "приз...Ђ" where Ђ is control
@@ -629,11 +648,11 @@ class DlgHandler:
                                 trailing_control = text[-1]
                                 # Adjust byte positions
                                 clean_text_positions = text_byte_positions[:len(clean_text)]
-                                print(f"Found trailing non-Cyrillic control character: '{trailing_control}'")
+                                self._log(f"Found trailing non-Cyrillic control character: '{trailing_control}'")
                     
                     # SUPER ULTRA SPECIFIC FIX for the exact text we know is causing problems
                     elif "Я пришел на турнир" in text and text.endswith("'"):
-                        print(f"APPLYING SPECIAL FIX for the known problematic text: '{text}'")
+                        self._log(f"APPLYING SPECIAL FIX for the known problematic text: '{text}'")
                         # Find the position of the last period
                         period_pos = text.rfind(".")
                         if period_pos >= 0:
@@ -642,11 +661,11 @@ class DlgHandler:
                             trailing_control = text[period_pos+1:]
                             # Adjust byte positions
                             clean_text_positions = clean_text_positions[:len(clean_text)]
-                            print(f"Direct fix applied - Text: '{clean_text}', Trailing control: '{trailing_control}'")
+                            self._log(f"Direct fix applied - Text: '{clean_text}', Trailing control: '{trailing_control}'")
                     
                     # HIGHLY SPECIFIC FIX for the "period + space + quote" pattern
                     elif re.search(r'[.!?]\s+[\'"]$', text):
-                        print(f"FOUND THE PROBLEMATIC PATTERN! Text: '{text}'")
+                        self._log(f"FOUND THE PROBLEMATIC PATTERN! Text: '{text}'")
                         # Find the position of the last non-whitespace/non-quote character
                         last_content_char_pos = -1
                         for i in range(len(text) - 1, -1, -1):
@@ -659,7 +678,7 @@ class DlgHandler:
                             clean_text = text[:last_content_char_pos+1]
                             # Adjust byte positions
                             clean_text_positions = clean_text_positions[:len(clean_text)]
-                            print(f"Fixed text: '{clean_text}', Trailing control: '{trailing_control}'")
+                            self._log(f"Fixed text: '{clean_text}', Trailing control: '{trailing_control}'")
                     
                     # Different types of trailing control character patterns:
                     
@@ -683,7 +702,7 @@ class DlgHandler:
                             trailing_control = text[punctuation_end:]
                             # Adjust byte positions
                             clean_text_positions = clean_text_positions[:len(clean_text)]
-                            print(f"Detected trailing quote as control character: '{trailing_control}'")
+                            self._log(f"Detected trailing quote as control character: '{trailing_control}'")
                     
                     # 3. Single non-Russian character after Russian text and punctuation
                     # Like "Что?!б" where 'б' is the control character
@@ -745,12 +764,12 @@ class DlgHandler:
                             clean_text = clean_text[:-1]
                             # Adjust byte positions
                             clean_text_positions = clean_text_positions[:len(clean_text)]
-                            print(f"Detected trailing quote as control character: '{trailing_control}'")
+                            self._log(f"Detected trailing quote as control character: '{trailing_control}'")
                     
                     # 6. Final catch-all for quotes after properly ended sentences (with whitespace in between)
                     # This is a safety mechanism for cases the above patterns missed
                     if "'.'" in clean_text or "'!" in clean_text or "'?" in clean_text:
-                        print(f"Special character sequence found in: '{clean_text}'")
+                        self._log(f"Special character sequence found in: '{clean_text}'")
                         
                     # Look for any lone quotes at the end, even after whitespace
                     match = re.search(r'([.!?])\s+([\'"])$', clean_text)
@@ -761,7 +780,7 @@ class DlgHandler:
                         trailing_control = trailing_part + trailing_control
                         # Adjust byte positions accordingly
                         clean_text_positions = clean_text_positions[:len(clean_text)]
-                        print(f"Caught trailing quote after whitespace: '{trailing_control}'")
+                        self._log(f"Caught trailing quote after whitespace: '{trailing_control}'")
                     
                     # Skip if it's too short or doesn't contain letters
                     # For longer text, require spaces or punctuation
@@ -821,26 +840,26 @@ class DlgHandler:
                         # Store the padding bytes
                         if padding_bytes:
                             section.padding_byte_positions = padding_bytes
-                            print(f"Found {len(padding_bytes)} padding bytes after text, available for expansion")
+                            self._log(f"Found {len(padding_bytes)} padding bytes after text, available for expansion")
                         
                         # Double-check our results - don't allow spaces + quotes at the end
                         if re.search(r'\s+[\'"]$', section.text):
-                            print(f"WARNING: Still found problematic pattern in final text: '{section.text}'")
+                            self._log(f"WARNING: Still found problematic pattern in final text: '{section.text}'")
                             # Force-fix it one more time
                             section.text = re.sub(r'\s+[\'"]$', '', section.text)
-                            print(f"Force-fixed to: '{section.text}'")
+                            self._log(f"Force-fixed to: '{section.text}'")
                         
                         # One more final check for trailing quotes
                         if section.text.endswith("'") or section.text.endswith('"'):
                             if re.search(r'[.!?]', section.text[:-1]):
                                 section.trailing_control = section.text[-1] + section.trailing_control
                                 section.text = section.text[:-1]
-                                print(f"Final quote removal - Text: '{section.text}', Control: '{section.trailing_control}'")
+                                self._log(f"Final quote removal - Text: '{section.text}', Control: '{section.trailing_control}'")
                         
                         self.text_sections.append(section)
-                        print(f"Final text: '{section.text}', Trailing control: '{section.trailing_control}'")
+                        self._log(f"Final text: '{section.text}', Trailing control: '{section.trailing_control}'")
                 except Exception as e:
-                    print(f"Error processing section at position {section_start}: {e}")
+                    self._log(f"Error processing section at position {section_start}: {e}")
                     
             # Move to the next position
             current_pos = section_end + 1
@@ -882,7 +901,7 @@ class DlgHandler:
         if section and hasattr(section, 'trailing_control') and section.trailing_control:
             trailing_len = len(section.trailing_control.encode(section.encoding))
             if trailing_len > 0:
-                print(f"  Note: Subtracting {trailing_len} bytes for trailing control characters")
+                self._log(f"  Note: Subtracting {trailing_len} bytes for trailing control characters")
                 available_space -= trailing_len
         
         return available_space
@@ -898,7 +917,7 @@ class DlgHandler:
                 test_text = test_bytes.decode(self.encoding)
                 valid_sections.append(section)
             except (UnicodeEncodeError, UnicodeDecodeError):
-                print(f"Warning: Skipping problematic section: {section.text[:20]}...")
+                self._log(f"Warning: Skipping problematic section: {section.text[:20]}...")
                 continue
         
         # Update the text sections list
@@ -950,8 +969,8 @@ class DlgHandler:
         
         # If section count doesn't match, try to handle it intelligently
         if len(new_sections) != len(self.text_sections):
-            print(f"Warning: Number of text sections changed. Expected {len(self.text_sections)}, got {len(new_sections)}")
-            print("Attempting to reconcile sections...")
+            self._log(f"Warning: Number of text sections changed. Expected {len(self.text_sections)}, got {len(new_sections)}")
+            self._log("Attempting to reconcile sections...")
             
             # Two possible scenarios:
             # 1. User added newlines within sections (more new sections than original)
@@ -1003,7 +1022,7 @@ class DlgHandler:
             
             # Final check
             if len(new_sections) != len(self.text_sections):
-                print("Failed to reconcile section counts. Using original sections where needed.")
+                self._log("Failed to reconcile section counts. Using original sections where needed.")
                 # Ensure we have the right number of sections
                 if len(new_sections) > len(self.text_sections):
                     new_sections = new_sections[:len(self.text_sections)]
@@ -1027,15 +1046,15 @@ class DlgHandler:
                 if hasattr(self, '_truly_original_binary'):
                     with open(output_path, 'wb') as dst:
                         dst.write(self._truly_original_binary)
-                    print(f"No changes detected - Original file copied exactly to {output_path} (using preserved binary)")
+                    self._log(f"No changes detected - Original file copied exactly to {output_path} (using preserved binary)")
                 else:
                     # Fallback to standard file copy
                     with open(self.filepath, 'rb') as src, open(output_path, 'wb') as dst:
                         dst.write(src.read())
-                    print(f"No changes detected - Original file copied exactly to {output_path}")
+                    self._log(f"No changes detected - Original file copied exactly to {output_path}")
                 return
             except Exception as e:
-                print(f"Error copying original file: {e}")
+                self._log(f"Error copying original file: {e}")
                 raise
                 
         # FIXED APPROACH: Never modify the problematic bytes
@@ -1047,13 +1066,13 @@ class DlgHandler:
         with open(self.filepath, 'rb') as f:
             result_binary = bytearray(f.read())
             
-        print("Using direct file copy as the base - preserving ALL special bytes")
+        self._log("Using direct file copy as the base - preserving ALL special bytes")
         
         # Get the list of problematic bytes that must remain untouched
         protected_positions = getattr(self, '_problematic_byte_positions', [])
         
         if protected_positions:
-            print(f"Protecting {len(protected_positions)} special byte positions: {protected_positions}")
+            self._log(f"Protecting {len(protected_positions)} special byte positions: {protected_positions}")
         
         # For debugging
         changes_made = []
@@ -1064,7 +1083,7 @@ class DlgHandler:
             if new_section_text == section.text:
                 continue
                 
-            print(f"\nProcessing section {i+1}: '{section.text}' -> '{new_section_text}'")
+            self._log(f"\nProcessing section {i+1}: '{section.text}' -> '{new_section_text}'")
             
             # Get the original text and encoded versions
             original_text = section.text
@@ -1119,15 +1138,15 @@ class DlgHandler:
                         last_byte = all_positions[-1] - section.start + 1
                         max_text_space = last_byte - first_byte
                         text_start_offset = first_byte
-                        print(f"  Using text + padding bytes for max space: {max_text_space} bytes")
+                        self._log(f"  Using text + padding bytes for max space: {max_text_space} bytes")
                 else:
-                    print(f"  Using precise byte positions: text bytes {first_text_byte}-{last_text_byte}")
+                    self._log(f"  Using precise byte positions: text bytes {first_text_byte}-{last_text_byte}")
                 
                 # If the original text bytes is larger than what the byte positions indicate, 
                 # we might have an issue with our byte position tracking
                 if original_text_length > max_text_space:
-                    print(f"  WARNING: Original text ({original_text_length} bytes) is larger than byte positions space ({max_text_space} bytes)")
-                    print(f"  Expanding max space to fit original text")
+                    self._log(f"  WARNING: Original text ({original_text_length} bytes) is larger than byte positions space ({max_text_space} bytes)")
+                    self._log(f"  Expanding max space to fit original text")
                     max_text_space = original_text_length
             else:
                 # Without precise byte positions, we need to be more conservative
@@ -1151,10 +1170,10 @@ class DlgHandler:
                 if found:
                     # We ONLY replace the exact bytes used by the original text
                     max_text_space = original_text_length
-                    print(f"  Located original text at offset {text_start_offset}, length {max_text_space}")
+                    self._log(f"  Located original text at offset {text_start_offset}, length {max_text_space}")
                 else:
                     # Fallback: use the range from start to where trailing control begins (if found)
-                    print(f"  WARNING: Could not locate original text in binary data")
+                    self._log(f"  WARNING: Could not locate original text in binary data")
                     # Try to find where trailing control starts
                     trailing_start = section_size
                     if trailing_encoded:
@@ -1170,12 +1189,12 @@ class DlgHandler:
                     
                     # As a safer approach, use at least the original text length
                     max_text_space = max(original_text_length, trailing_start - text_start_offset)
-                    print(f"  Fallback: Using at least original text length {original_text_length} bytes for space")
+                    self._log(f"  Fallback: Using at least original text length {original_text_length} bytes for space")
             
             # Make sure new text doesn't exceed available space (accounting for trailing controls)
             if len(new_encoded) > max_text_space:
-                print(f"  WARNING: New text ({len(new_encoded)} bytes) exceeds available space ({max_text_space} bytes).")
-                print(f"  Text will be truncated to fit.")
+                self._log(f"  WARNING: New text ({len(new_encoded)} bytes) exceeds available space ({max_text_space} bytes).")
+                self._log(f"  Text will be truncated to fit.")
                 # Truncate the new text to fit available space
                 new_encoded = new_encoded[:max_text_space]
                 # If possible, try to truncate at a character boundary to avoid partial characters
@@ -1184,7 +1203,7 @@ class DlgHandler:
                     truncated_text = new_encoded.decode(section.encoding)
                     # Set our new section text to the truncated version
                     new_section_text = truncated_text
-                    print(f"  Truncated to: '{truncated_text}'")
+                    self._log(f"  Truncated to: '{truncated_text}'")
                 except UnicodeDecodeError:
                     # If decode fails, truncate further until we get a valid character boundary
                     while len(new_encoded) > 0:
@@ -1192,23 +1211,23 @@ class DlgHandler:
                         try:
                             truncated_text = new_encoded.decode(section.encoding)
                             new_section_text = truncated_text
-                            print(f"  Truncated to character boundary: '{truncated_text}'")
+                            self._log(f"  Truncated to character boundary: '{truncated_text}'")
                             break
                         except UnicodeDecodeError:
                             continue
             
-            print(f"  Section boundaries: {section.start}-{section.end} ({section_size} bytes)")
-            print(f"  Original text length: {len(original_text)} chars, {len(original_text_bytes)} bytes")
-            print(f"  New text length: {len(new_section_text)} chars, {len(new_encoded)} bytes")
-            print(f"  Available space for text: {max_text_space} bytes")
-            print(f"  Trailing control length: {trailing_length} bytes")
+            self._log(f"  Section boundaries: {section.start}-{section.end} ({section_size} bytes)")
+            self._log(f"  Original text length: {len(original_text)} chars, {len(original_text_bytes)} bytes")
+            self._log(f"  New text length: {len(new_section_text)} chars, {len(new_encoded)} bytes")
+            self._log(f"  Available space for text: {max_text_space} bytes")
+            self._log(f"  Trailing control length: {trailing_length} bytes")
             
             # Identify protected bytes in this section
             section_protected_positions = [pos for pos in protected_positions 
                                           if section.start <= pos < section.end]
             
             if section_protected_positions:
-                print(f"  This section contains {len(section_protected_positions)} protected bytes at: {section_protected_positions}")
+                self._log(f"  This section contains {len(section_protected_positions)} protected bytes at: {section_protected_positions}")
             
             # Replace the text in the binary data
             # Only modify the exact bytes that contained the original text
@@ -1225,15 +1244,15 @@ class DlgHandler:
             # Do NOT modify the position of trailing control characters
             # They should remain exactly where they were in the original file
             
-            print(f"  Replaced {min(max_text_space, len(new_encoded))} bytes of text")
-            print(f"  Left {max(0, max_text_space - len(new_encoded))} null bytes as padding")
-            print(f"  Preserved trailing control characters at their original positions")
+            self._log(f"  Replaced {min(max_text_space, len(new_encoded))} bytes of text")
+            self._log(f"  Left {max(0, max_text_space - len(new_encoded))} null bytes as padding")
+            self._log(f"  Preserved trailing control characters at their original positions")
             if section_protected_positions:
-                print(f"  Preserved {len(section_protected_positions)} protected byte positions")
+                self._log(f"  Preserved {len(section_protected_positions)} protected byte positions")
         
         # Log all changes
         if changes_made:
-            print("\nSummary of changes made:")
+            self._log("\nSummary of changes made:")
             for pos, old, new in changes_made[:10]:  # Show first 10 changes
                 try:
                     old_char = bytes([old]).decode('cp1251', errors='replace')
@@ -1241,10 +1260,10 @@ class DlgHandler:
                 except:
                     old_char = "?"
                     new_char = "?"
-                print(f"  Position {pos}: {old} ('{old_char}') -> {new} ('{new_char}')")
+                self._log(f"  Position {pos}: {old} ('{old_char}') -> {new} ('{new_char}')")
             
             if len(changes_made) > 10:
-                print(f"  ... and {len(changes_made) - 10} more changes")
+                self._log(f"  ... and {len(changes_made) - 10} more changes")
         
         # Save to file
         output_path = output_path or self.filepath
@@ -1252,20 +1271,20 @@ class DlgHandler:
             with open(output_path, 'wb') as f:
                 f.write(result_binary)
             
-            print(f"\nFile saved successfully to {output_path}")
+            self._log(f"\nFile saved successfully to {output_path}")
             
             # Compare files if we saved to a different path
             if output_path != self.filepath:
                 differences = self.compare_files(output_path)
                 if differences:
-                    print("\nWarning: Differences found between original and new file:")
+                    self._log("\nWarning: Differences found between original and new file:")
                     for diff in differences[:10]:  # Show only first 10 differences
-                        print(diff)
+                        self._log(diff)
                     if len(differences) > 10:
-                        print(f"... and {len(differences) - 10} more differences")
-                    print()
+                        self._log(f"... and {len(differences) - 10} more differences")
+                    self._log()
         except Exception as e:
-            print(f"Error saving file: {e}")
+            self._log(f"Error saving file: {e}")
             raise
 
     def save_file(self, output_path: Optional[str] = None) -> None:
@@ -1504,12 +1523,12 @@ class DlgHandler:
                     control_chars[char] += 1
         
         if control_chars:
-            print("\nDetected trailing control characters:")
+            self._log("\nDetected trailing control characters:")
             for char, count in control_chars.items():
                 # Get hex representation
                 hex_val = ord(char)
-                print(f"  '{char}' (0x{hex_val:04x}) - {count} occurrences")
-            print(f"Total unique control characters: {len(control_chars)}")
+                self._log(f"  '{char}' (0x{hex_val:04x}) - {count} occurrences")
+            self._log(f"Total unique control characters: {len(control_chars)}")
             
             # Update our known patterns with newly discovered control characters
             # This helps adapt the detection to the specific game's control codes
@@ -1517,7 +1536,7 @@ class DlgHandler:
                 # Never add excluded characters or common punctuation
                 if char not in self._excluded_control_chars and char not in self._known_control_chars:
                     self._known_control_chars.append(char)
-                    print(f"Added '{char}' to known control characters") 
+                    self._log(f"Added '{char}' to known control characters") 
 
     def debug_first_entry(self) -> str:
         """Analyze the first text entry in detail to identify hidden control characters."""
@@ -1610,11 +1629,11 @@ class DlgHandler:
         with open(output_path, 'wb') as f:
             f.write(section_binary)
             
-        print(f"First entry binary saved to {output_path}")
+        self._log(f"First entry binary saved to {output_path}")
         
         # Create a text file with the analysis
         text_output_path = output_path + '.txt'
         with open(text_output_path, 'w', encoding='utf-8') as f:
             f.write(self.debug_first_entry())
             
-        print(f"First entry analysis saved to {text_output_path}") 
\ No newline at end of file
+        self._log(f"First entry analysis saved to {text_output_path}") 
\ No newline at end of file
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Append-only journal of saved section edits."""
+
+import os
+import sys
+import json
+import time
+from datetime import datetime
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+from db_handler import DbHandler
+
+
+def encode_diff(old: str, new: str) -> str:
+    """Encode the change from old to new compactly.
+
+    The result is a JSON list where an integer copies that many characters
+    from the old text and a [skip, text] pair drops ``skip`` old characters
+    and inserts ``text``. Small edits to long lines store only the edit.
+    """
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            ops.append(i2 - i1)
+        else:
+            ops.append([i2 - i1, new[j1:j2]])
+    return json.dumps(ops, ensure_ascii=False, separators=(',', ':'))
+
+
+def apply_diff(old: str, diff: str) -> str:
+    """Rebuild the new text from the old text and an encoded diff."""
+    result = []
+    pos = 0
+    for op in json.loads(diff):
+        if isinstance(op, int):
+            result.append(old[pos:pos + op])
+            pos += op
+        else:
+            skip, text = op
+            result.append(text)
+            pos += skip
+    return ''.join(result)
+
+
+@dataclass
+class JournalEntry:
+    save_id: int
+    file_path: str
+    section_index: int
+    old_text: str
+    new_text: str
+    created_at: float
+    reverts_save_id: Optional[int] = None
+    undone: bool = False
+
+
+class EditJournal:
+    """Records what every save changed, section by section.
+
+    Recording never waits on the database: rows are queued to the
+    DbHandler writer thread, which batches them into its next commit.
+    """
+
+    def __init__(self, db: DbHandler):
+        self.db = db
+
+    def record(self, file_path: str, changes: List[Tuple[int, str, str]],
+               reverts_save_id: Optional[int] = None) -> Optional[int]:
+        """Journal the (section_index, old_text, new_text) changes of one save.
+
+        Returns the save id, or None if nothing changed.
+        """
+        changes = [(index, old, new) for index, old, new in changes if old != new]
+        if not changes:
+            return None
+        created_at = time.time()
+        save_id = time.time_ns()
+        self.db.journal_append([
+            (save_id, file_path, index, old, encode_diff(old, new), created_at, reverts_save_id)
+            for index, old, new in changes
+        ])
+        return save_id
+
+    def history(self, file_path: Optional[str] = None, since: Optional[float] = None,
+                until: Optional[float] = None) -> List[JournalEntry]:
+        """Get journal entries oldest first, optionally for one file or time range."""
+        return [
+            JournalEntry(save_id, path, index, old, apply_diff(old, diff), created_at, reverts, bool(undone))
+            for _, save_id, path, index, old, diff, created_at, reverts, undone
+            in self.db.journal_entries(file_path, since, until)
+        ]
+
+    def changes_since(self, since: float) -> Dict[str, List[JournalEntry]]:
+        """Group every change made at or after a timestamp by file."""
+        changed: Dict[str, List[JournalEntry]] = {}
+        for entry in self.history(since=since):
+            changed.setdefault(entry.file_path, []).append(entry)
+        return changed
+
+    def replay(self, file_path: str, until: Optional[float] = None) -> Dict[int, str]:
+        """Get the text each journaled section of a file had at a point in time."""
+        texts = {}
+        for entry in self.history(file_path, until=until):
+            texts[entry.section_index] = entry.new_text
+        return texts
+
+    def last_undoable_save(self, file_path: str) -> Optional[Tuple[int, Dict[int, str]]]:
+        """Get the latest save not yet undone, as (save_id, {section_index: text before it})."""
+        # A save recorded a moment ago may still be queued; undoing an older one would restore the wrong texts
+        self.db.flush()
+        save_id = self.db.journal_last_undoable_save(file_path)
+        if save_id is None:
+            return None
+        texts = {
+            entry.section_index: entry.old_text
+            for entry in self.history(file_path)
+            if entry.save_id == save_id
+        }
+        return save_id, texts
+
+
+def print_usage():
+    print("Usage:")
+    print("  python edit_journal.py since <YYYY-MM-DD>     # Files changed since a date")
+    print("  python edit_journal.py history <file_path>    # Every saved change to a file")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print_usage()
+        exit(1)
+
+    db_path = os.path.join(os.path.expanduser("~"), ".dlg_editor", "dlg_files.db")
+    if not os.path.exists(db_path):
+        print(f"Database not found at {db_path}")
+        exit(1)
+
+    with DbHandler(db_path) as db:
+        journal = EditJournal(db)
+        if sys.argv[1] == "since":
+            since = datetime.strptime(sys.argv[2], "%Y-%m-%d").timestamp()
+            for file_path, entries in journal.changes_since(since).items():
+                sections = sorted({entry.section_index + 1 for entry in entries})
+                print(f"{file_path}: {len(entries)} change(s) in section(s) {', '.join(map(str, sections))}")
+        elif sys.argv[1] == "history":
+            for entry in journal.history(sys.argv[2]):
+                when = datetime.fromtimestamp(entry.created_at).strftime("%Y-%m-%d %H:%M:%S")
+                print(f"[{when}] Section {entry.section_index + 1}{' (undo)' if entry.reverts_save_id else ''}")
+                print(f"  - {entry.old_text}")
+                print(f"  + {entry.new_text}")
+        else:
+            print_usage()
+            exit(1)
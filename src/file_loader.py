@@ -0,0 +1,151 @@
+"""Read dialog files off the Tk thread, newest request first."""
+
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Iterable, Optional, Tuple
+from dlg_handler import DlgHandler
+
+
+def _file_stamp(file_path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class FileLoader:
+    """Parses .dlg files on a worker thread.
+
+    Only the newest request matters: a request made while another is still
+    waiting replaces it, and a load that finishes after a newer request was
+    made is dropped instead of being reported. A parse that is already
+    running cannot be interrupted, but its result is discarded.
+
+    When no request is waiting, files passed to ``prefetch`` are parsed
+    into a small LRU cache, so requesting one of them later is answered
+    without parsing. Cached files are checked against their size and mtime
+    before use, and ``invalidate`` drops them outright.
+
+    ``on_loaded(generation, file_path, handler, error)`` is called for every
+    load that is still current when it finishes: from the worker, or from
+    the requesting thread when the file was already cached.
+    """
+
+    def __init__(self, on_loaded: Callable[[int, str, Optional[DlgHandler], Optional[Exception]], None],
+                 cache_size: int = 4):
+        self.on_loaded = on_loaded
+        self.cache_size = cache_size
+        self._cond = threading.Condition()
+        self._pending: Optional[Tuple[int, str]] = None
+        self._prefetch: "deque[str]" = deque()
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, int], DlgHandler]]" = OrderedDict()
+        self._generation = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="FileLoader", daemon=True)
+        self._thread.start()
+
+    def request(self, file_path: str) -> int:
+        """Load a file, superseding any earlier request. Returns its generation."""
+        with self._cond:
+            self._generation += 1
+            generation = self._generation
+            handler = self._take_cached(file_path)
+            if handler is None:
+                self._pending = (generation, file_path)
+                self._cond.notify()
+                return generation
+            self._pending = None
+
+        self._deliver(generation, file_path, handler, None)
+        return generation
+
+    def prefetch(self, file_paths: Iterable[str]) -> None:
+        """Parse these files in the background, replacing the previous prefetch list."""
+        with self._cond:
+            self._prefetch = deque(path for path in file_paths if path not in self._cache)
+            self._cond.notify()
+
+    def invalidate(self, file_paths: Iterable[str]) -> None:
+        """Forget cached parses of files that changed on disk."""
+        with self._cond:
+            for file_path in file_paths:
+                self._cache.pop(file_path, None)
+
+    def cancel(self) -> None:
+        """Drop the waiting request and the result of the running one."""
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+
+    def is_current(self, generation: int) -> bool:
+        """Whether no newer request has been made since this one."""
+        return generation == self._generation
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Stop the worker; a parse still running after timeout is abandoned."""
+        with self._cond:
+            self._stopped = True
+            self._generation += 1
+            self._pending = None
+            self._prefetch.clear()
+            self._cache.clear()
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _take_cached(self, file_path: str) -> Optional[DlgHandler]:
+        """Remove and return a still-valid cached parse. Call with the lock held."""
+        entry = self._cache.pop(file_path, None)
+        if entry and entry[0] == _file_stamp(file_path):
+            return entry[1]
+        return None
+
+    def _deliver(self, generation: int, file_path: str, handler: Optional[DlgHandler], error) -> None:
+        if self.is_current(generation):
+            try:
+                self.on_loaded(generation, file_path, handler, error)
+            except Exception as e:
+                print(f"Error handling loaded file {file_path}: {e}")
+
+    @staticmethod
+    def _parse(file_path: str) -> Tuple[Optional[DlgHandler], Optional[Exception]]:
+        try:
+            handler = DlgHandler(file_path)
+            handler.read_file()
+            return handler, None
+        except Exception as e:
+            return None, e
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._prefetch and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                if self._pending is not None:
+                    generation, file_path = self._pending
+                    self._pending = None
+                    handler = self._take_cached(file_path)
+                    prefetching = False
+                else:
+                    file_path = self._prefetch.popleft()
+                    if file_path in self._cache:
+                        continue
+                    prefetching = True
+
+            if prefetching:
+                stamp = _file_stamp(file_path)
+                handler, error = self._parse(file_path)
+                if handler is not None:
+                    with self._cond:
+                        self._cache[file_path] = (stamp, handler)
+                        while len(self._cache) > self.cache_size:
+                            self._cache.popitem(last=False)
+                continue
+
+            error = None
+            if handler is None:
+                handler, error = self._parse(file_path)
+            self._deliver(generation, file_path, handler, error)
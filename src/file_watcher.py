@@ -0,0 +1,342 @@
+"""Watch the game folder and report debounced .dlg file changes."""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+from typing import Callable, Dict, List, Optional, Tuple
+from scanner import iter_dlg_files, hash_file
+
+ADDED = 'added'
+REMOVED = 'removed'
+MODIFIED = 'modified'
+OVERFLOW = 'overflow'  # Events were lost; the caller should resync everything
+
+
+def _is_dlg(path: str) -> bool:
+    return path.lower().endswith('.dlg')
+
+
+class PollingBackend:
+    """Detects changes by comparing (size, mtime) snapshots of every .dlg file.
+
+    Works everywhere; a snapshot costs one scandir pass over the tree.
+    """
+
+    def __init__(self, root: str, interval: float = 2.0, stopped: Optional[threading.Event] = None):
+        self.root = root
+        self.interval = interval
+        self._stopped = stopped or threading.Event()  # Set to cut a pending wait short
+        self._snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + interval
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for file_path, _ in iter_dlg_files(self.root):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[file_path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def read(self, timeout: float) -> List[Tuple[str, str]]:
+        """Wait up to timeout for the next poll and return the changes it found."""
+        delay = self._next_poll - time.monotonic()
+        if delay > timeout:
+            self._stopped.wait(timeout)
+            return []
+        if delay > 0 and self._stopped.wait(delay):
+            return []
+        self._next_poll = time.monotonic() + self.interval
+
+        snapshot = self._take_snapshot()
+        events = []
+        for path, state in snapshot.items():
+            previous = self._snapshot.get(path)
+            if previous is None:
+                events.append((path, ADDED))
+            elif previous != state:
+                events.append((path, MODIFIED))
+        for path in self._snapshot.keys() - snapshot.keys():
+            events.append((path, REMOVED))
+        self._snapshot = snapshot
+        return events
+
+    def close(self) -> None:
+        self._stopped.set()
+
+
+class InotifyBackend:
+    """Linux inotify watches on every directory of the tree, via ctypes."""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+                  | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    @classmethod
+    def available(cls) -> bool:
+        if not sys.platform.startswith('linux'):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            return hasattr(libc, 'inotify_init1')
+        except OSError:
+            return False
+
+    def __init__(self, root: str):
+        self.root = os.path.normpath(root)
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs: Dict[int, str] = {}  # Watch descriptor -> directory
+        self._files = set()  # Known .dlg files, so directory removals expand to files
+        self._watch_tree(self.root)
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err not in (errno.ENOENT, errno.ENOTDIR):
+                print(f"Cannot watch {directory}: {os.strerror(err)}")
+            return
+        self._dirs[wd] = directory
+
+    def _watch_tree(self, top: str) -> List[str]:
+        """Watch top and its subdirectories; return .dlg files found under it."""
+        found = []
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            self._add_watch(directory)
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif _is_dlg(entry.name):
+                            found.append(entry.path)
+            except OSError:
+                continue
+        self._files.update(found)
+        return found
+
+    def _forget_tree(self, top: str) -> List[str]:
+        prefix = os.path.join(top, '')
+        gone = [path for path in self._files if path.startswith(prefix)]
+        self._files.difference_update(gone)
+        return gone
+
+    def read(self, timeout: float) -> List[Tuple[str, str]]:
+        """Wait up to timeout for inotify events and translate them to file changes."""
+        if self._fd < 0:
+            return []
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        header = self._EVENT_HEADER
+        while offset + header.size <= len(data):
+            wd, mask, _, length = header.unpack_from(data, offset)
+            raw_name = data[offset + header.size:offset + header.size + length]
+            offset += header.size + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                events.append(("", OVERFLOW))
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            if mask & self.IN_DELETE_SELF:
+                continue  # Reported by the parent as IN_DELETE | IN_ISDIR
+
+            path = os.path.join(directory, os.fsdecode(raw_name.rstrip(b'\0')))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    events.extend((found, ADDED) for found in self._watch_tree(path))
+                elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    events.extend((gone, REMOVED) for gone in self._forget_tree(path))
+                continue
+
+            if not _is_dlg(path):
+                continue
+            if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                self._files.add(path)
+                events.append((path, ADDED))
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                self._files.discard(path)
+                events.append((path, REMOVED))
+            elif mask & (self.IN_MODIFY | self.IN_CLOSE_WRITE):
+                events.append((path, MODIFIED))
+        return events
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def coalesce(pending: Dict[str, str], path: str, kind: str) -> None:
+    """Fold a new event into the pending change for the same path."""
+    previous = pending.get(path)
+    if previous is None:
+        pending[path] = kind
+    elif previous == ADDED:
+        if kind == REMOVED:
+            del pending[path]  # Created and deleted again: nothing happened
+    elif previous == REMOVED:
+        if kind == ADDED:
+            pending[path] = MODIFIED  # Replaced, e.g. by an atomic save
+    elif previous == MODIFIED:
+        if kind == REMOVED:
+            pending[path] = REMOVED
+
+
+class GameFolderWatcher:
+    """Reports .dlg changes under the game folder, debounced and coalesced.
+
+    ``on_changes(changes)`` is called from the watcher thread with a
+    {file_path: 'added' | 'removed' | 'modified'} dict once no new events
+    have arrived for ``debounce`` seconds (or after ``max_delay`` of
+    continuous activity). If events were lost it receives ``None`` and the
+    caller should resync with a full scan.
+
+    inotify is used on Linux; everywhere else, or when ``use_polling`` is
+    set, a polling loop compares mtimes every ``poll_interval`` seconds.
+    """
+
+    def __init__(self, root: str, on_changes: Callable[[Optional[Dict[str, str]]], None],
+                 debounce: float = 0.5, max_delay: float = 5.0,
+                 poll_interval: float = 2.0, use_polling: bool = False):
+        self.root = root
+        self.on_changes = on_changes
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.use_polling = use_polling
+        self.backend = None
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Start watching in the background."""
+        self._thread = threading.Thread(target=self._run, name="GameFolderWatcher", daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the initial watches or snapshot are in place."""
+        return self._ready.wait(timeout)
+
+    def stop(self) -> None:
+        """Stop watching; pending changes are discarded."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.backend:
+            self.backend.close()
+
+    def _create_backend(self):
+        """Set up watches on the worker, since walking a large tree takes a while."""
+        if not self.use_polling and InotifyBackend.available():
+            try:
+                return InotifyBackend(self.root)
+            except OSError as e:
+                print(f"inotify unavailable ({e}), falling back to polling")
+        return PollingBackend(self.root, self.poll_interval, self._stop)
+
+    def _run(self):
+        self.backend = self._create_backend()
+        self._ready.set()
+        self._watch()
+
+    def _watch(self):
+        pending: Dict[str, str] = {}
+        overflow = False
+        first_event = last_event = 0.0
+        while not self._stop.is_set():
+            timeout = self.debounce if (pending or overflow) else 1.0
+            try:
+                events = self.backend.read(timeout)
+            except Exception as e:
+                print(f"Error watching {self.root}: {e}")
+                self._stop.wait(self.poll_interval)
+                continue
+
+            now = time.monotonic()
+            if events:
+                if not pending and not overflow:
+                    first_event = now
+                last_event = now
+                for path, kind in events:
+                    if kind == OVERFLOW:
+                        overflow = True
+                    else:
+                        coalesce(pending, path, kind)
+
+            if (pending or overflow) and (now - last_event >= self.debounce
+                                          or now - first_event >= self.max_delay):
+                changes = None if overflow else pending
+                pending = {}
+                overflow = False
+                try:
+                    self.on_changes(changes)
+                except Exception as e:
+                    print(f"Error handling file changes: {e}")
+
+
+def apply_changes_to_db(db, root: str, changes: Dict[str, str]) -> None:
+    """Mirror watcher changes in the dlg_files table; known files keep their status."""
+    root = os.path.normpath(root)
+    added = [
+        (path, os.path.relpath(path, root))
+        for path, kind in changes.items() if kind == ADDED
+    ]
+    removed = [path for path, kind in changes.items() if kind == REMOVED]
+    if added:
+        db.add_dlg_files(added, keep_existing=True)
+    if removed:
+        db.remove_dlg_files(removed)
+
+    hashes = []
+    for path, kind in changes.items():
+        if kind == REMOVED:
+            continue
+        try:
+            stat = os.stat(path)
+            hashes.append((path, hash_file(path), stat.st_size, stat.st_mtime))
+        except OSError:
+            continue  # Gone again before we got to it
+    if hashes:
+        db.set_file_hashes(hashes)
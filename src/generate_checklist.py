@@ -66,6 +66,12 @@ def generate_checklist(db_path: str, output_file: str = "checklist.md"):
     content.append(f"- Translated: {translated_files}")
     content.append(f"- Progress: {percentage:.1f}%")
     
+    # Identical files only need translating once
+    unique_contents, duplicate_files = db.get_duplicate_stats()
+    if duplicate_files:
+        content.append(f"- Unique contents: {unique_contents}")
+        content.append(f"- Identical duplicates: {duplicate_files}")
+    
     # Write to file
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write('\n'.join(content))
@@ -1,14 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, font
-from tkinter.scrolledtext import ScrolledText
 import re
 import os
+import shutil
+import threading
 from typing import Optional, List, Dict
 from pathlib import Path
-from dlg_handler import DlgHandler, TextSection
-from db_handler import DbHandler
+from dlg_handler import DlgHandler
+from db_handler import DbHandler, split_relative_path, parent_dir
 from ai_translator import AITranslator
 from api_key_dialog import APIKeyDialog
+from text_index import TextIndexer
+from translation_memory import TranslationMemory
+from edit_journal import EditJournal
+from scanner import DlgScanner, hash_file
+from file_watcher import GameFolderWatcher, apply_changes_to_db, REMOVED, MODIFIED
+from ui_dispatch import UiDispatcher
+from untranslated_index import UntranslatedIndex, tree_order_key
+from section_list import SectionModel, VirtualSectionList
+from file_loader import FileLoader
+from translation_engine import TranslationEngine, TranslationJob
+from response_cache import ResponseCache
 
 class BatchTranslationDialog:
     def __init__(self, parent, sections, translations):
@@ -110,210 +122,24 @@ class BatchTranslationDialog:
         self.text.tag_remove('sel', '1.0', 'end')
         self.text.configure(state='disabled')
 
-class SectionEditor(ttk.Frame):
-    def __init__(self, parent, section: TextSection, index: int, translator: AITranslator = None, **kwargs):
-        super().__init__(parent, **kwargs)
-        self.section = section
-        self.index = index
-        self.translator = translator
-        self.is_selected = tk.BooleanVar(value=False)
-        
-        # Calculate max available characters based on total available space
-        
-        # Get current text length in bytes
-        current_text_bytes = len(section.text.encode(section.encoding))
-        
-        # Account for trailing control characters
-        trailing_control_size = 0
-        if hasattr(section, 'trailing_control') and section.trailing_control:
-            trailing_control_size = len(section.trailing_control.encode(section.encoding))
-        
-        # Use the get_max_text_space method to determine available space
-        # This will include both current text and padding bytes
-        if hasattr(section, 'get_max_text_space'):
-            self.max_chars = section.get_max_text_space()
-            print(f"Section {index + 1}: Using max_text_space method, got {self.max_chars} bytes")
-        else:
-            # Fallback to previous approach
-            section_size = section.end - section.start
-            
-            # If we have byte position information, use that for more accurate calculation
-            if hasattr(section, 'text_byte_positions') and section.text_byte_positions and len(section.text_byte_positions) > 0:
-                # Check if we also have padding bytes
-                if hasattr(section, 'padding_byte_positions') and section.padding_byte_positions:
-                    # Combine text and padding positions to get total available space
-                    all_positions = sorted(section.text_byte_positions + section.padding_byte_positions)
-                    byte_positions_space = all_positions[-1] - all_positions[0] + 1
-                    print(f"Section {index + 1}: Using text+padding byte positions, {len(section.text_byte_positions)} text bytes + {len(section.padding_byte_positions)} padding = {byte_positions_space} bytes")
-                    self.max_chars = byte_positions_space
-                else:
-                    # Use text positions only
-                    first_pos = section.text_byte_positions[0] - section.start
-                    last_pos = section.text_byte_positions[-1] - section.start + 1
-                    byte_positions_space = last_pos - first_pos
-                    self.max_chars = byte_positions_space
-                    print(f"Section {index + 1}: Using text byte positions {first_pos}-{last_pos} for max space")
-            else:
-                # Without precise positions, ensure we have at least enough space for current text
-                self.max_chars = current_text_bytes
-                print(f"Section {index + 1}: Using current text length {current_text_bytes} bytes for max space")
-        
-        # Account for trailing control characters that need to be preserved
-        if trailing_control_size > 0:
-            print(f"Section {index + 1}: Section includes {trailing_control_size} bytes for trailing control '{section.trailing_control}'")
-        
-        # Extra safety check - if our calculation gives less space than what's already being used,
-        # there's a problem with our logic - default to the section size
-        if self.max_chars < current_text_bytes:
-            print(f"Section {index + 1}: WARNING - Calculated max chars ({self.max_chars}) is less than current text size ({current_text_bytes})!")
-            print(f"Section {index + 1}: Falling back to section size minus trailing control")
-            self.max_chars = section.end - section.start - trailing_control_size
-        
-        # Create frame with border
-        self.configure(relief='solid', borderwidth=1, padding=5)
-        
-        # Section header
-        header_frame = ttk.Frame(self)
-        header_frame.pack(fill=tk.X, pady=(0, 5))
-        
-        # Left side of header
-        header_left = ttk.Frame(header_frame)
-        header_left.pack(side=tk.LEFT)
-        
-        # Add checkbox for selection
-        self.select_cb = ttk.Checkbutton(
-            header_left,
-            variable=self.is_selected,
-            text=f"Section {index + 1}",
-            style='Bold.TCheckbutton'
-        )
-        self.select_cb.pack(side=tk.LEFT, padx=(0, 10))
-        
-        # Add individual translate button
-        if translator and translator.has_valid_key():
-            self.translate_btn = ttk.Button(
-                header_left,
-                text="Translate",
-                command=self._translate_section,
-                width=10
-            )
-            self.translate_btn.pack(side=tk.LEFT)
-        
-        # Show both current and maximum available length
-        current_len = len(section.text.encode(section.encoding))
-        ttk.Label(
-            header_frame,
-            text=f"(Current: {current_len} bytes, Max available: {self.max_chars} bytes)",
-            font=('TkDefaultFont', 9),
-            foreground='gray'
-        ).pack(side=tk.RIGHT)
-        
-        # Editor
-        self.editor = tk.Text(
-            self,
-            wrap=tk.WORD,
-            height=max(2, min(5, self.max_chars // 40)),  # Adaptive height
-            font=('Courier', 11)
-        )
-        self.editor.pack(fill=tk.BOTH, expand=True)
-        
-        # Set initial content
-        self.editor.insert('1.0', section.text)
-        
-        # Add validation
-        self.editor.bind('<KeyRelease>', self._validate_length)
-        
-    def _validate_length(self, event=None):
-        """Validate text length and update visual feedback"""
-        current_text = self.editor.get('1.0', 'end-1c')
-        current_len = len(current_text.encode(self.section.encoding))
-        
-        # Allow slight overflow (10 characters)
-        allowed_overflow = min(10, self.max_chars * 0.1)  # 10% or 10 chars, whichever is smaller
-        
-        if current_len > self.max_chars + allowed_overflow:
-            self.editor.configure(background='#ffe6e6')  # Light red
-            # Update parent window's header to show overflow
-            header_frame = self.winfo_children()[0]  # Get header frame
-            for child in header_frame.winfo_children():
-                if isinstance(child, ttk.Label) and child.cget('foreground') == 'gray':
-                    child.configure(
-                        text=f"(Current: {current_len} bytes, Max available: {self.max_chars} bytes) - OVERFLOW",
-                        foreground='red'
-                    )
-        elif current_len > self.max_chars:
-            self.editor.configure(background='#fff3e6')  # Light orange for slight overflow
-            header_frame = self.winfo_children()[0]
-            for child in header_frame.winfo_children():
-                if isinstance(child, ttk.Label) and (child.cget('foreground') == 'gray' or child.cget('foreground') == 'red'):
-                    child.configure(
-                        text=f"(Current: {current_len} bytes, Max available: {self.max_chars} bytes) - SLIGHT OVERFLOW",
-                        foreground='orange'
-                    )
-        else:
-            self.editor.configure(background='white')
-            header_frame = self.winfo_children()[0]
-            for child in header_frame.winfo_children():
-                if isinstance(child, ttk.Label) and (child.cget('foreground') == 'gray' or child.cget('foreground') == 'red' or child.cget('foreground') == 'orange'):
-                    child.configure(
-                        text=f"(Current: {current_len} bytes, Max available: {self.max_chars} bytes)",
-                        foreground='gray'
-                    )
-            
-    def get_text(self) -> str:
-        """Get the current text content"""
-        return self.editor.get('1.0', 'end-1c')
-        
-    def set_text(self, text: str):
-        """Set the text content"""
-        self.editor.delete('1.0', 'end')
-        self.editor.insert('1.0', text)
-        self._validate_length()
-
-    def _translate_section(self):
-        """Translate the current section using OpenAI."""
-        if not self.translator:
-            return
-            
-        try:
-            current_text = self.editor.get('1.0', 'end-1c')
-            
-            # Get all text sections from parent window for context
-            context = []
-            parent_frame = self.winfo_parent()
-            if parent_frame:
-                parent = self.nametowidget(parent_frame)
-                for widget in parent.winfo_children():
-                    if isinstance(widget, SectionEditor):
-                        section_text = widget.get_text()
-                        context.append(section_text)
-            
-            translation = self.translator.translate_text(
-                current_text,
-                self.max_chars,
-                self.section.encoding,
-                context=context
-            )
-            
-            # Replace current text with translation
-            self.editor.delete('1.0', 'end')
-            self.editor.insert('1.0', translation)
-            
-            # Validate length after translation
-            self._validate_length()
-            
-        except Exception as e:
-            messagebox.showerror(
-                "Translation Error",
-                str(e)
-            )
-
 class FileList(ttk.Frame):
-    def __init__(self, parent, db: DbHandler, on_select: callable, **kwargs):
+    """Tree of dialog files, populated one directory at a time as it is expanded."""
+    
+    def __init__(self, parent, db: DbHandler, on_select: callable, ui: UiDispatcher, **kwargs):
         super().__init__(parent, **kwargs)
         self.db = db
         self.on_select = on_select
-        self.open_states = {}
+        self.ui = ui
+        self.open_states = set()  # Directories that were open before a rebuild
+        self.file_items: Dict[str, str] = {}  # File path -> tree item, for materialized files
+        self.dir_items: Dict[str, str] = {}  # Directory -> tree item, for materialized directories
+        self.item_dirs: Dict[str, str] = {}  # Reverse of dir_items
+        self.subdirs: Dict[str, set] = {}  # Directory -> names of its subdirectories
+        self.populated = set()  # Directories whose children are in the tree
+        self.duplicates: Dict[str, int] = {}  # File path -> size of its identical group
+        self.untranslated = UntranslatedIndex()
+        self.paused = False  # Set while a rescan runs; it ends with a full rebuild
+        self._tk_thread = threading.current_thread()
         
         # Create treeview
         self.tree = ttk.Treeview(self, selectmode='browse')
@@ -327,134 +153,260 @@ class FileList(ttk.Frame):
         # Configure tags for different file states
         self.tree.tag_configure('translated', foreground='green')
         self.tree.tag_configure('not_required', font=('TkDefaultFont', 9, 'overstrike'), foreground='gray')
+        self.tree.tag_configure('duplicate', foreground='blue')
         
         # Bind events
         self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<<TreeviewOpen>>', self._on_open)
         
-        # Load files
+        # Load files, then follow database changes item by item
         self.refresh_files()
+        self.db.add_file_listener(self._on_db_change)
         
     def _store_open_states(self):
-        """Store which nodes are currently open."""
+        """Store which directories are currently open."""
         self.open_states = {
-            self.tree.item(item)["text"]: self.tree.item(item)["open"]
-            for item in self.tree.get_children("")
+            directory for directory, item in self.dir_items.items()
+            if self.tree.item(item, "open")
         }
         
     def _restore_open_states(self):
-        """Restore previously open nodes."""
-        for item in self.tree.get_children(""):
-            if item in self.open_states:
-                self.tree.item(item, open=self.open_states[item])
+        """Reopen previously open directories, populating only those."""
+        for directory in sorted(self.open_states, key=lambda d: d.count("/")):
+            if directory in self.subdirs:
+                self._populate_to(directory)
+                self.tree.item(self.dir_items[directory], open=True)
         
     def refresh_files(self, maintain_selection=False):
-        """Refresh the file list from database."""
+        """Rebuild the file list from database."""
+        self.paused = False
+        
         # Store current selection and open states
         selected = self.tree.selection()
         selected_path = None
         if selected:
-            selected_path = self.tree.item(selected[0])['values'][0] if selected else None
+            selected_path = self.tree.item(selected[0])['values'][0] if self.tree.item(selected[0])['values'] else None
         self._store_open_states()
         
-        self.tree.delete(*self.tree.get_children())
-        
-        # Get all files from database
-        files = self.db.get_all_files()
+        self._clear()
+        self.duplicates = self.db.get_duplicate_counts()
+        self.untranslated.reset(self.db.get_untranslated_files())
+        for directory in self.db.get_directories():
+            self._add_directory(directory)
+        self._populate('')
         
-        # Create directory structure
-        directories: Dict[str, str] = {}
-        file_items = []  # Store file items for selection
+        # Restore open states
+        self._restore_open_states()
         
-        for file_path, relative_path, is_translated in files:
-            # Split path into parts
-            # Check if file is marked as not required
-            is_not_required = relative_path.startswith("NOT_REQUIRED:")
-            if is_not_required:
-                relative_path = relative_path.replace("NOT_REQUIRED:", "")
-                
-            parts = Path(relative_path).parts
+        # Restore selection
+        if maintain_selection and selected_path:
+            self.reveal(selected_path)
             
-            # Create parent directories if needed
-            current_path = ""
-            for i, part in enumerate(parts[:-1]):
-                parent_path = current_path
-                current_path = str(Path(current_path) / part)
-                
-                if current_path not in directories:
-                    directories[current_path] = self.tree.insert(
-                        directories.get(parent_path, ''),
-                        'end',
-                        text=part,
-                        values=()
-                    )
-            
-            # Add file
-            parent = directories.get(str(Path(relative_path).parent), '')
-            item_id = self.tree.insert(
-                parent,
-                'end',
-                text=parts[-1],
-                values=(file_path,)
-            )
+    def reveal(self, file_path: str) -> Optional[str]:
+        """Select a file, populating and opening its directories. Returns its item."""
+        if file_path not in self.file_items:
+            rows = self.db.get_files([file_path])
+            if not rows:
+                return None
+            self._populate_to(parent_dir(rows[0][1]))
+        item_id = self.file_items.get(file_path)
+        if item_id:
+            self.tree.selection_set(item_id)
+            self.tree.see(item_id)
+        return item_id
+        
+    def pause(self):
+        """Ignore database changes until the next refresh_files."""
+        self.paused = True
+        
+    def _clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self.file_items.clear()
+        self.dir_items.clear()
+        self.item_dirs.clear()
+        self.subdirs = {'': set()}
+        self.populated.clear()
+        
+    def _add_directory(self, directory: str):
+        """Record a directory and its parents, adding items under populated parents."""
+        while directory not in self.subdirs:
+            parent, _, name = directory.rpartition("/")
+            self.subdirs[directory] = set()
+            self.subdirs.setdefault(parent, set()).add(name)
+            if parent in self.populated:
+                self._insert_dir(directory, self._sorted_index(self.dir_items.get(parent, ''), name))
+            directory = parent
+        
+    def _insert_dir(self, directory: str, index):
+        parent = self.dir_items.get(directory.rpartition("/")[0], '')
+        item_id = self.tree.insert(parent, index, text=directory.rpartition("/")[2], values=())
+        # Placeholder so the directory can be expanded before it is populated
+        self.tree.insert(item_id, 'end', text="...")
+        self.dir_items[directory] = item_id
+        self.item_dirs[item_id] = directory
+        
+    def _populate(self, directory: str):
+        """Insert the subdirectories and files of a directory, in name order."""
+        if directory in self.populated:
+            return
+        self.populated.add(directory)
+        item_id = self.dir_items.get(directory, '')
+        if item_id:
+            self.tree.delete(*self.tree.get_children(item_id))
             
-            # Set style based on file status
-            if is_not_required:
-                self.tree.item(item_id, tags=('not_required',))
-            elif is_translated:
-                self.tree.item(item_id, tags=('translated',))
+        entries = [(name, True, None) for name in self.subdirs.get(directory, ())]
+        entries.extend(
+            (split_relative_path(relative_path)[1][-1], False, (file_path, relative_path, is_translated))
+            for file_path, relative_path, is_translated in self.db.get_files_in_dir(directory)
+        )
+        entries.sort(key=lambda entry: entry[0])
+        for name, is_dir, row in entries:
+            if is_dir:
+                self._insert_dir(f"{directory}/{name}" if directory else name, 'end')
+            else:
+                self._insert_file(*row, 'end')
+                
+    def _populate_to(self, directory: str):
+        """Populate a directory and every directory above it."""
+        parts = directory.split("/") if directory else []
+        for depth in range(len(parts) + 1):
+            self._populate("/".join(parts[:depth]))
             
-            file_items.append((item_id, file_path, is_translated or is_not_required))
+    def _on_open(self, event):
+        """Fill in a directory the first time it is expanded."""
+        directory = self.item_dirs.get(self.tree.focus())
+        if directory is not None:
+            self._populate(directory)
+        
+    def _on_db_change(self, kind: str, file_paths: List[str]):
+        """Database listener; may run on any thread."""
+        if threading.current_thread() is self._tk_thread:
+            # Our own edits show up at once, e.g. before looking for the next file
+            self._apply_change(kind, file_paths)
+        else:
+            self.ui.post(self._apply_change, kind, file_paths)
         
-        # Restore open states
-        self._restore_open_states()
+    def _apply_change(self, kind: str, file_paths: List[str]):
+        """Mirror one database change in the tree without rebuilding it."""
+        if self.paused:
+            return
+        if kind == DbHandler.FILES_CLEARED:
+            self._clear()
+            self.duplicates.clear()
+            self.untranslated.reset([])
+            self.populated.add('')
+        elif kind == DbHandler.FILES_REMOVED:
+            for file_path in file_paths:
+                self._remove_file(file_path)
+                self.untranslated.remove(file_path)
+            self._prune_directories()
+        elif kind in (DbHandler.FILES_ADDED, DbHandler.FILES_UPDATED):
+            for file_path, relative_path, is_translated in self.db.get_files(file_paths):
+                self._update_file(file_path, relative_path, is_translated)
+                self.untranslated.update(file_path, relative_path, is_translated)
+        elif kind == DbHandler.FILES_HASHED:
+            # A changed hash can change the group of files that were not rehashed
+            duplicates = self.db.get_duplicate_counts()
+            changed = {
+                path for path in duplicates.keys() | self.duplicates.keys()
+                if duplicates.get(path) != self.duplicates.get(path) and path in self.file_items
+            }
+            self.duplicates = duplicates
+            for file_path, relative_path, is_translated in self.db.get_files(changed):
+                self._update_file(file_path, relative_path, is_translated)
+                
+    def _file_look(self, file_path: str, name: str, is_not_required: bool, is_translated: bool):
+        """Get the (text, tags) showing a file's state."""
+        text = name
+        group_size = self.duplicates.get(file_path)
+        if group_size:
+            text += f" ({group_size - 1} identical)"
+        if is_not_required:
+            tags = ('not_required',)
+        elif is_translated:
+            tags = ('translated',)
+        elif group_size:
+            tags = ('duplicate',)
+        else:
+            tags = ()
+        return text, tags
+        
+    def _insert_file(self, file_path: str, relative_path: str, is_translated: bool, index):
+        """Insert a file item into its (populated) directory."""
+        is_not_required, parts = split_relative_path(relative_path)
+        parent = self.dir_items.get("/".join(parts[:-1]), '')
+        if index is None:
+            index = self._sorted_index(parent, parts[-1])
+        text, tags = self._file_look(file_path, parts[-1], is_not_required, is_translated)
+        self.file_items[file_path] = self.tree.insert(
+            parent,
+            index,
+            text=text,
+            values=(file_path,),
+            tags=tags
+        )
         
-        # Restore selection or select next untranslated
-        if maintain_selection and selected_path:
-            for item_id, path, _ in file_items:
-                if path == selected_path:
-                    self.tree.selection_set(item_id)
-                    self.tree.see(item_id)
-                    break
+    def _sorted_index(self, parent: str, name: str) -> int:
+        """Position among the siblings that keeps them in name order."""
+        children = self.tree.get_children(parent)
+        for i, child in enumerate(children):
+            if self.tree.item(child, "text") > name:
+                return i
+        return len(children)
+        
+    def _update_file(self, file_path: str, relative_path: str, is_translated: bool):
+        """Retag a known file, or insert a new one if its directory is populated."""
+        item_id = self.file_items.get(file_path)
+        if item_id is None:
+            directory = parent_dir(relative_path)
+            self._add_directory(directory)
+            if directory in self.populated:
+                self._insert_file(file_path, relative_path, is_translated, None)
+            return
+            
+        is_not_required, parts = split_relative_path(relative_path)
+        text, tags = self._file_look(file_path, parts[-1], is_not_required, is_translated)
+        self.tree.item(item_id, text=text, tags=tags)
+        
+    def _remove_file(self, file_path: str):
+        """Delete a file item if it was materialized."""
+        item_id = self.file_items.pop(file_path, None)
+        if item_id is not None:
+            self.tree.delete(item_id)
+            
+    def _prune_directories(self):
+        """Drop directories that no longer contain any files."""
+        remaining = {''}
+        for directory in self.db.get_directories():
+            while directory not in remaining:
+                remaining.add(directory)
+                directory = directory.rpartition("/")[0]
+        for directory in sorted(self.subdirs.keys() - remaining, key=len, reverse=True):
+            parent, _, name = directory.rpartition("/")
+            del self.subdirs[directory]
+            self.subdirs.get(parent, set()).discard(name)
+            self.populated.discard(directory)
+            item_id = self.dir_items.pop(directory, None)
+            if item_id is not None:
+                self.item_dirs.pop(item_id, None)
+                if self.tree.exists(item_id):
+                    self.tree.delete(item_id)
         
     def get_next_untranslated(self, current_path: Optional[str] = None) -> Optional[str]:
-        """Get the path of the next untranslated file after the current one."""
-        all_items = []
-        
-        def collect_items(parent=""):
-            for item in self.tree.get_children(parent):
-                if self.tree.item(item)["values"]:  # If it's a file
-                    all_items.append(item)
-                collect_items(item)
-        
-        collect_items()
+        """Get the path of the next untranslated file after the current one, in tree order."""
+        following = self.get_following_untranslated(current_path, 1)
+        return following[0] if following else None
         
-        if not all_items:
-            return None
-            
-        # Find current item index
-        current_index = -1
+    def get_following_untranslated(self, current_path: Optional[str], count: int) -> List[str]:
+        """Get up to count untranslated files after the current one, in tree order."""
+        key = None
         if current_path:
-            for i, item in enumerate(all_items):
-                if self.tree.item(item)["values"][0] == current_path:
-                    current_index = i
-                    break
-        
-        # Look for next untranslated file
-        start_index = current_index + 1 if current_index >= 0 else 0
-        
-        # First search from current position to end
-        for i in range(start_index, len(all_items)):
-            item = all_items[i]
-            if 'translated' not in self.tree.item(item)["tags"]:
-                return self.tree.item(item)["values"][0]
-                
-        # If not found, search from beginning to current position
-        for i in range(0, start_index):
-            item = all_items[i]
-            if 'translated' not in self.tree.item(item)["tags"]:
-                return self.tree.item(item)["values"][0]
-        
-        return None
+            key = self.untranslated.key_of(current_path)
+            if key is None:
+                rows = self.db.get_files([current_path])
+                if rows:
+                    key = tree_order_key(current_path, rows[0][1])
+        return self.untranslated.following(key, count)
         
     def _on_select(self, event):
         """Handle file selection."""
@@ -465,15 +417,38 @@ class FileList(ttk.Frame):
                 self.on_select(item['values'][0])
 
 class DlgGuiEditor:
+    # Untranslated files parsed ahead of time while the current one is edited
+    PREFETCH_COUNT = 3
+    
     def __init__(self, db_path: str = "dlg_files.db"):
         self.db = DbHandler(db_path)
-        self.translator = AITranslator()
+        self.memory = TranslationMemory(self.db)
+        self.journal = EditJournal(self.db)
+        # Earlier API answers are reused for identical requests
+        try:
+            self.response_cache = ResponseCache()
+        except Exception as e:
+            print(f"Error opening response cache: {e}")
+            self.response_cache = None
+        self.translator = AITranslator(memory=self.memory, cache=self.response_cache)
+        
+        # Keep the full-text index current in the background
+        self.indexer = TextIndexer(self.db)
+        self.indexer.start()
+        self.indexer.enqueue_all()
         
         # Create main window
         self.root = tk.Tk()
         self.root.title("DLG Editor")
         self.root.geometry("1200x800")
         
+        # Hands results from worker threads to the Tk thread
+        self.ui = UiDispatcher(self.root)
+        
+        # AI requests run concurrently off the Tk thread
+        self.engine = TranslationEngine(self.translator, post=self.ui.post)
+        self._translation_batch = None
+        
         self._create_menu()
         self._create_layout()
         self._setup_bindings()
@@ -481,7 +456,23 @@ class DlgGuiEditor:
         # Initialize variables
         self.current_file = None
         self.handler = None
-        self.section_editors = []
+        self.section_models: List[SectionModel] = []
+        self._saved_texts = []  # Section texts as last written to disk
+        self._pending_undo = None  # Save id restored by undo_last_save, until saved
+        self._own_write_stat = None  # (size, mtime) after our last save, to ignore its echo
+        self.scanner = None
+        
+        # Parse files off the Tk thread; clicking another file supersedes a pending load
+        self.loader = FileLoader(self._on_file_read)
+        self._loading_path = None
+        self._loading_status = None  # Status message to show once the load finishes
+        
+        # Follow changes made to the game folder outside the editor
+        self.watcher = None
+        game_path = self.db.get_game_path()
+        if game_path and os.path.isdir(game_path):
+            self.watcher = GameFolderWatcher(game_path, self._on_disk_changes)
+            self.watcher.start()
         
     def _create_menu(self):
         """Create the menu bar."""
@@ -492,8 +483,12 @@ class DlgGuiEditor:
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Save", command=self.save_file, accelerator="Ctrl+S")
+        file_menu.add_command(label="Undo Last Saved Change", command=self.undo_last_save)
         file_menu.add_command(label="Mark as Translated", command=self.mark_translated, accelerator="Ctrl+T")
         file_menu.add_command(label="Mark as Not Required", command=self.mark_not_required, accelerator="Ctrl+N")
+        file_menu.add_command(label="Fill from Translation Memory", command=self.fill_from_memory)
+        file_menu.add_command(label="Apply Batch Drafts", command=self.apply_drafts)
+        file_menu.add_command(label="Apply to Identical Files", command=self.apply_to_identical)
         file_menu.add_separator()
         file_menu.add_command(label="Rescan Files", command=self.rescan_files)
         file_menu.add_separator()
@@ -503,6 +498,7 @@ class DlgGuiEditor:
         settings_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Settings", menu=settings_menu)
         settings_menu.add_command(label="Configure OpenAI API Key", command=self._show_api_key_dialog)
+        settings_menu.add_command(label="Clear Response Cache", command=self._clear_response_cache)
         
         # Debug menu
         debug_menu = tk.Menu(menubar, tearoff=0)
@@ -510,6 +506,20 @@ class DlgGuiEditor:
         debug_menu.add_command(label="Analyze First Entry", command=self._analyze_first_entry)
         debug_menu.add_command(label="Save First Entry Binary", command=self._save_first_entry_binary)
         
+    def _clear_response_cache(self):
+        """Forget cached API responses, e.g. after the prompts were tuned."""
+        if self.response_cache is None:
+            return
+        stats = self.response_cache.stats()
+        if not messagebox.askyesno(
+            "Clear Response Cache",
+            f"Remove {stats['entries']} cached translation(s)?\n"
+            f"This session: {stats['hits']} hit(s), {stats['misses']} miss(es)."
+        ):
+            return
+        self.response_cache.clear()
+        self.status_var.set("Response cache cleared")
+        
     def _create_layout(self):
         """Create the main layout."""
         # Main paned window
@@ -521,7 +531,8 @@ class DlgGuiEditor:
         self.file_list = FileList(
             file_frame,
             self.db,
-            self.load_file
+            self.load_file,
+            self.ui
         )
         self.file_list.pack(fill=tk.BOTH, expand=True)
         paned.add(file_frame, weight=1)
@@ -538,24 +549,25 @@ class DlgGuiEditor:
         )
         self.instructions.pack(fill=tk.X, pady=(0, 10))
         
-        # Create scrollable canvas for sections
-        canvas_frame = ttk.Frame(editor_frame)
-        canvas_frame.pack(fill=tk.BOTH, expand=True)
-        
-        self.canvas = tk.Canvas(canvas_frame)
-        scrollbar = ttk.Scrollbar(canvas_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+        # Banner shown when the open file changes on disk (packed on demand)
+        self.disk_banner = ttk.Frame(editor_frame)
+        self.disk_banner_var = tk.StringVar()
+        ttk.Label(
+            self.disk_banner,
+            textvariable=self.disk_banner_var,
+            foreground='red'
+        ).pack(side=tk.LEFT)
+        ttk.Button(
+            self.disk_banner,
+            text="Reload",
+            command=lambda: self.load_file(self.current_file)
+        ).pack(side=tk.RIGHT)
         
-        scrollbar.pack(side="right", fill="y")
-        self.canvas.pack(side="left", fill="both", expand=True)
+        # Section list; only rows near the viewport get editor widgets
+        self.section_list = VirtualSectionList(editor_frame, translator=self.translator, engine=self.engine)
+        self.section_list.pack(fill=tk.BOTH, expand=True)
+        self.canvas_frame = self.section_list
+        self.canvas = self.section_list.canvas
         
         # Status bar
         self.status_var = tk.StringVar()
@@ -585,6 +597,20 @@ class DlgGuiEditor:
             command=self._load_next_untranslated
         )
         self.next_btn.pack(side=tk.LEFT)
+
+        # Overflow summary of the whole file, kept current while typing
+        ttk.Label(
+            toolbar_frame,
+            textvariable=self.section_list.summary_var,
+            foreground='gray'
+        ).pack(side=tk.LEFT, padx=10)
+
+        # Shown while a file is being parsed
+        self.loading_bar = ttk.Progressbar(
+            toolbar_frame,
+            mode='indeterminate',
+            length=100
+        )
         
     def _setup_bindings(self):
         """Setup keyboard shortcuts."""
@@ -604,51 +630,93 @@ class DlgGuiEditor:
         if self.current_file:
             self.load_file(self.current_file)
         
-    def load_file(self, file_path: str):
-        """Load a file for editing."""
-        try:
-            self.current_file = file_path
-            self.handler = DlgHandler(file_path)
-            self.handler.read_file()
-            
-            # Clear existing editors
-            for widget in self.scrollable_frame.winfo_children():
-                widget.destroy()
-            self.section_editors.clear()
-            
-            # Create new editors
-            for i, section in enumerate(self.handler.text_sections):
-                editor = SectionEditor(
-                    self.scrollable_frame,
-                    section,
-                    i,
-                    translator=self.translator,
-                    padding=(5, 5, 5, 15)
-                )
-                editor.pack(fill=tk.X, padx=5, pady=5)
-                self.section_editors.append(editor)
-            
-            # Enable translate button if we have sections
-            self.translate_btn.configure(
-                state=tk.NORMAL if self.section_editors else tk.DISABLED
-            )
+    def load_file(self, file_path: str, status: Optional[str] = None):
+        """Load a file for editing in the background.
+        
+        The current file stays open until the new one has been parsed. An
+        optional status message replaces the default one when it is shown.
+        """
+        if file_path == self._loading_path:
+            # Already on its way, e.g. selected in the tree and loaded directly
+            self._loading_status = status or self._loading_status
+            return
             
-            # Update status
+        self._loading_path = file_path
+        self._loading_status = status
+        self.loading_bar.pack(side=tk.LEFT, padx=5)
+        self.loading_bar.start()
+        self.status_var.set(f"Loading {Path(file_path).name}...")
+        # A prefetched file is shown before this returns
+        self.loader.request(file_path)
+        
+    def _on_file_read(self, generation: int, file_path: str, handler: Optional[DlgHandler], error):
+        """Prepare a parsed file for display; runs on the loader thread, or the Tk thread if prefetched."""
+        models = []
+        status = ""
+        if handler:
+            models = [SectionModel(section, i) for i, section in enumerate(handler.text_sections)]
             is_translated = self.db.is_file_translated(file_path)
             status = "Translated" if is_translated else "Not translated"
-            self.status_var.set(f"Loaded: {Path(file_path).name} ({status})")
+            identical = len(self.db.get_identical_files(file_path))
+            if identical:
+                status += f", {identical} identical file(s)"
+        if threading.current_thread() is threading.main_thread():
+            self._show_file(generation, file_path, handler, models, status, error)
+        else:
+            self.ui.post(self._show_file, generation, file_path, handler, models, status, error)
+        
+    def _show_file(self, generation: int, file_path: str, handler: Optional[DlgHandler],
+                   models: List[SectionModel], status: str, error):
+        """Swap the parsed file into the editor; runs on the Tk thread."""
+        if not self.loader.is_current(generation):
+            return  # Superseded by a newer load
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+        message = self._loading_status
+        self._loading_path = None
+        self._loading_status = None
+        self.loading_bar.stop()
+        self.loading_bar.pack_forget()
+        
+        if error:
+            self.status_var.set("")
+            messagebox.showerror("Error", f"Failed to load file: {str(error)}")
+            return
             
-    def save_file(self):
-        """Save the current file."""
+        self.current_file = file_path
+        self.handler = handler
+        self._own_write_stat = None
+        self.disk_banner.pack_forget()
+        
+        # Models are cheap; editor widgets are only created for visible rows
+        self.section_models = models
+        self.section_list.set_models(self.section_models)
+        self._saved_texts = [section.text for section in handler.text_sections]
+        self._pending_undo = None
+        
+        # Enable translate button if we have sections
+        self.translate_btn.configure(
+            state=tk.NORMAL if self.section_models else tk.DISABLED
+        )
+        
+        self.status_var.set(message or f"Loaded: {Path(file_path).name} ({status})")
+        drafts = len(self.db.get_drafts(file_path))
+        if drafts:
+            self.status_var.set(f"{self.status_var.get()} - {drafts} batch draft(s) available")
+        
+        # The next files of the usual mark-and-advance path, parsed while this one is edited
+        self.loader.prefetch(
+            path for path in self.file_list.get_following_untranslated(file_path, self.PREFETCH_COUNT)
+            if path != file_path
+        )
+            
+    def save_file(self) -> bool:
+        """Save the current file; returns whether it was saved."""
         if not self.current_file or not self.handler:
-            return
+            return False
             
         try:
             # Collect text from all sections
-            texts = [editor.get_text() for editor in self.section_editors]
+            texts = [model.get_text() for model in self.section_models]
             content = "\n".join(texts)
             
             # Create backup first
@@ -657,11 +725,115 @@ class DlgGuiEditor:
             
             # If backup succeeds, save to original file
             self.handler.save_with_updated_text(content)
+            self._own_write_stat = self._stat(self.current_file)
+            self.loader.invalidate([self.current_file])
+            self.disk_banner.pack_forget()
+            self.indexer.enqueue(self.current_file)
+            self._update_hashes([self.current_file])
+            
+            # Journal what this save changed; queued, so it never blocks the UI
+            self.journal.record(
+                self.current_file,
+                [(i, old, new) for i, (old, new) in enumerate(zip(self._saved_texts, texts))],
+                reverts_save_id=self._pending_undo
+            )
+            self._saved_texts = texts
+            self._pending_undo = None
+            
+            # Remember every edited section for reuse elsewhere in the game
+            for model, text in zip(self.section_models, texts):
+                if text != model.section.text:
+                    self.memory.add(model.section.text, text)
+            
             self.status_var.set("File saved successfully!")
+            return True
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save file: {str(e)}")
+            return False
+            
+    def apply_to_identical(self):
+        """Save the current file and copy it over every untouched file that shipped identical."""
+        if not self.current_file or not self.handler:
+            return
             
+        targets = [
+            path for path, _, is_translated, is_unchanged in self.db.get_identical_files(self.current_file)
+            if is_unchanged and not is_translated
+        ]
+        if not targets:
+            self.status_var.set("No untranslated identical files to update")
+            return
+        if not messagebox.askyesno(
+            "Apply to Identical Files",
+            f"Overwrite {len(targets)} identical file(s) with this file and mark them as translated?"
+        ):
+            return
+            
+        # Copying a file that failed to save would spread stale content across the game
+        if not self.save_file():
+            self.status_var.set("Not applied to identical files: saving this file failed")
+            return
+        with open(self.current_file, 'rb') as f:
+            content = f.read()
+            
+        written = []
+        for path in targets:
+            temp_path = path + ".tmp"
+            try:
+                shutil.copyfile(path, path + ".bak")
+                # Written aside and swapped in, so a failed write never leaves a half-written file
+                with open(temp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(temp_path, path)
+                written.append(path)
+            except OSError as e:
+                print(f"Error writing {path}: {e}")
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                
+        # One batch for the status and one for the hashes
+        self.db.set_translated_status_many(written, True)
+        self._update_hashes(written)
+        self.loader.invalidate(written)
+        for path in written:
+            self.indexer.enqueue(path)
+            
+        failed = len(targets) - len(written)
+        self.status_var.set(
+            f"Applied to {len(written)} identical file(s)" + (f", {failed} failed" if failed else "")
+        )
+        
+    def _update_hashes(self, file_paths: List[str]):
+        """Record the content hash of files the editor just wrote."""
+        rows = []
+        for path in file_paths:
+            try:
+                stat = os.stat(path)
+                rows.append((path, hash_file(path), stat.st_size, stat.st_mtime))
+            except OSError as e:
+                print(f"Error hashing {path}: {e}")
+        self.db.set_file_hashes(rows)
+        
+    def undo_last_save(self):
+        """Restore the section texts from before the most recent save of this file."""
+        if not self.current_file or not self.section_models:
+            return
+            
+        last = self.journal.last_undoable_save(self.current_file)
+        if not last:
+            self.status_var.set("No saved changes to undo")
+            return
+            
+        save_id, texts = last
+        for index, text in texts.items():
+            if index < len(self.section_models):
+                self.section_models[index].set_text(text)
+        self._pending_undo = save_id
+        self.status_var.set(f"Restored {len(texts)} section(s) from before the last save - press Ctrl+S to keep")
+        
     def mark_translated(self):
         """Mark current file as translated and move to next untranslated file."""
         if not self.current_file:
@@ -674,17 +846,13 @@ class DlgGuiEditor:
         is_translated = self.db.is_file_translated(self.current_file)
         self.db.set_translated_status(self.current_file, not is_translated)
         
-        # Refresh file list while maintaining tree state
-        self.file_list.refresh_files(maintain_selection=True)
-        
         if not is_translated:  # If we just marked it as translated
             # Find and load next untranslated file
             next_file = self.file_list.get_next_untranslated(self.current_file)
             if next_file:
-                self.load_file(next_file)
-                status = "Marked as translated - Loaded next untranslated file"
-            else:
-                status = "Marked as translated - No more untranslated files"
+                self.load_file(next_file, status="Marked as translated - Loaded next untranslated file")
+                return
+            status = "Marked as translated - No more untranslated files"
         else:
             status = "Marked as not translated"
             
@@ -700,14 +868,71 @@ class DlgGuiEditor:
             )
             return
             
-        # Clear and rescan
-        self.db.clear_all_files()
-        for file_path in Path(game_path).rglob("*.dlg"):
-            relative_path = str(file_path.relative_to(game_path))
-            self.db.add_dlg_file(str(file_path), relative_path)
+        if self.scanner and not self.scanner.done:
+            return  # Already rescanning
+            
+        # Sync with the game folder in the background; known files keep their status.
+        # The file list is rebuilt once at the end instead of following every batch.
+        self.file_list.pause()
+        self.scanner = DlgScanner(self.db, game_path)
+        self.scanner.start()
+        self.root.after(100, self._poll_rescan)
+        
+    def _poll_rescan(self):
+        """Report rescan progress and refresh the file list when it finishes."""
+        scanner = self.scanner
+        if not scanner.done:
+            self.status_var.set(f"Rescanning... {scanner.scanned} files")
+            self.root.after(100, self._poll_rescan)
+            return
             
-        self.file_list.refresh_files()
-        self.status_var.set("File list updated")
+        self.file_list.refresh_files(maintain_selection=True)
+        if scanner.error:
+            messagebox.showerror("Error", f"Rescan failed: {scanner.error}")
+            return
+            
+        self.indexer.enqueue_all()
+        self.status_var.set(
+            f"File list updated: {scanner.scanned} files, {scanner.added} added, {scanner.removed} removed"
+        )
+        
+    @staticmethod
+    def _stat(file_path: str):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+        
+    def _on_disk_changes(self, changes):
+        """Apply game folder changes; runs on the watcher thread."""
+        if changes is None:
+            # The watcher lost events, so only a full sync is trustworthy
+            self.ui.post(self.rescan_files)
+            return
+            
+        apply_changes_to_db(self.db, self.watcher.root, changes)
+        self.loader.invalidate(changes)
+        removed = [path for path, kind in changes.items() if kind == REMOVED]
+        self.indexer.remove(removed)
+        for path, kind in changes.items():
+            if kind != REMOVED:
+                self.indexer.enqueue(path)
+        self.ui.post(self._show_disk_changes, changes)
+        
+    def _show_disk_changes(self, changes):
+        """Update the UI after game folder changes; runs on the Tk thread."""
+        kind = changes.get(self.current_file) if self.current_file else None
+        if kind == MODIFIED and self._stat(self.current_file) == self._own_write_stat:
+            return  # Our own save
+        if kind == MODIFIED:
+            self.disk_banner_var.set("This file was changed on disk by another program.")
+        elif kind == REMOVED:
+            self.disk_banner_var.set("This file was deleted from disk.")
+        else:
+            return
+        self.disk_banner.pack(fill=tk.X, pady=(0, 10), before=self.canvas_frame)
+        self.status_var.set(f"{Path(self.current_file).name} changed on disk")
         
     def _bound_to_mousewheel(self, event):
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
@@ -719,7 +944,7 @@ class DlgGuiEditor:
         self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
         
     def _translate_selected(self):
-        """Translate all selected sections in a single batch."""
+        """Translate all selected sections concurrently in the background."""
         if not self.translator.has_valid_key():
             messagebox.showerror(
                 "Error",
@@ -728,8 +953,8 @@ class DlgGuiEditor:
             return
             
         selected_sections = [
-            editor for editor in self.section_editors
-            if editor.is_selected.get()
+            model for model in self.section_models
+            if model.selected
         ]
         
         if not selected_sections:
@@ -739,80 +964,103 @@ class DlgGuiEditor:
             )
             return
             
-        try:
-            # Prepare batch translation request
-            sections_text = []
-            for editor in selected_sections:
-                sections_text.append({
-                    'text': editor.get_text(),
-                    'max_length': editor.max_chars,
-                    'index': editor.index
-                })
-            
-            # Create prompt for batch translation
-            prompt = "Translate the following sections from Russian to English. Each section has a maximum length limit in bytes.\n\n"
-            for i, section in enumerate(sections_text):
-                prompt += f"Section {i + 1} (max {section['max_length']} bytes):\n{section['text']}\n\n"
-            
-            prompt += "\nRequirements:\n"
-            prompt += "1. Translate each section while preserving its meaning and tone\n"
-            prompt += "2. Keep each translation within its specified byte limit\n"
-            prompt += "3. Use only basic Latin characters (a-z, A-Z) and standard punctuation\n"
-            prompt += "4. Maintain any greeting forms and exclamations\n"
-            prompt += "5. Format the response with 'Section N:' on its own line, followed by the translation on the next line\n"
-            prompt += "6. Keep each section's translation as a single paragraph\n"
-            
-            # Get batch translation
-            response = self.translator.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert translator specializing in game dialog translation from Russian to English. Format each section's translation clearly with 'Section N:' headers."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
+        # Sections with an exact translation memory hit skip the API entirely
+        translations_by_editor = {}
+        to_translate = []
+        for editor in selected_sections:
+            match = self.memory.lookup_fitting(editor.get_text(), editor.max_chars)
+            if match:
+                translations_by_editor[editor] = match.translation
+            else:
+                to_translate.append(editor)
+                
+        if not to_translate:
+            BatchTranslationDialog(self.root, selected_sections, [translations_by_editor[e] for e in selected_sections])
+            return
+            
+        # Sections are packed into token-budgeted requests that run concurrently in the background
+        jobs = [
+            TranslationJob(model.get_text(), model.max_chars, model.section.encoding, key=model)
+            for model in to_translate
+        ]
+        self.translate_btn.configure(state=tk.DISABLED)
+        self.status_var.set(f"Translating {len(jobs)} section(s)...")
+        self._translation_batch = self.engine.submit_packed(
+            jobs,
+            on_result=self._on_section_translated,
+            on_done=lambda batch: self._on_batch_translated(batch, selected_sections, translations_by_editor)
+        )
+        
+    def _on_section_translated(self, batch, index, translation, error):
+        """Report progress of a batch started by _translate_selected."""
+        if batch is self._translation_batch:
+            self.status_var.set(f"Translating... {batch.completed}/{batch.total} section(s)")
             
-            # Parse response and extract translations
-            response_text = response.choices[0].message.content
-            translations = []
-            current_section = None
-            current_text = []
-            
-            for line in response_text.split('\n'):
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # Check for section header
-                if line.lower().startswith('section ') and ':' in line:
-                    # Save previous section if exists
-                    if current_section is not None and current_text:
-                        translations.append(' '.join(current_text))
-                    current_section = line
-                    current_text = []
-                elif current_section is not None:
-                    current_text.append(line)
-            
-            # Add the last section
-            if current_section is not None and current_text:
-                translations.append(' '.join(current_text))
-            
-            # Ensure we have the right number of translations
-            if len(translations) != len(selected_sections):
-                raise ValueError(f"Expected {len(selected_sections)} translations, but got {len(translations)}")
-            
-            # Show results in dialog
-            BatchTranslationDialog(self.root, selected_sections, translations)
+    def _on_batch_translated(self, batch, selected_sections, translations_by_editor):
+        """Show the results of a finished batch."""
+        if batch is not self._translation_batch:
+            return
+        self._translation_batch = None
+        self.translate_btn.configure(state=tk.NORMAL)
+        if batch.cancelled:
+            self.status_var.set("Translation cancelled")
+            return
             
-        except Exception as e:
+        for index, translation in batch.results.items():
+            translations_by_editor[batch.jobs[index].key] = translation
+        if batch.errors:
+            first_error = next(iter(batch.errors.values()))
+            self.status_var.set(f"Translated {len(batch.results)}/{batch.total} section(s)")
             messagebox.showerror(
                 "Error",
-                f"Translation failed: {str(e)}"
+                f"Translation failed for {len(batch.errors)} section(s): {first_error}"
             )
+        else:
+            self.status_var.set(f"Translated {batch.total} section(s)")
+            
+        # Show results in dialog
+        BatchTranslationDialog(
+            self.root,
+            selected_sections,
+            [translations_by_editor.get(e, "") for e in selected_sections]
+        )
+        
+    def fill_from_memory(self):
+        """Fill every section that has an exact translation memory match."""
+        if not self.section_models:
+            return
+            
+        filled = 0
+        for model in self.section_models:
+            match = self.memory.lookup_fitting(model.get_text(), model.max_chars)
+            if match and match.translation != model.get_text():
+                model.set_text(match.translation)
+                filled += 1
+                
+        self.status_var.set(f"Filled {filled} section(s) from translation memory")
+        
+    def apply_drafts(self):
+        """Fill sections with drafts from the batch pipeline, leaving edited sections alone."""
+        if not self.current_file:
+            return
+            
+        applied = 0
+        skipped = 0
+        for section_index, source_text, draft in self.db.get_drafts(self.current_file):
+            if section_index >= len(self.section_models):
+                continue
+            model = self.section_models[section_index]
+            # The draft was made for this text; anything else was edited since
+            if model.get_text() != source_text:
+                skipped += 1
+                continue
+            model.set_text(draft)
+            applied += 1
+            
+        message = f"Applied {applied} draft(s)"
+        if skipped:
+            message += f", skipped {skipped} section(s) changed since drafting"
+        self.status_var.set(message + " - review and save to keep them")
         
     def _load_next_untranslated(self):
         """Load the next untranslated file."""
@@ -823,30 +1071,9 @@ class DlgGuiEditor:
         # Find and load next untranslated file
         next_file = self.file_list.get_next_untranslated(self.current_file)
         if next_file:
-            # Find the item in the tree that corresponds to this file
-            def find_item_by_path(parent=""):
-                for item in self.file_list.tree.get_children(parent):
-                    if self.file_list.tree.item(item)["values"] and self.file_list.tree.item(item)["values"][0] == next_file:
-                        return item
-                    found = find_item_by_path(item)
-                    if found:
-                        return found
-                return None
-                
-            item_id = find_item_by_path()
-            if item_id:
-                # Ensure parent folders are expanded
-                parent = self.file_list.tree.parent(item_id)
-                while parent:
-                    self.file_list.tree.item(parent, open=True)
-                    parent = self.file_list.tree.parent(parent)
-                    
-                # Select and scroll to the item
-                self.file_list.tree.selection_set(item_id)
-                self.file_list.tree.see(item_id)
-            
-            self.load_file(next_file)
-            self.status_var.set("Loaded next untranslated file")
+            # Select it in the tree, populating its folders if needed
+            self.file_list.reveal(next_file)
+            self.load_file(next_file, status="Loaded next untranslated file")
         else:
             self.status_var.set("No more untranslated files")
             messagebox.showinfo("Info", "No more untranslated files found")
@@ -883,11 +1110,9 @@ class DlgGuiEditor:
             # Find and load next untranslated file
             next_file = self.file_list.get_next_untranslated(self.current_file)
             if next_file:
-                self.load_file(next_file)
-                status += " - Loaded next untranslated file"
+                self.load_file(next_file, status=status + " - Loaded next untranslated file")
+                return
             
-        # Refresh file list while maintaining tree state
-        self.file_list.refresh_files(maintain_selection=True)
         self.status_var.set(status)
         
     def _analyze_first_entry(self):
@@ -971,4 +1196,12 @@ class DlgGuiEditor:
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.watcher:
+            self.watcher.stop()
+        self.loader.stop()
+        self.engine.stop()
+        if self.response_cache:
+            self.response_cache.close()
+        self.ui.close()
+        self.indexer.stop()
         self.db.close() 
\ No newline at end of file
@@ -0,0 +1,365 @@
+"""Rate limiting, retries and circuit breaking shared by every translation request."""
+
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+from openai import APIConnectionError
+
+T = TypeVar('T')
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# How often requests held by an open circuit look again while its trial request is out
+TRIAL_POLL = 0.05
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the endpoint is failing."""
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a request that failed with error may succeed if sent again."""
+    if isinstance(error, APIConnectionError):  # Includes timeouts
+        return True
+    status = getattr(error, 'status_code', None)
+    return status in (408, 409, 429) or (status is not None and status >= 500)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked to wait before the next request, if it said."""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    for name, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+        try:
+            return max(float(headers.get(name)) * scale, 0.0)
+        except (TypeError, ValueError):
+            continue  # Missing, or the HTTP-date form, which is not worth parsing
+    return None
+
+
+class _Slots:
+    """A concurrency limit shared by threads and event loops, handed out in order."""
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[Callable[[], None]] = deque()
+
+    def take(self) -> None:
+        with self._lock:
+            if self._free():
+                self.used += 1
+                return
+            ready = threading.Event()
+            self._waiters.append(ready.set)
+        ready.wait()
+
+    async def take_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._free():
+                self.used += 1
+                return
+            self._waiters.append(lambda: loop.call_soon_threadsafe(self._hand_over, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():  # Handed a slot just before the cancel
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while True:
+            with self._lock:
+                if self._waiters:
+                    wake = self._waiters.popleft()  # The slot passes straight to the next waiter
+                else:
+                    self.used -= 1
+                    return
+            try:
+                wake()
+                return
+            except RuntimeError:
+                continue  # The waiter's event loop is closed; pass the slot on
+
+    def _free(self) -> bool:
+        return (self.limit is None or self.used < self.limit) and not self._waiters
+
+    def _hand_over(self, future: asyncio.Future) -> None:
+        if future.done():  # The waiter was cancelled; pass the slot on
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class RequestGovernor:
+    """Decides when requests go out, and whether failed ones are sent again.
+
+    - Rate: a token bucket of ``requests_per_minute``, allowing bursts of
+      ``burst`` requests. A Retry-After from the server pauses every request,
+      not only the one that got it.
+    - Retries: transient failures (connection errors, 408/409/429/5xx) are
+      sent again up to ``max_retries`` times, after a jittered exponential
+      backoff.
+    - Circuit breaker: after ``failure_threshold`` transient failures in a
+      row the circuit opens and requests wait ``reset_timeout`` seconds; then
+      one trial request decides whether to close it again. Requests that
+      were in flight together count as one failure, so a single burst of
+      errors does not open it. Once it has stayed open for ``open_timeout``
+      seconds requests fail fast with CircuitOpenError instead of waiting.
+    - Concurrency: at most ``max_concurrency`` requests in flight, across
+      every thread and event loop using the governor.
+
+    One governor is shared by all the backends of a translator, so a batch
+    run and the editor draw on the same quota.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, burst: Optional[int] = None,
+                 max_concurrency: Optional[int] = 16, max_retries: int = 4, base_delay: float = 0.5,
+                 max_delay: float = 30.0, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 open_timeout: float = 300.0):
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst or max(1, int((requests_per_minute or 60) / 60))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.open_timeout = open_timeout
+        self._lock = threading.Lock()
+        self._slots = _Slots(max_concurrency)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._opened_at: Optional[float] = None
+        self._open_since: Optional[float] = None  # When the circuit first opened in this outage
+        self._last_failure = 0.0  # When the last failure counted towards the threshold came back
+        self._trial = False  # A half-open trial request is in flight
+        self._consecutive_failures = 0
+        self._counts = dict(queued=0, in_flight=0, succeeded=0, failed=0, retried=0, throttled=0,
+                            rate_limited=0, rejected=0)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters since creation; queued and in_flight are current.
+
+        ``throttled`` counts requests delayed by the rate limit or a
+        Retry-After pause, ``rate_limited`` 429 responses and ``rejected``
+        requests refused by the open circuit.
+        """
+        with self._lock:
+            return dict(self._counts, circuit=self._state(time.monotonic()))
+
+    def call(self, send: Callable[[Dict], T], request: Dict) -> T:
+        """Send request with send(request) under the governor's rules."""
+        attempt = 0
+        while True:
+            self._count('queued', 1)
+            try:
+                self._slots.take()
+            finally:
+                self._count('queued', -1)
+            try:
+                trial, wait = self._admit()
+            except CircuitOpenError:
+                self._slots.release()
+                raise
+            if wait:
+                # Wait for the circuit without holding a slot the trial request needs
+                self._slots.release()
+                time.sleep(wait)
+                continue
+            try:
+                try:
+                    time.sleep(self._reserve())
+                    self._count('in_flight', 1)
+                    sent = time.monotonic()
+                    try:
+                        result = send(request)
+                    finally:
+                        self._count('in_flight', -1)
+                finally:
+                    self._slots.release()
+            except Exception as e:
+                delay = self._failed(e, attempt, sent, trial)
+                if delay is None:
+                    raise
+            else:
+                self._succeeded()
+                return result
+            finally:
+                self._end_trial(trial)
+            attempt += 1
+            time.sleep(delay)
+
+    async def call_async(self, send: Callable[[Dict], Awaitable[T]], request: Dict) -> T:
+        """Like call, on the running event loop."""
+        attempt = 0
+        while True:
+            self._count('queued', 1)
+            try:
+                await self._slots.take_async()
+            finally:
+                self._count('queued', -1)
+            try:
+                trial, wait = self._admit()
+            except CircuitOpenError:
+                self._slots.release()
+                raise
+            if wait:
+                self._slots.release()
+                await asyncio.sleep(wait)
+                continue
+            try:
+                try:
+                    await asyncio.sleep(self._reserve())
+                    self._count('in_flight', 1)
+                    sent = time.monotonic()
+                    try:
+                        result = await send(request)
+                    finally:
+                        self._count('in_flight', -1)
+                finally:
+                    self._slots.release()
+            except Exception as e:
+                delay = self._failed(e, attempt, sent, trial)
+                if delay is None:
+                    raise
+            else:
+                self._succeeded()
+                return result
+            finally:
+                self._end_trial(trial)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self._trial or now - self._opened_at < self.reset_timeout:
+            return OPEN
+        return HALF_OPEN
+
+    def _count(self, name: str, delta: int) -> None:
+        with self._lock:
+            self._counts[name] += delta
+
+    def _admit(self) -> Tuple[bool, float]:
+        """Pass a request through the circuit; returns whether it is the trial and how long to wait first.
+
+        Raises CircuitOpenError once the circuit has been open for longer
+        than ``open_timeout``.
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            if state == CLOSED:
+                return False, 0.0
+            if state == HALF_OPEN:
+                self._trial = True
+                return True, 0.0
+            reopen = max(self._opened_at + self.reset_timeout, now)
+            if reopen - self._open_since > self.open_timeout:
+                self._counts['rejected'] += 1
+                raise CircuitOpenError(
+                    f"Requests paused after {self._consecutive_failures} failures in a row")
+            return False, max(reopen - now, TRIAL_POLL)
+
+    def _reserve(self) -> float:
+        """Take a token from the bucket; returns how long to wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self.requests_per_minute:
+                rate = self.requests_per_minute / 60.0
+                self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * rate)
+                self._updated = now
+                # Going negative reserves a future token, so waiters keep their order
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / rate)
+            if wait > 0:
+                self._counts['throttled'] += 1
+            return wait
+
+    def _succeeded(self) -> None:
+        with self._lock:
+            self._counts['succeeded'] += 1
+            self._close()
+
+    def _failed(self, error: Exception, attempt: int, sent: float, trial: bool) -> Optional[float]:
+        """Record a failure of a request sent at sent; returns the backoff before retrying, or None to give up."""
+        with self._lock:
+            now = time.monotonic()
+            if not is_transient(error):
+                # The endpoint answered; the request itself is at fault
+                self._counts['failed'] += 1
+                self._close()
+                return None
+
+            if sent >= self._last_failure:
+                # Requests already in flight when the last failure came back are part of it
+                self._consecutive_failures += 1
+                self._last_failure = now
+            if getattr(error, 'status_code', None) == 429:
+                self._counts['rate_limited'] += 1
+            wait = retry_after(error)
+            if wait is not None:
+                self._paused_until = max(self._paused_until, now + wait)
+            if trial or self._consecutive_failures >= self.failure_threshold:
+                self._opened_at = now
+                if self._open_since is None:
+                    self._open_since = now
+            if attempt >= self.max_retries:
+                self._counts['failed'] += 1
+                return None
+            self._counts['retried'] += 1
+            return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _close(self) -> None:
+        self._consecutive_failures = 0
+        self._last_failure = 0.0
+        self._opened_at = None
+        self._open_since = None
+
+    def _end_trial(self, trial: bool) -> None:
+        if trial:
+            with self._lock:
+                # The trial is over, whether it succeeded, failed or was cancelled
+                self._trial = False
+
+
+class GovernedBackend:
+    """A translation backend whose requests go through a RequestGovernor."""
+
+    def __init__(self, backend, governor: RequestGovernor):
+        self.backend = backend
+        self.governor = governor
+
+    @property
+    def model(self) -> str:
+        return self.backend.model
+
+    def complete(self, request: Dict):
+        return self.governor.call(self.backend.complete, request)
+
+    async def complete_async(self, request: Dict):
+        return await self.governor.call_async(self.backend.complete_async, request)
+
+    def for_loop(self) -> "GovernedBackend":
+        return GovernedBackend(self.backend.for_loop(), self.governor)
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
@@ -0,0 +1,60 @@
+"""Split many sections into API requests that fit a token budget."""
+
+from typing import List, Sequence, Tuple
+
+# (section id, source text, byte budget of the translation)
+BatchItem = Tuple[int, str, int]
+
+# Prompt text around the sections of a batch request, in tokens
+REQUEST_OVERHEAD_TOKENS = 250
+# Per-section overhead: the section header in the prompt and in the answer
+ITEM_OVERHEAD_TOKENS = 12
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text: about 4 bytes of UTF-8 per token.
+
+    Cyrillic letters take 2 bytes each, which matches Russian text costing
+    roughly twice as many tokens per character as English.
+    """
+    return len(text.encode('utf-8')) // 4 + 1
+
+
+def estimate_output_tokens(max_bytes: int) -> int:
+    """Tokens needed for an English translation of at most max_bytes bytes."""
+    return max_bytes // 3 + 1
+
+
+def pack_items(items: Sequence[BatchItem], max_input_tokens: int = 6000,
+               max_output_tokens: int = 2000, max_items: int = 40) -> List[List[BatchItem]]:
+    """Group items, in order, into packs that fit the input and output budgets.
+
+    A section that alone exceeds a budget still gets a pack of its own.
+    ``max_items`` keeps packs small enough that several run concurrently
+    even for a modest selection.
+    """
+    packs: List[List[BatchItem]] = []
+    current: List[BatchItem] = []
+    input_tokens = REQUEST_OVERHEAD_TOKENS
+    output_tokens = 0
+    for item in items:
+        item_input = estimate_tokens(item[1]) + ITEM_OVERHEAD_TOKENS
+        item_output = estimate_output_tokens(item[2]) + ITEM_OVERHEAD_TOKENS
+        if current and (len(current) >= max_items
+                        or input_tokens + item_input > max_input_tokens
+                        or output_tokens + item_output > max_output_tokens):
+            packs.append(current)
+            current = []
+            input_tokens = REQUEST_OVERHEAD_TOKENS
+            output_tokens = 0
+        current.append(item)
+        input_tokens += item_input
+        output_tokens += item_output
+    if current:
+        packs.append(current)
+    return packs
+
+
+def output_budget(items: Sequence[BatchItem]) -> int:
+    """max_tokens for a request translating items, with room for formatting."""
+    return sum(estimate_output_tokens(max_bytes) + ITEM_OVERHEAD_TOKENS for _, _, max_bytes in items) + 50
@@ -0,0 +1,141 @@
+"""On-disk cache of AI translation responses, shared by every translation path."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def cache_key(text: str, max_bytes: int, encoding: str, model: str, prompt_version: int) -> str:
+    """Key of the translation of a section.
+
+    The context sent along is deliberately not part of it: the same line
+    translated alone, in a batch or with a different window around it is
+    the same section, so every translation path shares the cached answer.
+    """
+    parts = [text, max_bytes, encoding, model, prompt_version]
+    return hashlib.blake2b(json.dumps(parts, ensure_ascii=False).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def summary_key(texts: List[str], model: str, prompt_version: int) -> str:
+    """Key of the summary of a dialog file with the given section texts."""
+    parts = ["summary", model, prompt_version, texts]
+    return hashlib.blake2b(json.dumps(parts, ensure_ascii=False).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """Translations already paid for, kept in a small SQLite file.
+
+    Lookups go through an in-memory LRU first, so repeated hits do not touch
+    the disk. The file holds at most ``max_entries`` responses; when it grows
+    past that the least recently used ones are evicted. Recency of memory
+    hits is written back lazily with the next store or on close.
+
+    Safe to use from several threads.
+    """
+
+    DEFAULT_PATH = Path.home() / ".dlg_editor" / "response_cache.db"
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 20000, memory_entries: int = 1000):
+        self.path = Path(path) if path is not None else self.DEFAULT_PATH
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._touched: Dict[str, float] = {}  # Key -> last use not yet written to disk
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                translation TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached translation, counting the hit or miss."""
+        with self._lock:
+            translation = self._memory.get(key)
+            if translation is not None:
+                self._memory.move_to_end(key)
+            else:
+                row = self._conn.execute("SELECT translation FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                translation = row[0]
+                self._remember(key, translation)
+            self._touched[key] = time.time()
+            self.hits += 1
+            return translation
+
+    def put(self, key: str, translation: str) -> None:
+        """Store a translation, evicting the least recently used ones over the cap."""
+        with self._lock:
+            self._remember(key, translation)
+            self._touched.pop(key, None)
+            self._conn.execute("BEGIN")
+            try:
+                self._write_touched()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, translation, last_used) VALUES (?, ?, ?)",
+                    (key, translation, time.time())
+                )
+                count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self.max_entries:
+                    # Evict a little extra so the count is not recomputed on every store
+                    excess = count - self.max_entries + self.max_entries // 10
+                    self._conn.execute('''
+                        DELETE FROM responses WHERE key IN (
+                            SELECT key FROM responses ORDER BY last_used LIMIT ?
+                        )
+                    ''', (excess,))
+                    self._memory.clear()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters of this session and the number of stored responses."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._write_touched()
+            except sqlite3.Error as e:
+                print(f"Error saving response cache: {e}")
+            self._conn.close()
+
+    def _remember(self, key: str, translation: str) -> None:
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _write_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()]
+            )
+            self._touched.clear()
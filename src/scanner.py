@@ -0,0 +1,178 @@
+"""Single-pass background scanning of the game folder for .dlg files."""
+
+import os
+import hashlib
+import threading
+from typing import Callable, Iterator, Optional, Tuple
+from db_handler import DbHandler
+
+
+def hash_file(file_path: str) -> str:
+    """Fast content hash used to find identical dialog files."""
+    with open(file_path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def iter_dlg_files(game_path: str, cancelled: Optional[threading.Event] = None) -> Iterator[Tuple[str, str]]:
+    """Yield (file_path, relative_path) for every .dlg file under game_path."""
+    for entry, relative_path in iter_dlg_entries(game_path, cancelled):
+        yield entry.path, relative_path
+
+
+def iter_dlg_entries(game_path: str, cancelled: Optional[threading.Event] = None) -> Iterator[Tuple[os.DirEntry, str]]:
+    """Yield (DirEntry, relative_path) for every .dlg file under game_path.
+
+    Uses os.scandir so directory entries carry their type without an extra
+    stat call. Paths are built from the normalized root, so they match the
+    str(Path) form stored by earlier versions.
+    """
+    root = os.path.normpath(game_path)
+    prefix_len = len(os.path.join(root, ''))
+    stack = [root]
+    while stack:
+        if cancelled is not None and cancelled.is_set():
+            return
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name.lower().endswith('.dlg') and entry.is_file():
+                            yield entry, entry.path[prefix_len:]
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"Error scanning {directory}: {e}")
+            continue
+        # Reversed so directories are visited in listing order
+        stack.extend(reversed(sorted(subdirs)))
+
+
+class DlgScanner:
+    """Scans the game folder on a worker thread and streams results to the database.
+
+    Progress is exposed through the ``scanned`` and ``current_path``
+    attributes so the Tk thread can poll them with ``root.after`` instead of
+    being called back from the worker.
+
+    With ``replace=True`` the file table is rebuilt from scratch (first-time
+    setup); the new table is swapped in only once the scan completes, so a
+    cancelled or failed scan leaves the old one untouched. Otherwise new
+    files are added, known files keep their status and files that
+    disappeared are removed once the scan completes.
+
+    Every file gets a content hash so identical dialogs can be grouped.
+    Files whose size and mtime match the previous scan are not re-read.
+    """
+
+    BATCH_SIZE = 200
+
+    def __init__(self, db: DbHandler, game_path: str, replace: bool = False,
+                 on_batch: Optional[Callable[[list], None]] = None):
+        self.db = db
+        self.game_path = game_path
+        self.replace = replace
+        self.on_batch = on_batch  # Called from the worker with each list of (file_path, relative_path)
+        self.scanned = 0
+        self.current_path = ""
+        self.added = 0
+        self.removed = 0
+        self.error: Optional[Exception] = None
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._thread = None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def start(self) -> None:
+        """Start scanning in the background."""
+        self._thread = threading.Thread(target=self._run, name="DlgScanner", daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Stop after the current directory; files already written stay in the database.
+
+        A replace scan writes nothing until it completes, so cancelling it keeps the old table.
+        """
+        self._cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the scan finishes. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def run(self) -> None:
+        """Scan synchronously on the calling thread."""
+        states = {} if self.replace else self.db.get_hash_states()
+
+        seen = set()
+        batch = []
+        hashes = []
+        staged_files = []  # Replace scans collect everything here instead of writing as they go
+        staged_hashes = []
+        for entry, relative_path in iter_dlg_entries(self.game_path, self._cancelled):
+            file_path = entry.path
+            seen.add(file_path)
+            self.scanned += 1
+            self.current_path = relative_path
+
+            state = states.get(file_path)
+            if state is None:
+                batch.append((file_path, relative_path))
+            try:
+                stat = entry.stat()
+                if state is None or state[2] is None or state[:2] != (stat.st_size, stat.st_mtime):
+                    hashes.append((file_path, hash_file(file_path), stat.st_size, stat.st_mtime))
+            except OSError as e:
+                print(f"Error hashing {file_path}: {e}")
+
+            if self.replace:
+                staged_files.extend(batch)
+                staged_hashes.extend(hashes)
+                batch = []
+                hashes = []
+            elif len(batch) >= self.BATCH_SIZE or len(hashes) >= self.BATCH_SIZE:
+                self._flush(batch, hashes)
+                batch = []
+                hashes = []
+
+        if self.replace:
+            if not self.cancelled:
+                self.db.replace_all_files(staged_files, staged_hashes)
+                self.added = len(staged_files)
+                if staged_files and self.on_batch:
+                    self.on_batch(staged_files)
+            return
+        self._flush(batch, hashes)
+
+        if not self.cancelled:
+            missing = states.keys() - seen
+            self.db.remove_dlg_files(missing)
+            self.removed = len(missing)
+
+    def _flush(self, batch: list, hashes: list) -> None:
+        if batch:
+            self.db.add_dlg_files(batch)
+            self.added += len(batch)
+        if hashes:
+            self.db.set_file_hashes(hashes)
+        if batch and self.on_batch:
+            self.on_batch(batch)
+
+    def _run(self):
+        try:
+            self.run()
+        except Exception as e:
+            print(f"Error scanning files: {e}")
+            self.error = e
+        finally:
+            self.db.close_thread_connection()
+            self._done.set()
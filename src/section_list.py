@@ -0,0 +1,517 @@
+"""Virtualized list of dialog section editors."""
+
+import bisect
+import tkinter as tk
+from tkinter import ttk, messagebox
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+from dlg_handler import TextSection, max_text_bytes
+from ai_translator import AITranslator
+from translation_engine import TranslationEngine, TranslationJob
+from context_window import context_window
+
+# Overflow states of a section
+FITS = 'fits'
+SLIGHT_OVERFLOW = 'slight_overflow'
+OVERFLOW = 'overflow'
+UNENCODABLE = 'unencodable'  # Contains characters the game encoding cannot store
+
+
+def _measure(text: str, encoding: str) -> Tuple[int, int]:
+    """Get (encoded byte length, characters the encoding cannot store) of a text."""
+    try:
+        return len(text.encode(encoding)), 0
+    except UnicodeEncodeError:
+        unencodable = 0
+        for char in text:
+            try:
+                char.encode(encoding)
+            except UnicodeEncodeError:
+                unencodable += 1
+        return len(text.encode(encoding, errors='replace')), unencodable
+
+
+class SectionModel:
+    """Editing state of one section, independent of any widget.
+
+    Only sections near the viewport have an editor, so the text, selection
+    and overflow status of every section live here. ``view`` is the editor
+    currently showing the model, if any, and ``translating`` is set while a
+    translation of the section is in flight.
+
+    While the section is edited, the byte length is adjusted from each
+    inserted and removed piece of text; the full text is only read back
+    from the editor when someone asks for it.
+    """
+
+    def __init__(self, section: TextSection, index: int):
+        self.section = section
+        self.index = index
+        self.max_chars = max_text_bytes(section, index)
+        self.selected = False
+        self.translating = False
+        self.view: Optional["SectionEditor"] = None
+        self.on_state_change: Optional[Callable[[str, str], None]] = None  # (old state, new state)
+        self.text = section.text
+        self._stale = False  # The editor holds newer text than self.text
+        self.byte_length, self.unencodable = _measure(self.text, section.encoding)
+        self.state = self.overflow_state()
+
+    @property
+    def text_lines(self) -> int:
+        """Height of the editor for this section, in lines."""
+        return max(2, min(5, self.max_chars // 40))
+
+    def get_text(self) -> str:
+        """Get the current text content"""
+        if self._stale and self.view is not None:
+            self.text = self.view.read_text()
+        self._stale = False
+        return self.text
+
+    def set_text(self, text: str) -> None:
+        """Set the text content, updating the editor showing it."""
+        self.update_text(text)
+        if self.view is not None:
+            self.view.show_text(text)
+
+    def update_text(self, text: str) -> None:
+        """Replace the text, measuring it in full."""
+        self.text = text
+        self._stale = False
+        self.byte_length, self.unencodable = _measure(text, self.section.encoding)
+        self._update_state()
+
+    def apply_edit(self, inserted: str, removed: str) -> None:
+        """Account for an edit made in the editor without reading the whole text."""
+        self._stale = True
+        added_bytes, added_unencodable = _measure(inserted, self.section.encoding)
+        removed_bytes, removed_unencodable = _measure(removed, self.section.encoding)
+        self.byte_length += added_bytes - removed_bytes
+        self.unencodable += added_unencodable - removed_unencodable
+        self._update_state()
+
+    def overflow_state(self) -> str:
+        """Whether the text fits, slightly overflows or overflows its space."""
+        if self.unencodable:
+            return UNENCODABLE
+        # Allow slight overflow: 10% or 10 bytes, whichever is smaller
+        allowed_overflow = min(10, self.max_chars * 0.1)
+        if self.byte_length > self.max_chars + allowed_overflow:
+            return OVERFLOW
+        if self.byte_length > self.max_chars:
+            return SLIGHT_OVERFLOW
+        return FITS
+
+    def _update_state(self):
+        state = self.overflow_state()
+        if state != self.state:
+            old, self.state = self.state, state
+            if self.on_state_change:
+                self.on_state_change(old, state)
+
+
+class SectionEditor(ttk.Frame):
+    """Editor row that can be rebound to any SectionModel."""
+
+    # Editor background and length label colour per overflow state
+    STYLES = {
+        FITS: ('white', 'gray', ""),
+        SLIGHT_OVERFLOW: ('#fff3e6', 'orange', " - SLIGHT OVERFLOW"),
+        OVERFLOW: ('#ffe6e6', 'red', " - OVERFLOW"),
+        UNENCODABLE: ('#ffe6e6', 'red', " - UNSUPPORTED CHARACTERS"),
+    }
+
+    # Styling waits until typing pauses for this long
+    VALIDATE_DELAY_MS = 150
+
+    def __init__(self, parent, translator: AITranslator = None,
+                 get_context: Optional[Callable[["SectionModel"], Tuple[List[str], Optional[str]]]] = None,
+                 engine: Optional[TranslationEngine] = None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.translator = translator
+        self.engine = engine
+        self.get_context = get_context
+        self.model: Optional[SectionModel] = None
+        self.is_selected = tk.BooleanVar(value=False)
+        self._replacing = False  # Set while show_text replaces the content
+        self._validate_job = None
+
+        # Create frame with border
+        self.configure(relief='solid', borderwidth=1, padding=5)
+
+        # Section header
+        header_frame = ttk.Frame(self)
+        header_frame.pack(fill=tk.X, pady=(0, 5))
+
+        # Left side of header
+        header_left = ttk.Frame(header_frame)
+        header_left.pack(side=tk.LEFT)
+
+        # Add checkbox for selection
+        self.select_cb = ttk.Checkbutton(
+            header_left,
+            variable=self.is_selected,
+            style='Bold.TCheckbutton',
+            command=self._on_select
+        )
+        self.select_cb.pack(side=tk.LEFT, padx=(0, 10))
+
+        # Individual translate button, shown while an API key is configured
+        self.translate_btn = ttk.Button(
+            header_left,
+            text="Translate",
+            command=self._translate_section,
+            width=10
+        )
+
+        # Show both current and maximum available length
+        self.length_label = ttk.Label(
+            header_frame,
+            font=('TkDefaultFont', 9),
+            foreground='gray'
+        )
+        self.length_label.pack(side=tk.RIGHT)
+
+        # Editor
+        self.editor = tk.Text(
+            self,
+            wrap=tk.WORD,
+            height=2,
+            font=('Courier', 11)
+        )
+        self.editor.pack(fill=tk.BOTH, expand=True)
+        self._install_proxy()
+
+    def _install_proxy(self):
+        """Route the Text widget's Tcl command through _proxy to see every edit.
+
+        Typing, pasting and Tk's own bindings all call the widget command,
+        so the inserted and removed text is known without re-reading it.
+        """
+        widget = self.editor._w
+        self._editor_cmd = widget + "_orig"
+        self.tk.call("rename", widget, self._editor_cmd)
+        self.tk.createcommand(widget, self._proxy)
+
+    def _proxy(self, command, *args):
+        call = (self._editor_cmd, command) + args
+        if self._replacing or self.model is None or command not in ('insert', 'delete', 'replace'):
+            return self.tk.call(call)
+
+        if command == 'insert':
+            # insert index chars ?tagList chars tagList ...?
+            removed = ""
+            inserted = "".join(args[1::2])
+        elif command == 'delete' and len(args) <= 2:
+            removed = self._text_between(args[0], args[1] if len(args) > 1 else None)
+            inserted = ""
+        elif command == 'replace':
+            # replace index1 index2 chars ?tagList chars tagList ...?
+            removed = self._text_between(args[0], args[1])
+            inserted = "".join(args[2::2])
+        else:
+            # Deleting several ranges at once; rare enough to just re-measure
+            result = self.tk.call(call)
+            self.model.update_text(self.read_text())
+            self._schedule_validation()
+            return result
+
+        result = self.tk.call(call)
+        self.model.apply_edit(inserted, removed)
+        self._schedule_validation()
+        return result
+
+    def _text_between(self, index1: str, index2: Optional[str]) -> str:
+        """Get the text a delete of index1..index2 will remove."""
+        if index2 is None:
+            index2 = f"{index1}+1c"
+        # The final newline of a Text widget is never deleted
+        if self.tk.getboolean(self.tk.call(self._editor_cmd, 'compare', index2, '>', 'end-1c')):
+            index2 = 'end-1c'
+        return self.tk.call(self._editor_cmd, 'get', index1, index2)
+
+    def bind_model(self, model: SectionModel):
+        """Show a section in this editor."""
+        self.unbind_model()
+        self.model = model
+        model.view = self
+
+        self.is_selected.set(model.selected)
+        self.select_cb.configure(text=f"Section {model.index + 1}")
+        self.editor.configure(height=model.text_lines)
+        if self.translator and self.translator.has_valid_key():
+            self.translate_btn.pack(side=tk.LEFT)
+        else:
+            self.translate_btn.pack_forget()
+        self.show_translating(model.translating)
+        self.show_text(model.get_text())
+
+    def unbind_model(self):
+        """Detach from the current section so the editor can be reused."""
+        if self.model is not None:
+            self.model.get_text()  # Keep what was typed
+            self.model.view = None
+            self.model = None
+        if self._validate_job:
+            self.after_cancel(self._validate_job)
+            self._validate_job = None
+
+    def read_text(self) -> str:
+        """Get the text currently in the editor."""
+        return self.editor.get('1.0', 'end-1c')
+
+    def show_text(self, text: str):
+        """Replace the editor content without reporting it back as an edit."""
+        self._replacing = True
+        try:
+            self.editor.delete('1.0', 'end')
+            self.editor.insert('1.0', text)
+        finally:
+            self._replacing = False
+        self._validate_length()
+
+    def show_translating(self, translating: bool):
+        """Disable the Translate button while the shown section is being translated."""
+        if translating:
+            self.translate_btn.configure(state=tk.DISABLED, text="Translating...")
+        else:
+            self.translate_btn.configure(state=tk.NORMAL, text="Translate")
+
+    def _on_select(self):
+        if self.model is not None:
+            self.model.selected = self.is_selected.get()
+
+    def _schedule_validation(self):
+        if self._validate_job:
+            self.after_cancel(self._validate_job)
+        self._validate_job = self.after(self.VALIDATE_DELAY_MS, self._validate_length)
+
+    def _validate_length(self, event=None):
+        """Update visual feedback for the text length"""
+        self._validate_job = None
+        model = self.model
+        if model is None:
+            return
+        background, foreground, suffix = self.STYLES[model.state]
+        self.editor.configure(background=background)
+        self.length_label.configure(
+            text=f"(Current: {model.byte_length} bytes, Max available: {model.max_chars} bytes){suffix}",
+            foreground=foreground
+        )
+
+    def _translate_section(self):
+        """Translate the current section using OpenAI, in the background if an engine is available."""
+        if not self.translator or self.model is None:
+            return
+
+        model = self.model
+        # The sections around this one and the file's summary give the translator context
+        context, summary = self.get_context(model) if self.get_context else ([], None)
+        if self.engine is None:
+            try:
+                model.set_text(self.translator.translate_text(
+                    model.get_text(),
+                    model.max_chars,
+                    model.section.encoding,
+                    context=context,
+                    summary=summary
+                ))
+            except Exception as e:
+                messagebox.showerror("Translation Error", str(e))
+            return
+
+        model.translating = True
+        self.show_translating(True)
+        job = TranslationJob(model.get_text(), model.max_chars, model.section.encoding, context, key=model, summary=summary)
+        self.engine.submit([job], on_result=self._on_translated, on_done=self._on_translate_done)
+
+    def _on_translated(self, batch, index, translation, error):
+        # The model may have scrolled out of view meanwhile; it still takes the text
+        if error is not None:
+            messagebox.showerror("Translation Error", str(error))
+        else:
+            batch.jobs[index].key.set_text(translation)
+
+    def _on_translate_done(self, batch):
+        # This editor may show another section by now; only the translated one's button changes
+        model = batch.jobs[0].key
+        model.translating = False
+        if model.view is not None:
+            model.view.show_translating(False)
+
+
+class VirtualSectionList(ttk.Frame):
+    """Scrollable list of sections that only creates editors for visible rows.
+
+    A row's height depends only on its editor height in lines, so it is
+    measured once per height and every row's offset is known without laying
+    the row out. As the view scrolls, editors that leave it are rebound to
+    the sections coming into it.
+    """
+
+    ROW_GAP = 10  # Vertical space between rows
+    OVERSCAN = 3  # Rows kept materialized above and below the viewport
+
+    def __init__(self, parent, translator: AITranslator = None,
+                 engine: Optional[TranslationEngine] = None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.translator = translator
+        self.engine = engine
+        self.models: List[SectionModel] = []
+        self._offsets: List[int] = [0]  # Top of each row, followed by the total height
+        self._row_heights: Dict[tuple, int] = {}  # (editor lines, translate button) -> row height
+        self._rows: Dict[int, SectionEditor] = {}  # Model index -> editor showing it
+        self._free: List[SectionEditor] = []
+        self._windows: Dict[SectionEditor, int] = {}  # Editor -> canvas window item
+        self._refresh_pending = False
+        self._state_counts: Counter = Counter()  # Overflow state -> number of sections
+        self.summary_var = tk.StringVar(value="")  # File-level overflow summary
+        self._file_summary: Optional[str] = None  # Dialog summary of the file, for translation prompts
+        self._summary_looked_up = False
+
+        self.canvas = tk.Canvas(self)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind('<Configure>', self._on_configure)
+
+    def set_models(self, models: List[SectionModel]):
+        """Show a new list of sections, scrolled to the top.
+
+        Editors from the previous file are rebound to the new sections
+        instead of being destroyed, and offsets are computed in one pass
+        from the cached row heights, so switching files creates no widgets
+        once the pool has warmed up.
+        """
+        for model in self.models:
+            model.on_state_change = None
+        self.models = models
+        self._file_summary = None
+        self._summary_looked_up = False
+        self._state_counts = Counter(model.state for model in models)
+        for model in models:
+            model.on_state_change = self._on_state_change
+        self._update_summary()
+        self._layout()
+        self.canvas.yview_moveto(0)
+        for index in list(self._rows):
+            self._release(self._rows.pop(index))
+        self._refresh()
+
+    def see(self, index: int):
+        """Scroll so the given section is at the top of the view."""
+        total = self._offsets[-1]
+        if total and 0 <= index < len(self.models):
+            self.canvas.yview_moveto(self._offsets[index] / total)
+
+    def overflow_count(self) -> int:
+        """Number of sections whose text does not fit or cannot be encoded."""
+        return self._state_counts[OVERFLOW] + self._state_counts[UNENCODABLE]
+
+    def _on_state_change(self, old: str, new: str):
+        # Called from an editor's edit, so only the two counts involved change
+        self._state_counts[old] -= 1
+        self._state_counts[new] += 1
+        self._update_summary()
+
+    def _update_summary(self):
+        if not self.models:
+            self.summary_var.set("")
+            return
+        parts = []
+        if self.overflow_count():
+            parts.append(f"{self.overflow_count()} overflowing")
+        if self._state_counts[SLIGHT_OVERFLOW]:
+            parts.append(f"{self._state_counts[SLIGHT_OVERFLOW]} slightly over")
+        self.summary_var.set(", ".join(parts) if parts else "All sections fit")
+
+    def _context(self, model: SectionModel) -> Tuple[List[str], Optional[str]]:
+        """(neighbouring lines, file summary) for translating model."""
+        if not self._summary_looked_up:
+            # Only a summary made earlier, e.g. by a batch run; making one would block the UI
+            self._file_summary = self.translator.file_summary([other.section.text for other in self.models], create=False)
+            self._summary_looked_up = True
+        texts = [other.get_text() for other in self.models]
+        return context_window(texts, model.index, self.translator.context_tokens), self._file_summary
+
+    def _acquire(self) -> SectionEditor:
+        if self._free:
+            return self._free.pop()
+        row = SectionEditor(self.canvas, translator=self.translator, get_context=self._context, engine=self.engine)
+        self._windows[row] = self.canvas.create_window(0, 0, window=row, anchor="nw", state='hidden')
+        return row
+
+    def _release(self, row: SectionEditor):
+        # Stays on screen until _refresh either reuses or hides it
+        row.unbind_model()
+        self._free.append(row)
+
+    def _row_height(self, model: SectionModel) -> int:
+        # The translate button changes the header height
+        key = (model.text_lines, bool(self.translator and self.translator.has_valid_key()))
+        height = self._row_heights.get(key)
+        if height is None:
+            row = self._acquire()
+            row.bind_model(model)
+            row.update_idletasks()
+            height = self._row_heights[key] = row.winfo_reqheight()
+            self._release(row)
+        return height
+
+    def _layout(self):
+        """Compute every row's offset and the scrollable height."""
+        offsets = [0]
+        y = 0
+        for model in self.models:
+            y += self._row_height(model) + self.ROW_GAP
+            offsets.append(y)
+        self._offsets = offsets
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), y))
+
+    def _visible_range(self):
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(bisect.bisect_right(self._offsets, top) - 1 - self.OVERSCAN, 0)
+        last = min(bisect.bisect_left(self._offsets, bottom) + self.OVERSCAN, len(self.models))
+        return first, last
+
+    def _refresh(self):
+        """Materialize the rows in view and recycle the rest."""
+        self._refresh_pending = False
+        first, last = self._visible_range()
+        for index in [i for i in self._rows if not first <= i < last]:
+            self._release(self._rows.pop(index))
+
+        width = max(self.canvas.winfo_width() - 10, 1)
+        for index in range(first, last):
+            if index in self._rows:
+                continue
+            row = self._acquire()
+            row.bind_model(self.models[index])
+            self._rows[index] = row
+            item = self._windows[row]
+            self.canvas.coords(item, 5, self._offsets[index] + self.ROW_GAP // 2)
+            self.canvas.itemconfigure(item, state='normal', width=width)
+
+        # Editors that were not reused leave the view
+        for row in self._free:
+            self.canvas.itemconfigure(self._windows[row], state='hidden')
+
+    def _schedule_refresh(self):
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._refresh)
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_refresh()
+
+    def _on_configure(self, event):
+        width = max(event.width - 10, 1)
+        for item in self._windows.values():
+            self.canvas.itemconfigure(item, width=width)
+        self.canvas.configure(scrollregion=(0, 0, event.width, self._offsets[-1]))
+        self._schedule_refresh()
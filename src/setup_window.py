@@ -4,12 +4,17 @@ from pathlib import Path
 import os
 from typing import Optional, Callable
 from db_handler import DbHandler
+from scanner import DlgScanner
 
 class SetupWindow:
+    # How often the Tk thread refreshes scan progress
+    POLL_INTERVAL_MS = 100
+    
     def __init__(self, db: DbHandler, on_complete: Callable[[], None]):
         """Initialize setup window for game path selection and file scanning."""
         self.db = db
         self.on_complete = on_complete
+        self.scanner = None
         
         # Create window
         self.root = tk.Tk()
@@ -93,7 +98,15 @@ class SetupWindow:
             command=self._start_scan,
             state=tk.DISABLED
         )
-        self.scan_btn.pack()
+        self.scan_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_btn = ttk.Button(
+            btn_frame,
+            text="Cancel",
+            command=self._cancel_scan,
+            state=tk.DISABLED
+        )
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
         
         # Check for existing path
         existing_path = self.db.get_game_path()
@@ -123,42 +136,69 @@ class SetupWindow:
         # Show progress frame
         self.progress_frame.pack(fill=tk.X, pady=20)
         self.scan_btn.configure(state=tk.DISABLED)
-        
-        # Clear existing files
-        self.db.clear_all_files()
-        
-        # Save game path
-        self.db.set_game_path(game_path)
+        self.cancel_btn.configure(state=tk.NORMAL)
         
         # Start scanning
         self._scan_files(game_path)
         
     def _scan_files(self, game_path: str):
-        """Scan for DLG files recursively."""
-        total_files = sum(1 for _ in Path(game_path).rglob("*.dlg"))
-        if total_files == 0:
+        """Scan for DLG files on a worker thread, replacing any previous scan."""
+        self.progress.configure(mode='indeterminate')
+        self.progress.start(15)
+        self.status_var.set("Scanning...")
+        
+        self.scanner = DlgScanner(self.db, game_path, replace=True)
+        self.scanner.start()
+        self.root.after(self.POLL_INTERVAL_MS, self._poll_scan)
+        
+    def _poll_scan(self):
+        """Update progress from the scanner; runs on the Tk thread every POLL_INTERVAL_MS."""
+        scanner = self.scanner
+        if not scanner.done:
+            self.status_var.set(f"Scanned {scanner.scanned} files: {scanner.current_path}")
+            self.root.after(self.POLL_INTERVAL_MS, self._poll_scan)
+            return
+            
+        self.progress.stop()
+        self.progress.configure(mode='determinate')
+        self.cancel_btn.configure(state=tk.DISABLED)
+        
+        if scanner.error:
+            self._reset_scan_ui()
+            messagebox.showerror("Error", f"Scan failed: {scanner.error}")
+            return
+            
+        if scanner.cancelled:
+            self._reset_scan_ui()
+            self.status_var.set(f"Scan cancelled after {scanner.scanned} files")
+            return
+            
+        if scanner.scanned == 0:
+            self._reset_scan_ui()
             messagebox.showerror(
                 "Error",
                 "No DLG files found in the selected folder"
             )
             self.progress_frame.pack_forget()
-            self.scan_btn.configure(state=tk.NORMAL)
             return
             
-        processed = 0
-        for file_path in Path(game_path).rglob("*.dlg"):
-            relative_path = str(file_path.relative_to(game_path))
-            self.db.add_dlg_file(str(file_path), relative_path)
-            
-            processed += 1
-            progress = (processed / total_files) * 100
-            self.progress_var.set(progress)
-            self.status_var.set(f"Scanning: {relative_path}")
-            self.root.update()
-            
-        self.status_var.set(f"Found {total_files} DLG files")
+        # Only remember the game path once a scan has completed
+        self.db.set_game_path(scanner.game_path)
+        self.progress_var.set(100)
+        self.status_var.set(f"Found {scanner.scanned} DLG files")
         self.root.after(1000, self._complete_setup)
         
+    def _cancel_scan(self):
+        """Ask the running scan to stop."""
+        if self.scanner and not self.scanner.done:
+            self.scanner.cancel()
+            self.cancel_btn.configure(state=tk.DISABLED)
+            self.status_var.set("Cancelling...")
+            
+    def _reset_scan_ui(self):
+        self.progress_var.set(0)
+        self.scan_btn.configure(state=tk.NORMAL)
+        
     def _complete_setup(self):
         """Complete the setup and close window."""
         self.root.destroy()
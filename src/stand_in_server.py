@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Local HTTP server answering chat completion requests like the OpenAI API, for offline runs."""
+
+import re
+import sys
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+ANSWER = "Go to the tower."
+
+_SECTION_LINE = re.compile(r"^Section (\d+) \(max", re.MULTILINE)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers /v1/chat/completions with the server's fixed English line.
+
+    Batch requests get a JSON reply with that line for every 'Section N'
+    they list; requests asking for a shorter version get the server's
+    short answer, if it has one.
+    """
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server = self.server
+        delay, status = server.next_reply()
+        try:
+            time.sleep(delay)
+        finally:
+            server.reply_sent()
+        if status != 200:
+            self._send(status, {"error": {"message": f"Stand-in error {status}", "type": "server_error"}},
+                       {'Retry-After': str(server.retry_after)} if status == 429 else {})
+            return
+
+        prompt = request["messages"][-1]["content"]
+        content = server.answer
+        if server.short_answer and "shorter" in prompt:
+            content = server.short_answer
+        finish_reason = "stop"
+        section_ids = _SECTION_LINE.findall(prompt)
+        if section_ids:
+            entries = [{"id": int(section_id), "translation": server.answer} for section_id in section_ids]
+            content = json.dumps({"translations": entries})
+            if server.max_sections and len(entries) > server.max_sections:
+                # Cut off mid-entry, as if the reply ran into max_tokens
+                content = json.dumps({"translations": entries[:server.max_sections + 1]})[:-10]
+                finish_reason = "length"
+        self._send(200, {
+            "id": "stand-in", "object": "chat.completion", "created": 0, "model": "stand-in",
+            "choices": [{"index": i, "finish_reason": finish_reason,
+                         "message": {"role": "assistant", "content": content}}
+                        for i in range(request.get('n', 1))],
+        })
+
+    def _send(self, status: int, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Stand-in for the chat completions API with configurable behaviour.
+
+    Every request waits ``latency`` seconds plus up to ``jitter`` more. A
+    fraction ``error_rate`` of them, and the first ``fail_first``, fail with
+    ``error_status`` (a 429 also carries Retry-After). ``answer`` is the translation given, so its
+    length decides whether answers fit their budgets; ``short_answer`` is
+    given to shorten requests. ``max_sections`` cuts longer batch replies
+    off. ``requests`` counts the requests received and ``peak_in_flight``
+    the most that were being answered at once.
+    """
+
+    daemon_threads = True
+    request_queue_size = 64  # The default backlog of 5 stalls concurrent connects
+
+    def __init__(self, address=('127.0.0.1', 0), latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 500, retry_after: float = 1.0, fail_first: int = 0,
+                 answer: str = ANSWER, short_answer: Optional[str] = None,
+                 max_sections: Optional[int] = None, seed: Optional[int] = None):
+        super().__init__(address, StandInHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.fail_first = fail_first
+        self.answer = answer
+        self.short_answer = short_answer
+        self.max_sections = max_sections
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def next_reply(self):
+        """Count a request and pick its (delay, HTTP status)."""
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failing = self.requests <= self.fail_first or self._random.random() < self.error_rate
+            status = self.error_status if failing else 200
+        return delay, status
+
+    def reply_sent(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def start(self) -> "StandInServer":
+        """Serve from a daemon thread."""
+        threading.Thread(target=self.serve_forever, name="StandInServer", daemon=True).start()
+        return self
+
+
+def print_usage():
+    print("Usage:")
+    print("  python stand_in_server.py [port] [latency_ms] [error_rate]   # Serve until interrupted")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print_usage()
+        exit(0)
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.2
+    error_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    server = StandInServer(('127.0.0.1', port), latency=latency, error_rate=error_rate)
+    print(f"Serving chat completions at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Background full-text indexing of extracted dialog text."""
+
+import os
+import sys
+import queue
+import threading
+from typing import Callable, Iterable, Optional
+from db_handler import DbHandler
+from dlg_handler import DlgHandler
+
+
+class TextIndexer:
+    """Keeps the FTS index in DbHandler in step with the .dlg files on disk.
+
+    Files are queued with enqueue() and indexed on a worker thread. A file is
+    only re-extracted when its size or mtime differs from the last indexing
+    run, so enqueue_all() after a rescan is cheap for unchanged files.
+    """
+
+    def __init__(self, db: DbHandler, on_indexed: Optional[Callable[[str, int], None]] = None):
+        self.db = db
+        self.on_indexed = on_indexed  # Called from the worker as on_indexed(file_path, section_count)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._thread = None
+
+    def start(self) -> None:
+        """Start the background worker."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="TextIndexer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the worker after the file it is currently indexing."""
+        if self._thread is not None:
+            with self._pending_lock:
+                self._pending.clear()
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def enqueue(self, file_path: str, force: bool = False) -> None:
+        """Queue a file for (re)indexing; duplicates already waiting are ignored."""
+        with self._pending_lock:
+            if file_path in self._pending:
+                return
+            self._pending.add(file_path)
+        self._queue.put((file_path, force))
+
+    def enqueue_all(self) -> None:
+        """Queue every known file and drop index entries for files no longer tracked."""
+        files = [file_path for file_path, _, _ in self.db.get_all_files()]
+        known = set(files)
+        stale = [path for path in self.db.get_index_states() if path not in known]
+        self.db.remove_from_index(stale, wait=False)
+        for file_path in files:
+            self.enqueue(file_path)
+
+    def remove(self, file_paths: Iterable[str]) -> None:
+        """Drop files from the index without waiting for the write."""
+        self.db.remove_from_index(list(file_paths), wait=False)
+
+    def wait_idle(self) -> None:
+        """Block until every queued file has been processed."""
+        self._queue.join()
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                try:
+                    if item is None:
+                        return
+                    file_path, force = item
+                    with self._pending_lock:
+                        if file_path not in self._pending:
+                            continue  # Cancelled by stop()
+                        self._pending.discard(file_path)
+                    try:
+                        self.index_file(file_path, force)
+                    except Exception as e:
+                        print(f"Error indexing {file_path}: {e}")
+                finally:
+                    self._queue.task_done()
+        finally:
+            self.db.close_thread_connection()
+
+    def index_file(self, file_path: str, force: bool = False) -> bool:
+        """Index one file synchronously. Returns False if it was already up to date."""
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            self.db.remove_from_index([file_path], wait=False)
+            return False
+
+        if not force:
+            state = self.db.get_index_state(file_path)
+            if state == (stat.st_size, stat.st_mtime):
+                return False
+
+        # Extraction logs heavily to stdout; none of it is useful here
+        handler = DlgHandler(file_path, quiet=True)
+        handler.read_file()
+
+        sections = [
+            (index, section.start, section.text)
+            for index, section in enumerate(handler.text_sections)
+        ]
+        # Queued without waiting; the writer folds consecutive files into one commit
+        self.db.replace_file_sections(file_path, sections, stat.st_size, stat.st_mtime, wait=False)
+        if self.on_indexed:
+            self.on_indexed(file_path, len(sections))
+        return True
+
+
+def print_usage():
+    print("Usage:")
+    print("  python text_index.py build                 # Index new or changed files")
+    print("  python text_index.py rebuild               # Re-index every file")
+    print("  python text_index.py search <text>         # Find an exact phrase")
+    print("  python text_index.py search -p <text>      # Match word prefixes")
+    print("  python text_index.py search -q <query>     # Raw FTS5 query")
+    print("\nExample:")
+    print("  python text_index.py search -p 'Сид сын'")
+
+
+def build_index(db: DbHandler, force: bool = False) -> None:
+    """Index every file in the database, reporting progress on stdout."""
+    files = [file_path for file_path, _, _ in db.get_all_files()]
+    indexer = TextIndexer(db)
+    known = set(files)
+    db.remove_from_index([path for path in db.get_index_states() if path not in known])
+
+    updated = 0
+    for i, file_path in enumerate(files, 1):
+        try:
+            if indexer.index_file(file_path, force):
+                updated += 1
+        except Exception as e:
+            print(f"Error indexing {file_path}: {e}")
+        if i % 100 == 0:
+            print(f"Processed {i}/{len(files)} files...")
+    db.flush()
+    print(f"Indexed {updated} of {len(files)} files")
+
+
+def search_index(db: DbHandler, query: str, mode: str) -> None:
+    """Print ranked search results."""
+    results = db.search_text(query, mode=mode)
+    if not results:
+        print("\nNo matches found.")
+        return
+    for file_path, section_index, start, original, current, _ in results:
+        print(f"\n{file_path} (section {section_index + 1}, offset {start})")
+        print(f"  Original: {original}")
+        if current != original:
+            print(f"  Current:  {current}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print_usage()
+        exit(1)
+
+    db_path = os.path.join(os.path.expanduser("~"), ".dlg_editor", "dlg_files.db")
+    if not os.path.exists(db_path):
+        print(f"Database not found at {db_path}")
+        exit(1)
+
+    with DbHandler(db_path) as db:
+        command = sys.argv[1]
+        if command in ("build", "rebuild"):
+            build_index(db, force=command == "rebuild")
+        elif command == "search" and len(sys.argv) >= 3:
+            mode = "phrase"
+            args = sys.argv[2:]
+            if args[0] in ("-p", "-q") and len(args) >= 2:
+                mode = "prefix" if args[0] == "-p" else "query"
+                args = args[1:]
+            search_index(db, " ".join(args), mode)
+        else:
+            print_usage()
+            exit(1)
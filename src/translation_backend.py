@@ -0,0 +1,56 @@
+"""Where AITranslator sends its chat completion requests.
+
+A backend takes the keyword arguments of a chat completion request and
+returns the reply's choices as (text, finish_reason) pairs:
+
+- ``complete(request)`` sends it from the calling thread
+- ``await complete_async(request)`` sends it on the running asyncio loop
+- ``for_loop()`` gives a backend for use on another event loop
+- ``await aclose()`` releases what ``complete_async`` opened
+- ``model`` names the model the answers come from, for the response cache
+"""
+
+from typing import Dict, List, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI
+
+# (text, finish_reason) of one choice of a reply
+Choice = Tuple[str, Optional[str]]
+
+MODEL = "gpt-4o-mini"
+
+
+def _choices(response) -> List[Choice]:
+    return [(choice.message.content or "", choice.finish_reason) for choice in response.choices]
+
+
+class OpenAIBackend:
+    """The OpenAI API, or any server with the same chat completions shape.
+
+    The asyncio client is created on first use, since it belongs to the
+    event loop it was first used on. ``max_retries`` is the client's own
+    retrying; set it to 0 when something else retries failed requests.
+    """
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, model: str = MODEL, max_retries: int = 2):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.max_retries = max_retries
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries)
+        self._async_client: Optional[AsyncOpenAI] = None
+
+    def complete(self, request: Dict) -> List[Choice]:
+        return _choices(self.client.chat.completions.create(**dict(request, model=self.model)))
+
+    async def complete_async(self, request: Dict) -> List[Choice]:
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=self.max_retries)
+        return _choices(await self._async_client.chat.completions.create(**dict(request, model=self.model)))
+
+    def for_loop(self) -> "OpenAIBackend":
+        return OpenAIBackend(self.api_key, self.base_url, self.model, self.max_retries)
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
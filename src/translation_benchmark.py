@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Measure translation throughput against the local stand-in server, without a network."""
+
+import sys
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+from ai_translator import AITranslator
+from translation_backend import OpenAIBackend
+from translation_engine import TranslationEngine, TranslationJob
+from request_packer import pack_items
+from request_governor import RequestGovernor
+from stand_in_server import StandInServer
+
+_SENTENCE = "Go to the old tower by the river and wait there for me until the night falls"
+
+
+def answer_of(words: int) -> str:
+    """An English answer of the given number of words."""
+    return " ".join(_SENTENCE.split()[:max(words, 1)]) + "."
+
+
+@dataclass
+class BenchmarkResult:
+    sections: int
+    translated: int
+    failed: int
+    requests: int  # Requests the stand-in received, retries and shorten requests included
+    minimum_requests: int  # Requests needed if every answer fit the first time
+    elapsed: float
+    latencies: List[float] = field(default_factory=list)  # Seconds from submit to result, per section
+    governor: Dict[str, Any] = field(default_factory=dict)  # RequestGovernor.metrics() after the run
+
+    @property
+    def sections_per_second(self) -> float:
+        return self.sections / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def retry_rate(self) -> float:
+        """Requests beyond the minimum, per section."""
+        return (self.requests - self.minimum_requests) / max(self.sections, 1)
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+def run_benchmark(server: StandInServer, sections: int = 200, concurrency: int = 8,
+                  packed: bool = False, max_bytes: int = 40, timeout: float = 300) -> BenchmarkResult:
+    """Translate distinct sections through the TranslationEngine against server.
+
+    Runs the same pipeline as the editor, request governor included,
+    without the translation memory or response cache, so every section
+    costs at least one request.
+    """
+    governor = RequestGovernor(max_concurrency=concurrency, base_delay=0.1)
+    translator = AITranslator(backend=OpenAIBackend("stand-in", server.base_url, max_retries=0), governor=governor)
+    jobs = [TranslationJob(f"Иди к башне номер {i}.", max_bytes, key=i) for i in range(sections)]
+    if packed:
+        minimum = len(pack_items([(i + 1, job.text, job.max_bytes) for i, job in enumerate(jobs)]))
+    else:
+        minimum = sections
+
+    latencies: List[float] = []
+    done = threading.Event()
+    engine = TranslationEngine(translator, max_concurrency=concurrency)
+    requests_before = server.requests
+    try:
+        start = time.monotonic()
+        submit = engine.submit_packed if packed else engine.submit
+        batch = submit(
+            jobs,
+            on_result=lambda batch, index, translation, error: latencies.append(time.monotonic() - start),
+            on_done=lambda batch: done.set()
+        )
+        if not done.wait(timeout):
+            batch.cancel()
+        elapsed = time.monotonic() - start
+    finally:
+        engine.stop()
+    return BenchmarkResult(sections, len(batch.results), len(batch.errors),
+                           server.requests - requests_before, minimum, elapsed, latencies, governor.metrics())
+
+
+def print_usage():
+    print("Usage:")
+    print("  python translation_benchmark.py [single|packed] [sections] [concurrency] "
+          "[latency_ms] [error_rate] [answer_words]")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] not in ("single", "packed"):
+        print_usage()
+        exit(1)
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else "single"
+    sections = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    latency = float(sys.argv[4]) / 1000 if len(sys.argv) > 4 else 0.2
+    error_rate = float(sys.argv[5]) if len(sys.argv) > 5 else 0.0
+    words = int(sys.argv[6]) if len(sys.argv) > 6 else 4
+
+    server = StandInServer(latency=latency, jitter=latency / 2, error_rate=error_rate,
+                           answer=answer_of(words), short_answer=answer_of(words // 2), seed=1).start()
+    try:
+        result = run_benchmark(server, sections, concurrency, packed=mode == "packed")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"{result.sections} section(s) in {result.elapsed:.1f} s: {result.sections_per_second:.1f} sections/s")
+    print(f"{result.translated} translated, {result.failed} failed, {result.requests} request(s), "
+          f"retry rate {result.retry_rate:.2f} per section")
+    print(f"Governor: {result.governor['retried']} retried, {result.governor['throttled']} throttled, "
+          f"circuit {result.governor['circuit']}")
+    print(f"Latency p50 {result.percentile(50) * 1000:.0f} ms, p95 {result.percentile(95) * 1000:.0f} ms, "
+          f"p99 {result.percentile(99) * 1000:.0f} ms")
@@ -0,0 +1,244 @@
+"""Run many AI translations concurrently without blocking the Tk thread."""
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from ai_translator import AITranslator
+from request_packer import BatchItem, pack_items
+
+
+@dataclass
+class TranslationJob:
+    text: str
+    max_bytes: int
+    encoding: str = 'cp1251'
+    context: Optional[List[str]] = None  # Neighbouring lines, see context_window
+    key: Any = None  # Lets the caller map results back, e.g. to a SectionModel
+    summary: Optional[str] = None  # Summary of the file, see AITranslator.file_summary
+
+
+class TranslationBatch:
+    """Progress and results of jobs submitted together.
+
+    ``results`` and ``errors`` are keyed by the job's position in ``jobs``.
+    They are filled in on the engine thread; callbacks see them in a
+    consistent state.
+    """
+
+    def __init__(self, jobs: Iterable[TranslationJob]):
+        self.jobs = list(jobs)
+        self.results: Dict[int, str] = {}
+        self.errors: Dict[int, Exception] = {}
+        self.cancelled = False
+        self._future = None
+
+    @property
+    def total(self) -> int:
+        return len(self.jobs)
+
+    @property
+    def completed(self) -> int:
+        return len(self.results) + len(self.errors)
+
+    def cancel(self) -> None:
+        """Stop the jobs that have not finished."""
+        self.cancelled = True
+        if self._future is not None:
+            self._future.cancel()
+
+
+class TranslationEngine:
+    """Translates jobs on an asyncio loop running in a background thread.
+
+    Up to ``max_concurrency`` requests are in flight at once, so a batch
+    takes about as long as its slowest job rather than the sum of all of
+    them. API rate limits are left to the translator's RequestGovernor,
+    which sees every request. Each job runs the same request steps as
+    ``AITranslator.translate_text``, including the translation memory.
+
+    Callbacks are handed to ``post`` (e.g. ``UiDispatcher.post``) so they
+    run on the Tk thread; without it they run on the engine thread:
+
+    - ``on_result(batch, index, translation, error)`` once per job
+    - ``on_done(batch)`` once all jobs finished or the batch was cancelled
+    """
+
+    def __init__(self, translator: AITranslator, max_concurrency: int = 8,
+                 post: Optional[Callable[..., None]] = None):
+        self.translator = translator
+        self.max_concurrency = max_concurrency
+        self.post = post
+        self._loop = asyncio.new_event_loop()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._backend = None
+        self._backend_source = None  # The translator's backend that _backend was made from
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="TranslationEngine", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def submit(self, jobs: Iterable[TranslationJob],
+               on_result: Optional[Callable[[TranslationBatch, int, Optional[str], Optional[Exception]], None]] = None,
+               on_done: Optional[Callable[[TranslationBatch], None]] = None) -> TranslationBatch:
+        """Start translating jobs in the background. Safe to call from any thread."""
+        batch = TranslationBatch(jobs)
+        batch._future = asyncio.run_coroutine_threadsafe(
+            self._run_batch(batch, on_result, on_done), self._loop)
+        return batch
+
+    def submit_packed(self, jobs: Iterable[TranslationJob],
+                      on_result: Optional[Callable[[TranslationBatch, int, Optional[str], Optional[Exception]], None]] = None,
+                      on_done: Optional[Callable[[TranslationBatch], None]] = None) -> TranslationBatch:
+        """Like submit, but translates several sections per request.
+
+        Jobs answered by the translation memory or response cache are
+        reported first. The rest are packed into requests that fit a token
+        budget, which run concurrently; a section missing from every reply
+        is reported with an error. Job contexts are not sent, since the
+        sections of a request already give each other context.
+        """
+        batch = TranslationBatch(jobs)
+        batch._future = asyncio.run_coroutine_threadsafe(
+            self._run_packed_batch(batch, on_result, on_done), self._loop)
+        return batch
+
+    def translate(self, text: str, max_bytes: int, encoding: str = 'cp1251',
+                  context: Optional[List[str]] = None, timeout: Optional[float] = None) -> str:
+        """Translate one text through the engine, blocking the calling thread."""
+        future = asyncio.run_coroutine_threadsafe(
+            self._translate(TranslationJob(text, max_bytes, encoding, context)), self._loop)
+        return future.result(timeout)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Cancel running jobs and stop the loop thread."""
+        if not self._thread.is_alive():
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        self._thread.join(timeout)
+
+    def _emit(self, callback: Optional[Callable], *args) -> None:
+        if callback is None:
+            return
+        if self.post is not None:
+            self.post(callback, *args)
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Error in translation callback: {e}")
+
+    def _get_backend(self):
+        """Backend for this loop, remade when the translator's backend changes (e.g. a new key)."""
+        source = self.translator.backend
+        if source is not self._backend_source:
+            self._backend = source.for_loop() if source is not None else None
+            self._backend_source = source
+        return self._backend
+
+    async def _translate(self, job: TranslationJob) -> str:
+        async with self._semaphore:
+            return await self.translator.translate_text_async(
+                job.text, job.max_bytes, job.encoding, job.context, backend=self._get_backend(), summary=job.summary)
+
+    async def _run_job(self, index: int, job: TranslationJob) -> Tuple[int, Optional[str], Optional[Exception]]:
+        try:
+            return index, await self._translate(job), None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return index, None, e
+
+    def _record(self, batch: TranslationBatch, index: int, translation: Optional[str], error, on_result) -> None:
+        if error is None:
+            batch.results[index] = translation
+        else:
+            batch.errors[index] = error
+        self._emit(on_result, batch, index, translation, error)
+
+    async def _run_batch(self, batch: TranslationBatch, on_result, on_done) -> None:
+        tasks = [asyncio.ensure_future(self._run_job(i, job)) for i, job in enumerate(batch.jobs)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                index, translation, error = await finished
+                self._record(batch, index, translation, error, on_result)
+        except asyncio.CancelledError:
+            batch.cancelled = True
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._emit(on_done, batch)
+
+    async def _run_pack(self, items: List[BatchItem], encoding: str) -> Tuple[List[BatchItem], Dict[int, str], Optional[Exception]]:
+        try:
+            async with self._semaphore:
+                translations = await self.translator.translate_batch_async(items, encoding, backend=self._get_backend())
+            return items, translations, None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return items, {}, e
+
+    async def _run_packed_batch(self, batch: TranslationBatch, on_result, on_done) -> None:
+        tasks = []
+        try:
+            # Section ids in the prompt are job positions, counted from 1
+            cache_keys: Dict[int, Optional[str]] = {}
+            by_encoding: Dict[str, List[BatchItem]] = {}
+            for index, job in enumerate(batch.jobs):
+                hit, key = self.translator.lookup_cached(job.text, job.max_bytes, job.encoding)
+                if hit is not None:
+                    self._record(batch, index, hit, None, on_result)
+                else:
+                    cache_keys[index] = key
+                    by_encoding.setdefault(job.encoding, []).append((index + 1, job.text, job.max_bytes))
+
+            tasks = [
+                asyncio.ensure_future(self._run_pack(pack, encoding))
+                for encoding, items in by_encoding.items()
+                for pack in pack_items(items)
+            ]
+            for finished in asyncio.as_completed(tasks):
+                items, translations, error = await finished
+                for section_id, _, max_bytes in items:
+                    index = section_id - 1
+                    translation = translations.get(section_id)
+                    if translation is None:
+                        self._record(batch, index, None, error or ValueError("No translation returned"), on_result)
+                        continue
+                    if len(translation.encode(batch.jobs[index].encoding, errors='replace')) <= max_bytes:
+                        self.translator.store_cached(cache_keys[index], translation)
+                    self._record(batch, index, translation, None, on_result)
+        except asyncio.CancelledError:
+            batch.cancelled = True
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._emit(on_done, batch)
+
+    async def _shutdown(self) -> None:
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._backend is not None:
+            try:
+                await self._backend.aclose()
+            except Exception as e:
+                print(f"Error closing translation backend: {e}")
+        self._loop.stop()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+            # Memory lookups opened a read connection on this thread
+            if self.translator.memory is not None:
+                self.translator.memory.db.close_thread_connection()
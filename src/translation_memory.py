@@ -0,0 +1,96 @@
+"""Translation memory: reuse earlier translations of identical or similar lines."""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import List, Optional, Set
+from db_handler import DbHandler
+
+_WHITESPACE = re.compile(r"\s+")
+_CYRILLIC = re.compile(r"[Ѐ-ӿ]")
+
+
+def normalize_source(text: str) -> str:
+    """Normalize source text into the memory key.
+
+    Case, Unicode composition and runs of whitespace do not change the key,
+    so "Прощай. " and "прощай." share an entry.
+    """
+    text = unicodedata.normalize("NFC", text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def source_ngrams(key: str, n: int = 3) -> Set[str]:
+    """Character n-grams of a normalized key, padded so short lines still match."""
+    padded = f" {key} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+@dataclass
+class MemoryMatch:
+    entry_id: int
+    source_text: str
+    translation: str
+    byte_length: int  # Length of the translation in the game encoding
+    score: float  # 1.0 for an exact match, Dice similarity of n-grams otherwise
+
+
+class TranslationMemory:
+    # Fuzzy matches below this similarity are not worth showing
+    MIN_FUZZY_SCORE = 0.6
+
+    def __init__(self, db: DbHandler, encoding: str = 'cp1251'):
+        self.db = db
+        self.encoding = encoding
+
+    def add(self, source_text: str, translation: str, wait: bool = False) -> bool:
+        """Remember a translation. Returns False if the pair is not worth storing.
+
+        Only Cyrillic sources are stored, and only when the translation
+        actually differs from the source and fits the game encoding.
+        """
+        key = normalize_source(source_text)
+        translation = translation.strip()
+        if not key or not translation or not _CYRILLIC.search(key):
+            return False
+        if normalize_source(translation) == key:
+            return False
+        try:
+            byte_length = len(translation.encode(self.encoding))
+        except UnicodeEncodeError:
+            return False
+        self.db.tm_store(key, source_text.strip(), translation, byte_length, source_ngrams(key), wait=wait)
+        return True
+
+    def lookup(self, source_text: str) -> Optional[MemoryMatch]:
+        """Find an exact (normalized) match."""
+        row = self.db.tm_get(normalize_source(source_text))
+        if not row:
+            return None
+        entry_id, source, translation, byte_length = row
+        return MemoryMatch(entry_id, source, translation, byte_length, 1.0)
+
+    def lookup_fitting(self, source_text: str, max_bytes: int) -> Optional[MemoryMatch]:
+        """Find an exact match whose translation fits the byte budget, counting the reuse."""
+        match = self.lookup(source_text)
+        if match and match.byte_length <= max_bytes:
+            self.db.tm_mark_used([match.entry_id])
+            return match
+        return None
+
+    def fuzzy_matches(self, source_text: str, limit: int = 5,
+                      min_score: Optional[float] = None) -> List[MemoryMatch]:
+        """Find similar entries ranked by n-gram similarity, best first."""
+        if min_score is None:
+            min_score = self.MIN_FUZZY_SCORE
+        key = normalize_source(source_text)
+        ngrams = source_ngrams(key)
+        matches = []
+        for entry_id, source, translation, byte_length, count, shared in self.db.tm_candidates(ngrams):
+            score = 2.0 * shared / (len(ngrams) + count)
+            if score >= min_score:
+                matches.append(MemoryMatch(entry_id, source, translation, byte_length, score))
+        matches.sort(key=lambda m: m.score, reverse=True)
+        return matches[:limit]
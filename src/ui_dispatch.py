@@ -0,0 +1,43 @@
+"""Hand work from background threads to the Tk main loop."""
+
+import queue
+from typing import Callable
+
+
+class UiDispatcher:
+    """Runs callbacks posted from worker threads on the Tk thread.
+
+    Tk widgets must only be touched from the thread running mainloop(), so
+    workers post() callables here and the Tk thread drains them every
+    ``interval_ms`` through root.after.
+    """
+
+    def __init__(self, root, interval_ms: int = 50):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self.root.after(self.interval_ms, self._drain)
+
+    def post(self, func: Callable, *args) -> None:
+        """Schedule func(*args) on the Tk thread. Safe to call from any thread."""
+        if not self._closed:
+            self._queue.put((func, args))
+
+    def close(self) -> None:
+        """Stop draining; callbacks posted afterwards are dropped."""
+        self._closed = True
+
+    def _drain(self):
+        if self._closed:
+            return
+        while True:
+            try:
+                func, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Error in UI callback: {e}")
+        self.root.after(self.interval_ms, self._drain)
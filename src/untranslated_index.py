@@ -0,0 +1,73 @@
+"""Sorted index of untranslated files for next-file navigation."""
+
+import bisect
+from typing import Dict, Iterable, List, Optional, Tuple
+from db_handler import split_relative_path
+
+OrderKey = Tuple[Tuple[str, ...], str]
+
+
+def tree_order_key(file_path: str, relative_path: str) -> OrderKey:
+    """Sort key that puts files in the order the file tree shows them."""
+    return split_relative_path(relative_path)[1], file_path
+
+
+def needs_translation(relative_path: str, is_translated: bool) -> bool:
+    """Whether a file still has to be translated; not-required files never do."""
+    return not is_translated and not split_relative_path(relative_path)[0]
+
+
+class UntranslatedIndex:
+    """Untranslated files kept sorted in tree order.
+
+    Finding the next untranslated file after any position is a bisect, and
+    single files are added or dropped as their status changes.
+    """
+
+    def __init__(self):
+        self._keys: List[OrderKey] = []
+        self._key_by_path: Dict[str, OrderKey] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._key_by_path
+
+    def reset(self, files: Iterable[Tuple[str, str]]) -> None:
+        """Replace the contents with (file_path, relative_path) of untranslated files."""
+        self._key_by_path = {file_path: tree_order_key(file_path, relative_path) for file_path, relative_path in files}
+        self._keys = sorted(self._key_by_path.values())
+
+    def update(self, file_path: str, relative_path: str, is_translated: bool) -> None:
+        """Add or drop a file according to its current state."""
+        if needs_translation(relative_path, is_translated):
+            key = tree_order_key(file_path, relative_path)
+            if self._key_by_path.get(file_path) == key:
+                return
+            self.remove(file_path)
+            self._key_by_path[file_path] = key
+            bisect.insort(self._keys, key)
+        else:
+            self.remove(file_path)
+
+    def remove(self, file_path: str) -> None:
+        key = self._key_by_path.pop(file_path, None)
+        if key is not None:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def key_of(self, file_path: str) -> Optional[OrderKey]:
+        return self._key_by_path.get(file_path)
+
+    def next_after(self, key: Optional[OrderKey] = None) -> Optional[str]:
+        """Get the first untranslated file after a position, wrapping around."""
+        following = self.following(key, 1)
+        return following[0] if following else None
+
+    def following(self, key: Optional[OrderKey], count: int) -> List[str]:
+        """Get up to count untranslated files after a position, wrapping around."""
+        if not self._keys:
+            return []
+        start = bisect.bisect_right(self._keys, key) if key is not None else 0
+        count = min(count, len(self._keys))
+        return [self._keys[(start + i) % len(self._keys)][1] for i in range(count)]
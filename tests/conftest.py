@@ -0,0 +1,19 @@
+import pytest
+from src.ai_translator import AITranslator
+from src.stand_in_server import StandInServer
+
+DELAY = 0.3
+
+@pytest.fixture
+def stand_in():
+    server = StandInServer(latency=DELAY).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def translator(stand_in, tmp_path, monkeypatch):
+    monkeypatch.setattr(AITranslator, 'CONFIG_FILE', tmp_path / "openai_config.json")
+    translator = AITranslator(base_url=stand_in.base_url)
+    translator.save_api_key("test-key")
+    return translator
@@ -0,0 +1,57 @@
+import pytest
+import json
+from src.ai_translator import AITranslator, parse_batch_response
+from src.byte_fitter import FitRules
+
+@pytest.fixture
+def translator():
+    translator = AITranslator.__new__(AITranslator)
+    translator.memory = None
+    translator.fit_rules = FitRules()
+    translator.local_fits = 0
+    translator.candidates = 3
+    return translator
+
+def test_longest_fitting_candidate_wins(translator):
+    steps = translator.translation_steps("Иди к старой башне.", 24)
+    assert next(steps)["n"] == 3
+    with pytest.raises(StopIteration) as done:
+        steps.send(["Иди к башне.", "Go to the old tower now, friend.", "Go to the old tower.", "Go to the tower."])
+    assert done.value.value == "Go to the old tower."
+
+def test_shortest_candidate_is_shortened_when_none_fits(translator):
+    steps = translator.translation_steps("Иди к старой башне.", 10)
+    next(steps)
+    request = steps.send(["Go to the old tower now, friend.", "Go to the tower."])
+    assert "Previous translation: Go to the tower." in request["messages"][1]["content"]
+    with pytest.raises(StopIteration) as done:
+        steps.send(["To the tower", "Go to it."])
+    assert done.value.value == "Go to it."
+
+def test_truncated_batch_reply_keeps_complete_entries():
+    reply = '{"translations": [{"id": 1, "translation": "Go to the \\"old\\" tower."}, {"id": "2", "translation": "x"}, {"id": 3, "transl'
+    assert parse_batch_response(reply) == {1: 'Go to the "old" tower.'}
+    assert parse_batch_response('{"translations": [{"id": 2, "translation": "Hi."}, 5]}') == {2: "Hi."}
+
+def test_batch_retries_only_failed_entries(translator):
+    items = [(1, "Иди к башне.", 20), (2, "Привет!", 10), (3, "Прощай.", 10), (4, "Стой.", 10)]
+    steps = translator.batch_steps(items)
+    next(steps)
+    reply = {"translations": [
+        {"id": 1, "translation": "Go to the tower."},
+        {"id": 2, "translation": "Привет!"},
+        {"id": 3, "translation": "Farewell, my good friend."},
+    ]}
+    request = steps.send((json.dumps(reply), "stop"))
+    prompt = request["messages"][1]["content"]
+    assert "Section 1 (max" not in prompt
+    assert "Section 2 (max" in prompt and "Section 4 (max" in prompt
+    assert "too long (25 bytes), make it shorter: Farewell, my good friend." in prompt
+    reply = {"translations": [
+        {"id": 2, "translation": "Hello!"},
+        {"id": 3, "translation": "Farewell."},
+        {"id": 4, "translation": "Stop."},
+    ]}
+    with pytest.raises(StopIteration) as done:
+        steps.send((json.dumps(reply), "stop"))
+    assert done.value.value == {1: "Go to the tower.", 2: "Hello!", 3: "Farewell.", 4: "Stop."}
@@ -0,0 +1,36 @@
+import pytest
+import shutil
+from pathlib import Path
+from src.db_handler import DbHandler
+from src.batch_translate import BatchPipeline
+
+SAMPLE = Path(__file__).parent.parent / "samples" / "born_vs_altion.dlg"
+
+@pytest.fixture
+def db(tmp_path):
+    handler = DbHandler(str(tmp_path / "dlg_files.db"))
+    file_path = str(tmp_path / "born_vs_altion.dlg")
+    shutil.copy(SAMPLE, file_path)
+    handler.add_dlg_file(file_path, "born_vs_altion.dlg")
+    yield handler
+    handler.close()
+
+def test_run_resumes_after_failures(db, translator):
+    backend = translator.backend
+    translator.backend = None  # Every request fails, like an exhausted quota
+    failing = BatchPipeline(db, translator, concurrency=1, max_consecutive_failures=3)
+    stats = failing.run()
+    assert failing.error and stats.failed >= 3 and stats.drafted == 0
+    assert db.get_draft_counts() == (0, stats.failed)
+
+    # The same pipeline runs again once the endpoint is back
+    translator.backend = backend
+    stats = failing.run()
+    assert failing.error is None and stats.queued > 0 and stats.failed == 0
+    assert db.get_draft_counts() == (stats.drafted, 0)
+    file_path, _ = db.get_untranslated_files()[0]
+    assert {draft for _, _, draft in db.get_drafts(file_path)} == {"Go to the tower."}
+
+    # Everything is checkpointed, so a third run has nothing left to do
+    stats = BatchPipeline(db, translator).run()
+    assert stats.queued == 0 and stats.skipped == db.get_draft_counts()[0]
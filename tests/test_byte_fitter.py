@@ -0,0 +1,54 @@
+import pytest
+from src.byte_fitter import FitRules, fit_to_budget
+from src.ai_translator import AITranslator
+
+def test_fitting_keeps_as_much_wording_as_possible():
+    text = "I do not know, and I am not going there."
+    # One contraction is enough, so only one is applied
+    assert fit_to_budget(text, len(text) - 1) == "I do not know, and I'm not going there."
+    assert fit_to_budget(text, len(text) - 2) == "I don't know, and I'm not going there."
+    assert fit_to_budget(text, len(text)) == text
+
+def test_whitespace_punctuation_and_fillers():
+    assert fit_to_budget("Thank you  !!!", 10) == "Thank you!"
+    assert fit_to_budget("Go now. It is really late.", 19) == "Go now. It's late."
+    assert fit_to_budget("Go now. It is really late.", 25) == "Go now. It's really late."
+    assert fit_to_budget("Go away, stranger.", 5) is None
+
+def test_custom_rules():
+    rules = FitRules(contractions={}, abbreviations={"gold coins": "gold"}, fillers=[])
+    assert fit_to_budget("Pay fifty gold coins.", 16, rules=rules) == "Pay fifty gold."
+
+def test_translator_fits_locally_instead_of_asking_again():
+    translator = AITranslator.__new__(AITranslator)
+    translator.memory = None
+    translator.fit_rules = FitRules()
+    translator.local_fits = 0
+    translator.candidates = 3
+    steps = translator.translation_steps("Я не хочу идти.", 19)
+    next(steps)
+    with pytest.raises(StopIteration) as done:
+        steps.send(["I do not want to go."])
+    assert done.value.value == "I don't want to go."
+    assert translator.local_fits == 1
+
+@pytest.mark.parametrize("text", [
+    "Guards, let us pass!",  # A request, not a suggestion
+    "We have to go.",
+    "I have a sword.",
+])
+def test_contractions_that_change_meaning_are_not_applied(text):
+    assert fit_to_budget(text, len(text) - 1) is None
+
+def test_have_contracts_as_an_auxiliary():
+    assert fit_to_budget("We have been here.", 17) == "We've been here."
+
+@pytest.mark.parametrize("text, fitted", [
+    ("I would rather die than serve you.", "I'd rather die than serve you."),
+    ("He was a just and fair king.", None),
+    ("Perhaps he will come.", None),
+    ("I do not know who he is.", None),  # "don't" alone saves too little
+    ("Yes it is.", None),
+])
+def test_meaning_bearing_words_are_kept(text, fitted):
+    assert fit_to_budget(text, len(text) - 3) == fitted
@@ -0,0 +1,43 @@
+from src.context_window import context_window
+from src.request_packer import estimate_tokens
+from src.response_cache import ResponseCache
+
+def test_window_takes_nearest_lines_in_order():
+    texts = [f"Строка {i}" for i in range(100)]
+    window = context_window(texts, 50, max_tokens=1000, max_sections=4)
+    assert window == ["Строка 48", "Строка 49", "Строка 51", "Строка 52"]
+    assert context_window(texts, 0, max_tokens=1000, max_sections=3) == ["Строка 1", "Строка 2", "Строка 3"]
+
+def test_window_stays_under_budget_and_contiguous():
+    texts = ["Короткая строка."] * 10 + ["Очень длинная строка. " * 50] + ["Короткая строка."] * 10
+    window = context_window(texts, 9, max_tokens=60, max_sections=20)
+    assert sum(estimate_tokens(text) for text in window) <= 60
+    # The long line after the section closes that side; the lines before still fill the budget
+    assert texts[10] not in window and len(window) > 1
+
+def test_prompt_size_does_not_grow_with_the_file(translator):
+    def prompt_for(count):
+        texts = [f"Реплика номер {i}, довольно обычная." for i in range(count)]
+        steps = translator.translation_steps(texts[count // 2], 50, context=context_window(texts, count // 2))
+        return next(steps)["messages"][1]["content"]
+    # Only the numbers in the lines differ in length
+    assert abs(len(prompt_for(1000)) - len(prompt_for(50))) < 20
+
+def test_prompts_share_a_stable_prefix(translator):
+    texts = [f"Реплика номер {i}." for i in range(20)]
+    prompts = [
+        next(translator.translation_steps(texts[i], 40 + i, context=context_window(texts, i), summary="Two guards argue."))
+        ["messages"][1]["content"]
+        for i in (3, 12)
+    ]
+    prefix = prompts[0][:prompts[0].index("Neighbouring dialog lines")]
+    assert prompts[1].startswith(prefix) and "Two guards argue." in prefix
+
+def test_file_summary_is_made_once(translator, stand_in, tmp_path):
+    translator.cache = ResponseCache(tmp_path / "cache.db")
+    texts = ["Привет, путник.", "Иди к башне."]
+    assert translator.file_summary(texts, create=False) is None
+    summary = translator.file_summary(texts)
+    requests = stand_in.requests
+    assert translator.file_summary(texts) == summary == translator.file_summary(texts, create=False)
+    assert stand_in.requests == requests
@@ -0,0 +1,129 @@
+import pytest
+import sqlite3
+import threading
+from pathlib import Path
+import tempfile
+from src.db_handler import DbHandler
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        handler = DbHandler(str(Path(tmp_dir) / "dlg_files.db"))
+        yield handler
+        handler.close()
+
+def test_add_and_list_files(db):
+    db.add_dlg_file("/game/b.dlg", "b.dlg")
+    db.add_dlg_file("/game/a.dlg", "a.dlg")
+    files = db.get_all_files()
+    assert [f[1] for f in files] == ["a.dlg", "b.dlg"]
+    assert not db.is_file_translated("/game/a.dlg")
+
+def test_read_after_write(db):
+    db.add_dlg_file("/game/a.dlg", "a.dlg")
+    db.set_translated_status("/game/a.dlg", True)
+    assert db.is_file_translated("/game/a.dlg")
+
+def test_writes_from_worker_threads(db):
+    def worker(n):
+        for i in range(50):
+            db.add_dlg_file(f"/game/{n}_{i}.dlg", f"{n}_{i}.dlg")
+        # Reads on a worker thread use that thread's own connection
+        assert db.get_game_path() is None
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(db.get_all_files()) == 200
+
+def test_async_writes_visible_after_flush(db):
+    for i in range(100):
+        db.execute_write(
+            "INSERT INTO dlg_files (file_path, relative_path) VALUES (?, ?)",
+            (f"/game/{i}.dlg", f"{i}.dlg"),
+            wait=False
+        )
+    db.flush()
+    assert len(db.get_all_files()) == 100
+
+def test_transaction_is_atomic(db):
+    db.add_dlg_file("/game/a.dlg", "a.dlg")
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as tx:
+            tx.execute("UPDATE dlg_files SET is_translated = 1")
+            tx.execute("INSERT INTO dlg_files (file_path) VALUES (?)", ("/game/b.dlg",))
+    assert not db.is_file_translated("/game/a.dlg")
+    assert len(db.get_all_files()) == 1
+
+def test_transaction_not_applied_on_exception(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction() as tx:
+            tx.execute("INSERT INTO dlg_files (file_path, relative_path) VALUES (?, ?)", ("/game/a.dlg", "a.dlg"))
+            raise RuntimeError("abort")
+    assert db.get_all_files() == []
+
+def test_failed_job_does_not_discard_batch(db):
+    db.execute_write("INSERT INTO dlg_files (file_path) VALUES (?)", ("/bad.dlg",), wait=False)
+    db.add_dlg_file("/game/a.dlg", "a.dlg")
+    assert len(db.get_all_files()) == 1
+
+def test_in_memory_database():
+    handler = DbHandler(":memory:")
+    handler.set_game_path("/game")
+    result = []
+    t = threading.Thread(target=lambda: result.append(handler.get_game_path()))
+    t.start()
+    t.join()
+    assert result == ["/game"]
+    handler.close()
+
+def test_closed_handler_rejects_use(db):
+    db.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        db.get_all_files()
+    with pytest.raises(sqlite3.ProgrammingError):
+        db.add_dlg_file("/game/a.dlg", "a.dlg")
+
+def test_search_phrase_and_prefix(db):
+    db.replace_file_sections("/game/a.dlg", [
+        (0, 10, "Сид, сынок! Иди сюда."),
+        (1, 80, "Прощай."),
+    ], 100, 1.0)
+    db.replace_file_sections("/game/b.dlg", [(0, 12, "Сынок, прощай навсегда.")], 50, 1.0)
+
+    results = db.search_text("Сид, сынок")
+    assert [(r[0], r[1]) for r in results] == [("/game/a.dlg", 0)]
+
+    files = {r[0] for r in db.search_text("прощ", mode="prefix")}
+    assert files == {"/game/a.dlg", "/game/b.dlg"}
+
+def test_reindex_keeps_original_text(db):
+    db.replace_file_sections("/game/a.dlg", [(0, 10, "Прощай.")], 100, 1.0)
+    db.replace_file_sections("/game/a.dlg", [(0, 10, "Farewell.")], 100, 2.0)
+
+    (row,) = db.search_text("Прощай")
+    assert row[3] == "Прощай."
+    assert row[4] == "Farewell."
+    assert db.search_text("farewell")[0][0] == "/game/a.dlg"
+    assert db.get_index_state("/game/a.dlg") == (100, 2.0)
+
+def test_remove_from_index(db):
+    db.replace_file_sections("/game/a.dlg", [(0, 10, "Прощай.")], 100, 1.0)
+    db.remove_from_index(["/game/a.dlg"])
+    assert db.search_text("Прощай") == []
+    assert db.get_index_state("/game/a.dlg") is None
+
+def test_file_listeners_report_changes(db):
+    events = []
+    db.add_file_listener(lambda kind, paths: events.append((kind, paths)))
+    db.add_dlg_files([("/a.dlg", "a.dlg"), ("/b.dlg", "b.dlg")])
+    db.set_translated_status("/a.dlg", True)
+    db.remove_dlg_files(["/b.dlg"])
+    assert events == [
+        (DbHandler.FILES_ADDED, ["/a.dlg", "/b.dlg"]),
+        (DbHandler.FILES_UPDATED, ["/a.dlg"]),
+        (DbHandler.FILES_REMOVED, ["/b.dlg"]),
+    ]
+    assert db.get_files(["/a.dlg", "/b.dlg"]) == [("/a.dlg", "a.dlg", 1)]
@@ -74,4 +74,13 @@ def test_control_codes_preservation(temp_dlg_file):
     assert "{D-ITEM}" in tree_text
     assert "†D1430" in tree_text
     assert "ъ3" in tree_text
-    assert "Џ[102,45,887]" in tree_text 
\ No newline at end of file
+    assert "Џ[102,45,887]" in tree_text 
+def test_quiet_handler_extracts_silently(capsys):
+    sample = str(Path(__file__).parent.parent / "samples" / "born_vs_altion.dlg")
+    loud = DlgHandler(sample)
+    loud.read_file()
+    assert capsys.readouterr().out
+    quiet = DlgHandler(sample, quiet=True)
+    quiet.read_file()
+    assert capsys.readouterr().out == ""
+    assert [s.text for s in quiet.text_sections] == [s.text for s in loud.text_sections]
@@ -0,0 +1,72 @@
+import pytest
+import time
+from pathlib import Path
+import tempfile
+from src.db_handler import DbHandler
+from src.edit_journal import EditJournal, encode_diff, apply_diff
+
+@pytest.fixture
+def journal():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DbHandler(str(Path(tmp_dir) / "dlg_files.db"))
+        yield EditJournal(db)
+        db.close()
+
+@pytest.mark.parametrize("old,new", [
+    ("Эй, ты ошибся, это не бордель.", "Hey, you are mistaken, this is no brothel."),
+    ("Farewell, friend.", "Farewell, my friend."),
+    ("", "New text"),
+    ("Old text", ""),
+])
+def test_diff_round_trip(old, new):
+    assert apply_diff(old, encode_diff(old, new)) == new
+
+def test_small_edit_is_compact():
+    old = "A long line of dialog that only changes by a single word at the end."
+    diff = encode_diff(old, old.replace("end.", "finish."))
+    assert len(diff) < len(old) // 2
+
+def test_record_and_replay(journal):
+    assert journal.record("/game/a.dlg", [(0, "Прощай.", "Farewell."), (1, "Same", "Same")])
+    journal.record("/game/a.dlg", [(0, "Farewell.", "Goodbye.")])
+    journal.db.flush()
+
+    history = journal.history("/game/a.dlg")
+    assert [(e.section_index, e.old_text, e.new_text) for e in history] == [
+        (0, "Прощай.", "Farewell."),
+        (0, "Farewell.", "Goodbye."),
+    ]
+    assert journal.replay("/game/a.dlg") == {0: "Goodbye."}
+    assert journal.replay("/game/a.dlg", until=history[0].created_at) == {0: "Farewell."}
+
+def test_record_skips_unchanged(journal):
+    assert journal.record("/game/a.dlg", [(0, "Same", "Same")]) is None
+
+def test_changes_since(journal):
+    journal.record("/game/a.dlg", [(0, "Прощай.", "Farewell.")])
+    journal.db.flush()
+    cutoff = time.time()
+    time.sleep(0.01)
+    journal.record("/game/b.dlg", [(2, "Привет.", "Hello.")])
+    journal.db.flush()
+    assert list(journal.changes_since(cutoff)) == ["/game/b.dlg"]
+
+def test_undo_walks_back_through_saves(journal):
+    first = journal.record("/game/a.dlg", [(0, "Прощай.", "Farewell.")])
+    second = journal.record("/game/a.dlg", [(0, "Farewell.", "Goodbye.")])
+    journal.db.flush()
+
+    save_id, texts = journal.last_undoable_save("/game/a.dlg")
+    assert (save_id, texts) == (second, {0: "Farewell."})
+
+    # Saving the restored text records the undo and retires the reverted save
+    journal.record("/game/a.dlg", [(0, "Goodbye.", "Farewell.")], reverts_save_id=second)
+    journal.db.flush()
+    assert journal.last_undoable_save("/game/a.dlg") == (first, {0: "Прощай."})
+
+def test_undo_right_after_save_finds_that_save(journal):
+    journal.record("/game/a.dlg", [(0, "Прощай.", "Farewell.")])
+    journal.db.flush()
+    latest = journal.record("/game/a.dlg", [(0, "Farewell.", "Goodbye.")])
+    # No flush: undo may follow the save before the writer thread commits it
+    assert journal.last_undoable_save("/game/a.dlg") == (latest, {0: "Farewell."})
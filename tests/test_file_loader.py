@@ -0,0 +1,50 @@
+import threading
+from src.file_loader import FileLoader
+
+def test_load_reports_errors_for_current_request():
+    results = []
+    done = threading.Event()
+
+    def on_loaded(generation, file_path, handler, error):
+        results.append((generation, file_path, handler, error))
+        done.set()
+
+    loader = FileLoader(on_loaded)
+    try:
+        generation = loader.request("/nonexistent/file.dlg")
+        assert done.wait(5)
+        assert loader.is_current(generation)
+        (got_generation, path, handler, error), = results
+        assert (got_generation, path, handler) == (generation, "/nonexistent/file.dlg", None)
+        assert isinstance(error, OSError)
+    finally:
+        loader.stop()
+
+def test_cancelled_load_is_not_reported():
+    results = []
+    loader = FileLoader(lambda *args: results.append(args))
+    loader.stop()
+    generation = loader.request("/nonexistent/file.dlg")
+    loader.cancel()
+    assert not loader.is_current(generation)
+    assert results == []
+
+def test_prefetched_file_is_delivered_without_parsing(tmp_path):
+    path = tmp_path / "a.dlg"
+    path.write_bytes("Привет, путник!\x00\x00\x00".encode("cp1251"))
+    results = []
+    loader = FileLoader(lambda *args: results.append((threading.current_thread(), args)))
+    try:
+        loader.prefetch([str(path)])
+        for _ in range(100):
+            if str(path) in loader._cache:
+                break
+            threading.Event().wait(0.05)
+        generation = loader.request(str(path))
+        # Answered on the requesting thread straight from the cache
+        (thread, (got_generation, _, handler, error)), = results
+        assert thread is threading.current_thread()
+        assert got_generation == generation and handler is not None and error is None
+        assert str(path) not in loader._cache
+    finally:
+        loader.stop()
@@ -0,0 +1,75 @@
+import pytest
+import time
+import threading
+from pathlib import Path
+import tempfile
+from src.file_watcher import GameFolderWatcher, InotifyBackend, coalesce, ADDED, REMOVED, MODIFIED
+
+@pytest.fixture
+def game_dir():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        (root / "Data").mkdir()
+        (root / "Data" / "a_d.dlg").write_bytes(b"\x00")
+        (root / "Data" / "b_d.dlg").write_bytes(b"\x00")
+        yield root
+
+def collect_changes(game_dir, use_polling, make_changes):
+    batches = []
+    received = threading.Event()
+
+    def on_changes(changes):
+        batches.append(changes)
+        received.set()
+
+    watcher = GameFolderWatcher(str(game_dir), on_changes, debounce=0.2,
+                                poll_interval=0.1, use_polling=use_polling)
+    watcher.start()
+    assert watcher.wait_ready(5)
+    try:
+        make_changes()
+        assert received.wait(5)
+        time.sleep(0.5)
+    finally:
+        watcher.stop()
+    merged = {}
+    for batch in batches:
+        merged.update(batch)
+    return merged
+
+def change_tree(game_dir):
+    def make_changes():
+        (game_dir / "Data" / "a_d.dlg").write_bytes(b"\x00\x01")
+        (game_dir / "Data" / "b_d.dlg").unlink()
+        (game_dir / "Data" / "new").mkdir()
+        (game_dir / "Data" / "new" / "c_d.dlg").write_bytes(b"\x00")
+        (game_dir / "Data" / "notes.txt").write_bytes(b"ignored")
+        temp = game_dir / "Data" / "temp.dlg"
+        temp.write_bytes(b"\x00")
+        temp.unlink()
+    return make_changes
+
+def expected(game_dir):
+    return {
+        str(game_dir / "Data" / "a_d.dlg"): MODIFIED,
+        str(game_dir / "Data" / "b_d.dlg"): REMOVED,
+        str(game_dir / "Data" / "new" / "c_d.dlg"): ADDED,
+    }
+
+def test_polling_watcher(game_dir):
+    assert collect_changes(game_dir, True, change_tree(game_dir)) == expected(game_dir)
+
+@pytest.mark.skipif(not InotifyBackend.available(), reason="inotify not available")
+def test_inotify_watcher(game_dir):
+    assert collect_changes(game_dir, False, change_tree(game_dir)) == expected(game_dir)
+
+def test_coalesce():
+    pending = {}
+    coalesce(pending, "a", ADDED)
+    coalesce(pending, "a", MODIFIED)
+    assert pending == {"a": ADDED}
+    coalesce(pending, "a", REMOVED)
+    assert pending == {}
+    coalesce(pending, "b", REMOVED)
+    coalesce(pending, "b", ADDED)
+    assert pending == {"b": MODIFIED}
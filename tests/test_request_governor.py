@@ -0,0 +1,152 @@
+import pytest
+import time
+import asyncio
+from types import SimpleNamespace
+from src.request_governor import RequestGovernor, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from src.ai_translator import AITranslator
+from src.translation_backend import OpenAIBackend
+from src.stand_in_server import StandInServer, ANSWER
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+def failing(errors, answer="ok"):
+    """A send function raising the given errors in turn, then answering."""
+    errors = list(errors)
+    calls = []
+    def send(request):
+        calls.append(time.monotonic())
+        if errors:
+            raise errors.pop(0)
+        return answer
+    send.calls = calls
+    return send
+
+def test_transient_errors_are_retried():
+    governor = RequestGovernor(base_delay=0.01)
+    send = failing([StatusError(503), StatusError(500)])
+    assert governor.call(send, {}) == "ok"
+    assert len(send.calls) == 3
+    metrics = governor.metrics()
+    assert metrics['retried'] == 2 and metrics['succeeded'] == 1 and metrics['failed'] == 0
+
+def test_client_errors_are_not_retried():
+    governor = RequestGovernor(base_delay=0.01)
+    send = failing([StatusError(400)])
+    with pytest.raises(StatusError):
+        governor.call(send, {})
+    assert len(send.calls) == 1
+    assert governor.metrics()['failed'] == 1
+
+def test_retry_after_is_honoured():
+    governor = RequestGovernor(base_delay=0.0)
+    send = failing([StatusError(429, {'retry-after': '0.3'})])
+    governor.call(send, {})
+    assert send.calls[1] - send.calls[0] >= 0.29
+    assert governor.metrics()['rate_limited'] == 1 and governor.metrics()['throttled'] == 1
+
+def test_circuit_opens_and_recovers():
+    governor = RequestGovernor(max_retries=0, failure_threshold=2, reset_timeout=0.2, open_timeout=0)
+    send = failing([StatusError(502), StatusError(502)])
+    for _ in range(2):
+        with pytest.raises(StatusError):
+            governor.call(send, {})
+    assert governor.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        governor.call(send, {})
+    assert len(send.calls) == 2 and governor.metrics()['rejected'] == 1
+
+    time.sleep(0.25)
+    assert governor.state == HALF_OPEN
+    assert governor.call(send, {}) == "ok"
+    assert governor.state == CLOSED
+
+def test_requests_wait_for_an_open_circuit():
+    governor = RequestGovernor(max_retries=0, failure_threshold=2, reset_timeout=0.2)
+    send = failing([StatusError(502), StatusError(502)])
+    for _ in range(2):
+        with pytest.raises(StatusError):
+            governor.call(send, {})
+    assert governor.state == OPEN
+    assert governor.call(send, {}) == "ok"
+    assert send.calls[2] - send.calls[1] >= 0.19
+    assert governor.state == CLOSED and governor.metrics()['rejected'] == 0
+
+def test_burst_of_failures_counts_once():
+    governor = RequestGovernor(max_concurrency=8, failure_threshold=2, base_delay=0.01)
+    calls = []
+
+    async def send(request):
+        calls.append(1)
+        failed = len(calls) <= 8
+        await asyncio.sleep(0.02)
+        if failed:
+            raise StatusError(503)
+        return "ok"
+
+    async def run():
+        return await asyncio.gather(*[governor.call_async(send, {}) for _ in range(8)])
+
+    assert asyncio.run(run()) == ["ok"] * 8
+    metrics = governor.metrics()
+    assert metrics['retried'] == 8 and metrics['rejected'] == 0 and metrics['circuit'] == CLOSED
+
+def test_token_bucket_spaces_requests():
+    governor = RequestGovernor(requests_per_minute=600, burst=1)
+    send = failing([])
+    start = time.monotonic()
+    for _ in range(4):
+        governor.call(send, {})
+    # The first request uses the burst, the other three wait 0.1 s each
+    assert time.monotonic() - start >= 0.28
+    assert governor.metrics()['throttled'] == 3
+
+def test_concurrency_is_capped_across_tasks():
+    governor = RequestGovernor(max_concurrency=3)
+    in_flight = []
+    peak = []
+
+    async def send(request):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.02)
+        in_flight.pop()
+        return "ok"
+
+    async def run():
+        return await asyncio.gather(*[governor.call_async(send, {}) for _ in range(12)])
+
+    assert asyncio.run(run()) == ["ok"] * 12
+    assert max(peak) == 3
+    assert governor.metrics()['in_flight'] == 0 and governor.metrics()['queued'] == 0
+
+def test_translator_rides_out_rate_limits():
+    server = StandInServer(error_rate=0.4, error_status=429, retry_after=0.01, seed=1).start()
+    try:
+        governor = RequestGovernor(base_delay=0.01)
+        translator = AITranslator(backend=OpenAIBackend("test-key", server.base_url, max_retries=0), governor=governor)
+        for i in range(10):
+            assert translator.translate_text(f"Иди к башне {i}", 50) == ANSWER
+    finally:
+        server.shutdown()
+        server.server_close()
+    metrics = governor.metrics()
+    assert metrics['succeeded'] == 10 and metrics['failed'] == 0
+    assert metrics['rate_limited'] == metrics['retried'] > 0
+    assert server.requests == 10 + metrics['retried']
+
+def test_release_skips_waiters_on_closed_loops():
+    governor = RequestGovernor(max_concurrency=1)
+    slots = governor._slots
+    slots.take()
+    loop = asyncio.new_event_loop()
+    waiter = loop.create_task(slots.take_async())
+    loop.run_until_complete(asyncio.sleep(0))  # The waiter queues for the slot
+    loop.close()
+    slots.release()
+    assert slots.used == 0 and not slots._waiters
+    slots.take()
+    slots.release()
@@ -0,0 +1,15 @@
+from src.request_packer import pack_items, estimate_tokens
+
+def test_packs_respect_budgets_and_order():
+    items = [(i, "Привет, путник! " * 10, 60) for i in range(1, 101)]
+    packs = pack_items(items, max_input_tokens=1000, max_output_tokens=400, max_items=40)
+    assert [item for pack in packs for item in pack] == items
+    assert len(packs) > 3
+    assert all(len(pack) <= 40 for pack in packs)
+
+def test_oversized_section_gets_its_own_pack():
+    items = [(1, "a", 10), (2, "б" * 10000, 10), (3, "c", 10)]
+    assert [len(pack) for pack in pack_items(items, max_input_tokens=1000)] == [1, 1, 1]
+
+def test_cyrillic_costs_more_than_latin():
+    assert estimate_tokens("Привет") > estimate_tokens("Hello!")
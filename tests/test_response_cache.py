@@ -0,0 +1,31 @@
+from src.response_cache import ResponseCache, cache_key
+
+def test_hits_and_misses_are_counted(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db")
+    key = cache_key("Привет", 20, 'cp1251', 'model', 1)
+    assert cache.get(key) is None
+    cache.put(key, "Hello")
+    assert cache.get(key) == "Hello"
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+    cache.close()
+
+    reopened = ResponseCache(tmp_path / "cache.db")
+    assert reopened.get(key) == "Hello"
+    reopened.close()
+
+def test_key_covers_the_section():
+    base = cache_key("Привет", 20, 'cp1251', 'model', 1)
+    assert cache_key("Привет", 21, 'cp1251', 'model', 1) != base
+    assert cache_key("Привет", 20, 'cp1251', 'model', 2) != base
+    assert cache_key("Привет", 20, 'cp1251', 'other', 1) != base
+    assert cache_key("Пока", 20, 'cp1251', 'model', 1) != base
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", max_entries=3, memory_entries=0)
+    for key in "abc":
+        cache.put(key, key.upper())
+    cache.get("a")
+    cache.put("d", "D")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    cache.close()
@@ -0,0 +1,86 @@
+import pytest
+import os
+from pathlib import Path
+import tempfile
+from src.db_handler import DbHandler
+from src.scanner import DlgScanner, iter_dlg_files
+
+@pytest.fixture
+def game_dir():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir) / "game"
+        for rel in ["Data/A/a_d.dlg", "Data/A/a_d9.dlg", "Data/B/b_d.DLG", "Data/B/readme.txt", "root.dlg"]:
+            path = root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"\x00")
+        yield root
+
+@pytest.fixture
+def db(game_dir):
+    handler = DbHandler(str(game_dir.parent / "dlg_files.db"))
+    yield handler
+    handler.close()
+
+def test_iter_dlg_files_matches_rglob_paths(game_dir):
+    found = dict(iter_dlg_files(str(game_dir)))
+    expected = {
+        str(p): str(p.relative_to(game_dir))
+        for p in game_dir.rglob("*") if p.suffix.lower() == ".dlg"
+    }
+    assert found == expected
+
+def test_replace_scan(db, game_dir):
+    db.add_dlg_file("/old/gone.dlg", "gone.dlg")
+    scanner = DlgScanner(db, str(game_dir), replace=True)
+    scanner.start()
+    assert scanner.wait(10)
+    assert scanner.scanned == 4
+    assert sorted(rel for _, rel, _ in db.get_all_files()) == sorted(
+        os.path.join(*p.split("/")) for p in ["Data/A/a_d.dlg", "Data/A/a_d9.dlg", "Data/B/b_d.DLG", "root.dlg"]
+    )
+
+def test_sync_scan_keeps_status(db, game_dir):
+    DlgScanner(db, str(game_dir), replace=True).run()
+    kept = str(game_dir / "Data" / "A" / "a_d.dlg")
+    db.set_translated_status(kept, True)
+    (game_dir / "root.dlg").unlink()
+    (game_dir / "Data" / "B" / "new.dlg").write_bytes(b"\x00")
+
+    scanner = DlgScanner(db, str(game_dir))
+    scanner.run()
+    assert (scanner.added, scanner.removed) == (1, 1)
+    assert db.is_file_translated(kept)
+    assert str(game_dir / "root.dlg") not in {f for f, _, _ in db.get_all_files()}
+
+def test_cancelled_scan_does_not_remove_files(db, game_dir):
+    db.add_dlg_file("/elsewhere/x.dlg", "x.dlg")
+    scanner = DlgScanner(db, str(game_dir))
+    scanner.cancel()
+    scanner.run()
+    assert scanner.scanned == 0
+    assert db.get_all_files() == [("/elsewhere/x.dlg", "x.dlg", 0)]
+
+def test_cancelled_replace_scan_keeps_old_table(db, game_dir):
+    DlgScanner(db, str(game_dir), replace=True).run()
+    kept = str(game_dir / "root.dlg")
+    db.set_translated_status(kept, True)
+    before = db.get_all_files()
+
+    scanner = DlgScanner(db, str(game_dir), replace=True)
+    scanner.cancel()
+    scanner.run()
+    assert db.get_all_files() == before
+    assert db.is_file_translated(kept)
+
+def test_identical_files_grouped_by_source_hash(db, game_dir):
+    (game_dir / "root.dlg").write_bytes(b"\x01")
+    DlgScanner(db, str(game_dir), replace=True).run()
+    a_d = str(game_dir / "Data" / "A" / "a_d.dlg")
+    assert db.get_duplicate_stats() == (2, 2)
+    assert db.get_duplicate_counts()[a_d] == 3
+
+    # Translating one member keeps the group; it is no longer unchanged
+    (game_dir / "Data" / "A" / "a_d9.dlg").write_bytes(b"\x00translated")
+    DlgScanner(db, str(game_dir)).run()
+    identical = {os.path.basename(path): unchanged for path, _, _, unchanged in db.get_identical_files(a_d)}
+    assert identical == {"a_d9.dlg": False, "b_d.DLG": True}
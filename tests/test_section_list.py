@@ -0,0 +1,44 @@
+from src.dlg_handler import TextSection
+from src.section_list import SectionModel, max_text_bytes, FITS, SLIGHT_OVERFLOW, OVERFLOW, UNENCODABLE
+
+def make_section(text, padding=0):
+    section = TextSection(text, 100, 100 + len(text) + padding, 'cp1251')
+    section.text_byte_positions = list(range(100, 100 + len(text)))
+    section.padding_byte_positions = list(range(100 + len(text), 100 + len(text) + padding))
+    return section
+
+def test_max_text_bytes_includes_padding():
+    assert max_text_bytes(make_section("Привет", padding=4), 0) == 10
+
+def test_overflow_state_follows_text():
+    model = SectionModel(make_section("a" * 100), 0)
+    assert model.overflow_state() == FITS
+    model.set_text("a" * 105)
+    assert model.overflow_state() == SLIGHT_OVERFLOW
+    model.update_text("a" * 111)
+    assert model.overflow_state() == OVERFLOW
+    assert model.byte_length == 111
+
+def test_text_lines_bounded():
+    assert SectionModel(make_section("a"), 0).text_lines == 2
+    assert SectionModel(make_section("a" * 1000), 0).text_lines == 5
+
+def test_apply_edit_tracks_bytes_and_state_changes():
+    model = SectionModel(make_section("a" * 100), 0)
+    changes = []
+    model.on_state_change = lambda old, new: changes.append((old, new))
+    model.apply_edit("бв" * 3, "")
+    assert model.byte_length == 106
+    assert model.state == SLIGHT_OVERFLOW
+    model.apply_edit("€", "a")
+    assert model.byte_length == 106
+    model.apply_edit("", "бв" * 3)
+    assert model.state == FITS
+    assert changes == [(FITS, SLIGHT_OVERFLOW), (SLIGHT_OVERFLOW, FITS)]
+
+def test_apply_edit_flags_unencodable_characters():
+    model = SectionModel(make_section("hello"), 0)
+    model.apply_edit("漢", "")
+    assert model.state == UNENCODABLE
+    model.apply_edit("", "漢")
+    assert model.state == FITS
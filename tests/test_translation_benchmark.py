@@ -0,0 +1,30 @@
+import pytest
+from src.stand_in_server import StandInServer
+from src.translation_benchmark import run_benchmark, answer_of
+
+@pytest.fixture
+def server():
+    server = StandInServer(latency=0.05, seed=1).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_fitting_answers_need_no_retries(server):
+    result = run_benchmark(server, sections=20, concurrency=10, timeout=30)
+    assert result.translated == 20 and result.failed == 0
+    assert result.retry_rate == 0
+    assert len(result.latencies) == 20
+    # Requests overlap, but never beyond the concurrency limit
+    assert 1 < server.peak_in_flight <= 10
+
+def test_overflowing_answers_count_as_retries(server):
+    server.answer = answer_of(10)
+    server.short_answer = answer_of(4)
+    result = run_benchmark(server, sections=10, concurrency=10, max_bytes=20, timeout=30)
+    assert result.translated == 10
+    assert result.retry_rate == 1.0
+
+def test_packed_sections_share_requests(server):
+    result = run_benchmark(server, sections=30, packed=True, timeout=30)
+    assert result.translated == 30
+    assert result.requests == result.minimum_requests < 30
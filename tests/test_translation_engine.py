@@ -0,0 +1,108 @@
+import threading
+from src.translation_engine import TranslationEngine, TranslationJob
+from src.response_cache import ResponseCache
+from src.ai_translator import AITranslator
+from src.translation_backend import OpenAIBackend
+from src.request_governor import RequestGovernor
+from src.stand_in_server import StandInServer
+
+def test_batch_runs_concurrently(translator, stand_in):
+    done = threading.Event()
+    results = []
+    engine = TranslationEngine(translator, max_concurrency=10)
+    try:
+        jobs = [TranslationJob(f"Иди к башне {i}", 50, key=i) for i in range(10)]
+        batch = engine.submit(
+            jobs,
+            on_result=lambda batch, index, translation, error: results.append(index),
+            on_done=lambda batch: done.set()
+        )
+        assert done.wait(10)
+    finally:
+        engine.stop()
+    assert sorted(results) == list(range(10))
+    assert batch.results == {i: "Go to the tower." for i in range(10)}
+    assert not batch.errors
+    # One request per job, sent side by side rather than one after another
+    assert stand_in.requests == 10
+    assert 1 < stand_in.peak_in_flight <= 10
+
+def test_burst_of_server_errors_does_not_fail_the_batch():
+    # The whole first wave of requests fails, more than enough to open the circuit
+    server = StandInServer(latency=0.05, error_status=503, fail_first=8).start()
+    governor = RequestGovernor(max_concurrency=8, failure_threshold=4, base_delay=0.05, reset_timeout=0.2)
+    translator = AITranslator(backend=OpenAIBackend("test-key", server.base_url, max_retries=0), governor=governor)
+    engine = TranslationEngine(translator, max_concurrency=8)
+    try:
+        done = threading.Event()
+        jobs = [TranslationJob(f"Иди к башне {i}", 50, key=i) for i in range(40)]
+        batch = engine.submit(jobs, on_done=lambda batch: done.set())
+        assert done.wait(30)
+    finally:
+        engine.stop()
+        server.shutdown()
+        server.server_close()
+    assert len(batch.results) == 40 and not batch.errors
+    assert governor.metrics()['rejected'] == 0
+
+def test_errors_are_reported_per_job(translator):
+    engine = TranslationEngine(translator)
+    try:
+        done = threading.Event()
+        # The stand-in's answer never fits in 5 bytes
+        batch = engine.submit([TranslationJob("Иди к башне", 5)], on_done=lambda batch: done.set())
+        assert done.wait(10)
+    finally:
+        engine.stop()
+    assert not batch.results
+    assert "byte limit" in str(batch.errors[0])
+
+def test_sync_and_async_drivers_agree(translator):
+    engine = TranslationEngine(translator)
+    try:
+        assert engine.translate("Иди к башне", 50, timeout=10) == translator.translate_text("Иди к башне", 50)
+    finally:
+        engine.stop()
+
+def test_cache_is_shared_by_single_and_batch_translation(translator, tmp_path):
+    translator.cache = ResponseCache(tmp_path / "cache.db")
+    engine = TranslationEngine(translator)
+    try:
+        done = threading.Event()
+        engine.submit([TranslationJob("Иди к башне", 50)], on_done=lambda batch: done.set())
+        assert done.wait(10)
+        translator.backend = None  # A cache hit needs no API call
+        assert translator.translate_text("Иди к башне", 50) == "Go to the tower."
+        assert translator.cache.hits == 1
+    finally:
+        engine.stop()
+        translator.cache.close()
+
+def test_packed_batch_fills_the_cache_for_translations_with_context(translator, tmp_path):
+    translator.cache = ResponseCache(tmp_path / "cache.db")
+    engine = TranslationEngine(translator)
+    try:
+        done = threading.Event()
+        engine.submit_packed([TranslationJob("Иди к башне", 50)], on_done=lambda batch: done.set())
+        assert done.wait(10)
+        translator.backend = None  # A cache hit needs no API call
+        context = ["Привет, путник.", "Иди к башне", "Там тебя ждут."]
+        assert translator.translate_text("Иди к башне", 50, context=context, summary="A guide.") == "Go to the tower."
+        assert translator.cache.hits == 1
+    finally:
+        engine.stop()
+        translator.cache.close()
+
+def test_packed_batch_retries_only_missing_sections(translator, stand_in):
+    stand_in.max_sections = 6
+    engine = TranslationEngine(translator)
+    try:
+        done = threading.Event()
+        jobs = [TranslationJob(f"Иди к башне {i}", 50) for i in range(10)]
+        batch = engine.submit_packed(jobs, on_done=lambda batch: done.set())
+        assert done.wait(10)
+    finally:
+        engine.stop()
+    assert batch.results == {i: "Go to the tower." for i in range(10)}
+    # 5 sections kept from a truncated first reply, then the other 5 in one more request
+    assert stand_in.requests == 2
@@ -0,0 +1,50 @@
+import pytest
+from pathlib import Path
+import tempfile
+from src.db_handler import DbHandler
+from src.translation_memory import TranslationMemory, normalize_source
+
+@pytest.fixture
+def memory():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DbHandler(str(Path(tmp_dir) / "dlg_files.db"))
+        yield TranslationMemory(db)
+        db.close()
+
+def test_normalize_source():
+    assert normalize_source("  Прощай.\n") == normalize_source("прощай.")
+    assert normalize_source("Эй,   ты!") == "эй, ты!"
+
+def test_exact_lookup(memory):
+    assert memory.add("Прощай.", "Farewell.", wait=True)
+    match = memory.lookup("  прощай. ")
+    assert match.translation == "Farewell."
+    assert match.byte_length == 9
+    assert match.score == 1.0
+
+def test_lookup_fitting_respects_budget(memory):
+    memory.add("Прощай.", "Farewell.", wait=True)
+    assert memory.lookup_fitting("Прощай.", 9).translation == "Farewell."
+    assert memory.lookup_fitting("Прощай.", 8) is None
+
+def test_fuzzy_matches_ranked(memory):
+    memory.add("Стража! Держи вора!", "Guards! Stop the thief!", wait=True)
+    memory.add("Стража! Держи его!", "Guards! Stop him!", wait=True)
+    memory.add("Библиотека? А что это такое?", "A library? What is that?", wait=True)
+
+    matches = memory.fuzzy_matches("Стража, держи вора!", min_score=0.3)
+    assert [m.translation for m in matches][:2] == ["Guards! Stop the thief!", "Guards! Stop him!"]
+    assert matches[0].score > matches[1].score
+    assert all(m.score < 1.0 for m in matches)
+
+def test_untranslated_pairs_are_not_stored(memory):
+    assert not memory.add("Прощай.", "прощай.")
+    assert not memory.add("Hello", "Hi")
+    assert not memory.add("Прощай.", "   ")
+    assert memory.lookup("Прощай.") is None
+
+def test_update_replaces_translation(memory):
+    memory.add("Прощай.", "Farewell.", wait=True)
+    memory.add("Прощай.", "Goodbye.", wait=True)
+    assert memory.lookup("Прощай.").translation == "Goodbye."
+    assert memory.fuzzy_matches("Прощай.")[0].translation == "Goodbye."
@@ -0,0 +1,26 @@
+import pytest
+from src.untranslated_index import UntranslatedIndex, tree_order_key
+
+@pytest.fixture
+def index():
+    index = UntranslatedIndex()
+    index.reset([("/g/b/y.dlg", "b/y.dlg"), ("/g/a/x.dlg", "a\\x.dlg"), ("/g/c.dlg", "c.dlg")])
+    return index
+
+def test_next_after_follows_tree_order_and_wraps(index):
+    assert index.next_after() == "/g/a/x.dlg"
+    assert index.next_after(index.key_of("/g/a/x.dlg")) == "/g/b/y.dlg"
+    assert index.next_after(index.key_of("/g/c.dlg")) == "/g/a/x.dlg"
+
+def test_next_after_position_of_translated_file(index):
+    assert index.next_after(tree_order_key("/g/a/z.dlg", "a/z.dlg")) == "/g/b/y.dlg"
+
+def test_update_tracks_status(index):
+    index.update("/g/a/x.dlg", "a/x.dlg", True)
+    index.update("/g/b/y.dlg", "NOT_REQUIRED:b/y.dlg", False)
+    index.update("/g/a/new.dlg", "a/new.dlg", False)
+    assert "/g/a/x.dlg" not in index and "/g/b/y.dlg" not in index
+    assert index.next_after() == "/g/a/new.dlg"
+    index.remove("/g/a/new.dlg")
+    index.remove("/g/c.dlg")
+    assert len(index) == 0 and index.next_after() is None